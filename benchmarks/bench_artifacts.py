@@ -0,0 +1,42 @@
+from conftest import run_benchmark
+
+from dbtea import utils
+from dbtea.artifacts import ManifestIndex
+
+
+def test_parse_manifest(benchmark, node_count, synthetic_project):
+    benchmark.group = "parse_json_file"
+    manifest_data = run_benchmark(
+        benchmark, node_count, utils.parse_json_file, synthetic_project["manifest"]
+    )
+    assert len(manifest_data["nodes"]) == node_count
+
+
+def test_parse_catalog(benchmark, node_count, synthetic_project):
+    benchmark.group = "parse_json_file"
+    catalog_data = run_benchmark(
+        benchmark, node_count, utils.parse_json_file, synthetic_project["catalog"]
+    )
+    assert len(catalog_data["nodes"]) == node_count
+
+
+def test_stream_manifest_nodes(benchmark, node_count, synthetic_project):
+    benchmark.group = "stream_json_object_items"
+    streamed_node_count = run_benchmark(
+        benchmark,
+        node_count,
+        lambda: sum(
+            1
+            for _ in utils.stream_json_object_items(
+                synthetic_project["manifest"], "nodes"
+            )
+        ),
+    )
+    assert streamed_node_count == node_count
+
+
+def test_manifest_index(benchmark, node_count, synthetic_project):
+    benchmark.group = "manifest_index"
+    manifest_data = utils.parse_json_file(synthetic_project["manifest"])
+    manifest_index = run_benchmark(benchmark, node_count, ManifestIndex, manifest_data)
+    assert len(manifest_index) == node_count
@@ -0,0 +1,77 @@
+import io
+
+import lkml
+import pytest
+from conftest import run_benchmark
+
+from dbtea import utils
+from dbtea.clients.bi.looker import base, writer
+
+
+@pytest.fixture(scope="session")
+def model_schemas(synthetic_project) -> list:
+    manifest_data = utils.parse_json_file(synthetic_project["manifest"])
+    catalog_nodes = utils.parse_json_file(synthetic_project["catalog"])["nodes"]
+    return [
+        base.dbt_manifest_node_to_model_schema(node, catalog_nodes.get(unique_id))
+        for unique_id, node in manifest_data["nodes"].items()
+    ]
+
+
+@pytest.fixture(scope="session")
+def lookml_views(model_schemas) -> list:
+    return base.dbt_model_schemas_to_lookml_views(model_schemas)["views"]
+
+
+def test_dbt_model_schemas_to_lookml_views(benchmark, node_count, model_schemas):
+    benchmark.group = "dbt_model_schemas_to_lookml_views"
+    lookml_data = run_benchmark(
+        benchmark, node_count, base.dbt_model_schemas_to_lookml_views, model_schemas
+    )
+    assert len(lookml_data["views"]) == node_count
+
+
+def test_create_lookml_view(benchmark, node_count, lookml_views):
+    benchmark.group = "create_lookml_view"
+    view_strings = run_benchmark(
+        benchmark,
+        node_count,
+        lambda: [
+            base.create_lookml_view(
+                view["name"],
+                sql_table_name=view["sql_table_name"],
+                dimensions=view.get("dimensions"),
+                dimension_groups=view.get("dimension_groups"),
+            )
+            for view in lookml_views
+        ],
+    )
+    assert len(view_strings) == node_count
+
+
+def test_lkml_dump(benchmark, node_count, lookml_views):
+    benchmark.group = "lkml.dump"
+    lookml_string = run_benchmark(
+        benchmark, node_count, lkml.dump, {"views": lookml_views}
+    )
+    assert lookml_string.count("view: ") == node_count
+
+
+def test_lookml_writer_dump(benchmark, node_count, lookml_views):
+    benchmark.group = "lkml.dump"
+    lookml_string = run_benchmark(
+        benchmark, node_count, writer.dump, {"views": lookml_views}
+    )
+    assert lookml_string == lkml.dump({"views": lookml_views})
+
+
+def test_write_lookml_views(benchmark, node_count, model_schemas):
+    benchmark.group = "write_lookml_views"
+
+    def write_lookml_views() -> io.StringIO:
+        lookml_stream = io.StringIO()
+        base.write_lookml_views(model_schemas, lookml_stream)
+        return lookml_stream
+
+    lookml_stream = run_benchmark(benchmark, node_count, write_lookml_views)
+    assert lookml_stream.getvalue().count("view: ") == node_count
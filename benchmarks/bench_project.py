@@ -0,0 +1,42 @@
+from conftest import run_benchmark
+
+from dbtea import utils
+from dbtea.schema_files import load_schema_files
+
+
+def test_fetch_dbt_project_directory(
+    benchmark, node_count, synthetic_project, monkeypatch
+):
+    benchmark.group = "fetch_dbt_project_directory"
+    monkeypatch.chdir(synthetic_project["deepest_directory"])
+    project_directory = run_benchmark(
+        benchmark, node_count, utils.fetch_dbt_project_directory
+    )
+    assert synthetic_project["manifest"].startswith(project_directory)
+
+
+def test_parse_schema_yaml_files(benchmark, node_count, synthetic_project):
+    benchmark.group = "parse_yaml_file"
+    schema_files_data = run_benchmark(
+        benchmark,
+        node_count,
+        lambda: [
+            utils.parse_yaml_file(schema_file)
+            for schema_file in synthetic_project["schema_files"]
+        ],
+    )
+    assert sum(len(schema_data["models"]) for schema_data in schema_files_data) == (
+        node_count
+    )
+
+
+def test_load_schema_files(benchmark, node_count, synthetic_project):
+    benchmark.group = "parse_yaml_file"
+    schema_files = run_benchmark(
+        benchmark,
+        node_count,
+        lambda: load_schema_files(synthetic_project["schema_files"], cache=None),
+    )
+    assert sum(len(schema_file.models) for schema_file in schema_files.values()) == (
+        node_count
+    )
@@ -0,0 +1,40 @@
+import os
+
+import pytest
+from synthetic import write_synthetic_project
+
+# Override with e.g. DBTEA_BENCHMARK_SIZES=100,1000 for a quick run
+BENCHMARK_SIZES = [
+    int(node_count)
+    for node_count in os.environ.get(
+        "DBTEA_BENCHMARK_SIZES", "100,1000,10000,50000"
+    ).split(",")
+]
+# Time budget per benchmark: fewer rounds for larger projects
+BENCHMARK_ROUNDS_NODE_BUDGET = 5000
+MAX_BENCHMARK_ROUNDS = 20
+
+
+@pytest.fixture(
+    scope="session",
+    params=BENCHMARK_SIZES,
+    ids=lambda node_count: "{}_nodes".format(node_count),
+)
+def node_count(request) -> int:
+    return request.param
+
+
+@pytest.fixture(scope="session")
+def synthetic_project(node_count, tmp_path_factory) -> dict:
+    project_directory = tmp_path_factory.mktemp("synthetic_{}".format(node_count))
+    return write_synthetic_project(str(project_directory), node_count)
+
+
+def run_benchmark(benchmark, node_count: int, function, *args, setup=None):
+    """Time a function with a number of rounds suited to the project size, returning its last result."""
+    rounds = max(
+        1, min(MAX_BENCHMARK_ROUNDS, BENCHMARK_ROUNDS_NODE_BUDGET // node_count)
+    )
+    if setup:
+        return benchmark.pedantic(function, setup=setup, rounds=rounds)
+    return benchmark.pedantic(function, args=args, rounds=rounds, iterations=1)
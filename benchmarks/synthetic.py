@@ -0,0 +1,225 @@
+"""
+Generate synthetic dbt projects, manifests and catalogs of any size for benchmarks.
+
+"""
+import json
+import os
+import random
+from typing import Dict, List, Tuple
+
+import yaml
+
+SYNTHETIC_PACKAGE = "synthetic"
+MODELS_PER_DIRECTORY = 50
+# Column counts follow a log-normal distribution with a median of about 16 columns, capped like wide warehouse tables
+MEDIAN_COLUMN_COUNT_LOG = 2.8
+COLUMN_COUNT_LOG_SIGMA = 0.6
+MAX_COLUMN_COUNT = 250
+WAREHOUSE_COLUMN_TYPES = (
+    ("", "INTEGER"),
+    ("", "VARCHAR"),
+    ("", "VARCHAR"),
+    ("", "NUMERIC(38,2)"),
+    ("", "BOOLEAN"),
+    ("_at", "TIMESTAMP"),
+    ("_date", "DATE"),
+)
+
+
+def _column_count(random_generator: random.Random) -> int:
+    return max(
+        1,
+        min(
+            MAX_COLUMN_COUNT,
+            int(
+                random_generator.lognormvariate(
+                    MEDIAN_COLUMN_COUNT_LOG, COLUMN_COUNT_LOG_SIGMA
+                )
+            ),
+        ),
+    )
+
+
+def synthetic_columns(random_generator: random.Random) -> List[Tuple[str, str]]:
+    """Return (name, warehouse type) pairs for one model."""
+    columns = [("id", "INTEGER")]
+    for column_index in range(1, _column_count(random_generator)):
+        suffix, column_type = random_generator.choice(WAREHOUSE_COLUMN_TYPES)
+        columns.append(("column_{}{}".format(column_index, suffix), column_type))
+    return columns
+
+
+def model_directory(model_index: int) -> str:
+    return "models/domain_{}".format(model_index // MODELS_PER_DIRECTORY)
+
+
+def synthetic_manifest_and_catalog(node_count: int, seed: int = 0) -> Tuple[dict, dict]:
+    """Build a manifest and catalog of `node_count` models, each depending on up to three earlier models."""
+    random_generator = random.Random(seed)
+    manifest_nodes, catalog_nodes, parent_map = dict(), dict(), dict()
+    for model_index in range(node_count):
+        model_name = "model_{}".format(model_index)
+        unique_id = "model.{}.{}".format(SYNTHETIC_PACKAGE, model_name)
+        parents = sorted(
+            {
+                "model.{}.model_{}".format(
+                    SYNTHETIC_PACKAGE, random_generator.randrange(model_index)
+                )
+                for _ in range(min(model_index, random_generator.randint(0, 3)))
+            }
+        )
+        columns = synthetic_columns(random_generator)
+        manifest_nodes[unique_id] = {
+            "unique_id": unique_id,
+            "name": model_name,
+            "resource_type": "model",
+            "package_name": SYNTHETIC_PACKAGE,
+            "fqn": [
+                SYNTHETIC_PACKAGE,
+                model_directory(model_index).split("/")[1],
+                model_name,
+            ],
+            "original_file_path": "{}/{}.sql".format(
+                model_directory(model_index), model_name
+            ),
+            "patch_path": "{}/schema.yml".format(model_directory(model_index)),
+            "description": "Synthetic model {}".format(model_index),
+            "tags": ["domain_{}".format(model_index // MODELS_PER_DIRECTORY)],
+            "config": {"materialized": random_generator.choice(("view", "table"))},
+            "checksum": {"name": "sha256", "checksum": "{:064x}".format(model_index)},
+            "depends_on": {"macros": [], "nodes": parents},
+            "columns": {
+                column_name: {
+                    "name": column_name,
+                    "description": "Synthetic column {}".format(column_name),
+                    "meta": {},
+                    "data_type": None,
+                    "tags": [],
+                }
+                for column_name, _ in columns
+            },
+        }
+        catalog_nodes[unique_id] = {
+            "metadata": {
+                "type": "BASE TABLE",
+                "schema": "analytics",
+                "name": model_name,
+            },
+            "columns": {
+                column_name.upper(): {
+                    "name": column_name.upper(),
+                    "type": column_type,
+                    "index": column_index + 1,
+                    "comment": None,
+                }
+                for column_index, (column_name, column_type) in enumerate(columns)
+            },
+            "stats": {},
+            "unique_id": unique_id,
+        }
+        parent_map[unique_id] = parents
+
+    child_map: Dict[str, List[str]] = {unique_id: [] for unique_id in parent_map}
+    for unique_id, parents in parent_map.items():
+        for parent_id in parents:
+            child_map[parent_id].append(unique_id)
+    manifest_data = {
+        "metadata": {"dbt_version": "0.19.1", "generated_at": "2021-06-01T00:00:00Z"},
+        "nodes": manifest_nodes,
+        "sources": {},
+        "macros": {},
+        "exposures": {},
+        "parent_map": parent_map,
+        "child_map": child_map,
+    }
+    catalog_data = {
+        "metadata": {"dbt_version": "0.19.1", "generated_at": "2021-06-01T00:00:00Z"},
+        "nodes": catalog_nodes,
+        "sources": {},
+        "errors": None,
+    }
+    return manifest_data, catalog_data
+
+
+def synthetic_model_schemas(manifest_data: dict) -> List[dict]:
+    """Return schema.yml style model entries (name, description and documented columns) for the manifest's models."""
+    return [
+        {
+            "name": node["name"],
+            "description": node["description"],
+            "columns": [
+                {"name": column_name, "description": column["description"]}
+                for column_name, column in node["columns"].items()
+            ],
+        }
+        for node in manifest_data["nodes"].values()
+    ]
+
+
+def write_synthetic_project(
+    project_directory: str, node_count: int, seed: int = 0
+) -> dict:
+    """Write a dbt project with SQL files, one schema.yml per directory and target artifacts.
+
+    Returns the paths written, keyed by `manifest`, `catalog`, `schema_files` and `deepest_directory`.
+    """
+    manifest_data, catalog_data = synthetic_manifest_and_catalog(node_count, seed)
+    with open(
+        os.path.join(project_directory, "dbt_project.yml"), "w"
+    ) as project_stream:
+        yaml.safe_dump(
+            {
+                "name": SYNTHETIC_PACKAGE,
+                "version": "1.0.0",
+                "config-version": 2,
+                "profile": SYNTHETIC_PACKAGE,
+            },
+            project_stream,
+        )
+
+    schema_models: Dict[str, List[dict]] = dict()
+    for model_schema, node in zip(
+        synthetic_model_schemas(manifest_data), manifest_data["nodes"].values()
+    ):
+        directory = os.path.dirname(node["original_file_path"])
+        os.makedirs(os.path.join(project_directory, directory), exist_ok=True)
+        with open(
+            os.path.join(project_directory, node["original_file_path"]), "w"
+        ) as model_stream:
+            model_stream.write(
+                "select\n    {}\nfrom {{{{ source('raw', '{}') }}}}\n".format(
+                    ",\n    ".join(node["columns"]), node["name"]
+                )
+            )
+        schema_models.setdefault(node["patch_path"], []).append(model_schema)
+
+    for schema_path, models in schema_models.items():
+        with open(os.path.join(project_directory, schema_path), "w") as schema_stream:
+            yaml.safe_dump(
+                {"version": 2, "models": models}, schema_stream, sort_keys=False
+            )
+
+    target_directory = os.path.join(project_directory, "target")
+    os.makedirs(target_directory, exist_ok=True)
+    artifact_paths = {
+        "manifest": os.path.join(target_directory, "manifest.json"),
+        "catalog": os.path.join(target_directory, "catalog.json"),
+    }
+    for artifact_name, artifact_data in (
+        ("manifest", manifest_data),
+        ("catalog", catalog_data),
+    ):
+        with open(artifact_paths[artifact_name], "w") as artifact_stream:
+            json.dump(artifact_data, artifact_stream)
+
+    deepest_directory = os.path.join(
+        project_directory, "models", "domain_0", "nested", "deeper"
+    )
+    os.makedirs(deepest_directory, exist_ok=True)
+    return dict(
+        artifact_paths,
+        schema_files=sorted(
+            os.path.join(project_directory, path) for path in schema_models
+        ),
+        deepest_directory=deepest_directory,
+    )
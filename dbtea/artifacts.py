@@ -0,0 +1,597 @@
+"""
+Cache and index parsed dbt artifacts.
+
+"""
+import hashlib
+import json
+import os
+import sqlite3
+from collections import defaultdict
+from collections.abc import ItemsView, Mapping
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Collection,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import dbtea.utils as utils
+from dbtea.exceptions import DbteaException
+from dbtea.logger import DBTEA_LOGGER as logger
+
+MANIFEST_NODE_SECTIONS = ("nodes", "sources", "exposures")
+STREAMABLE_ARTIFACT_SECTIONS = {"nodes", "sources", "exposures"}
+SNAPSHOT_DIRECTORY = "dbtea"
+SNAPSHOT_FORMAT_VERSION = "1"
+SNAPSHOT_SCHEMA = """
+CREATE TABLE snapshot_source (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE properties (key TEXT PRIMARY KEY, data TEXT NOT NULL);
+CREATE TABLE nodes (
+    unique_id TEXT PRIMARY KEY,
+    section TEXT NOT NULL,
+    resource_type TEXT,
+    package_name TEXT,
+    original_file_path TEXT,
+    name TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE node_tags (tag TEXT NOT NULL, unique_id TEXT NOT NULL);
+CREATE TABLE edges (parent_id TEXT NOT NULL, child_id TEXT NOT NULL);
+"""
+SNAPSHOT_INDEXES = """
+CREATE INDEX nodes_resource_type ON nodes (resource_type);
+CREATE INDEX nodes_package_name ON nodes (package_name);
+CREATE INDEX nodes_original_file_path ON nodes (original_file_path);
+CREATE INDEX nodes_name ON nodes (name);
+CREATE INDEX node_tags_tag ON node_tags (tag);
+CREATE INDEX edges_parent_id ON edges (parent_id);
+CREATE INDEX edges_child_id ON edges (child_id);
+"""
+
+
+class ArtifactCache:
+    """In-process cache of parsed artifact files, invalidated when a file's mtime or size changes."""
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[Tuple[int, int], Any]] = dict()
+
+    def __contains__(self, artifact_path) -> bool:
+        entry = self._entries.get(str(artifact_path))
+        return bool(entry) and entry[0] == self._file_signature(artifact_path)
+
+    def get(self, artifact_path, loader: Callable[[str], Any] = None) -> Any:
+        """Return cached data for the artifact path, (re)loading it via `loader` when missing or stale."""
+        cache_key = str(artifact_path)
+        signature = self._file_signature(artifact_path)
+        entry = self._entries.get(cache_key)
+        if entry and entry[0] == signature:
+            return entry[1]
+
+        if entry:
+            logger.debug("Artifact {} changed on disk, reloading".format(cache_key))
+        artifact_data = (loader or utils.parse_json_file)(cache_key)
+        self._entries[cache_key] = (signature, artifact_data)
+        return artifact_data
+
+    def get_derived(
+        self,
+        artifact_path,
+        name: str,
+        builder: Callable[[Any], Any],
+        loader: Callable[[str], Any] = None,
+    ) -> Any:
+        """Return a value derived from the artifact data (e.g. an index), built once per artifact version."""
+        cache_key = "{}#{}".format(artifact_path, name)
+        signature = self._file_signature(artifact_path)
+        entry = self._entries.get(cache_key)
+        if entry and entry[0] == signature:
+            return entry[1]
+
+        derived_data = builder(self.get(artifact_path, loader=loader))
+        self._entries[cache_key] = (signature, derived_data)
+        return derived_data
+
+    def invalidate(self, artifact_path=None) -> None:
+        """Drop cached data for a single artifact (and its derived values), or everything if no path given."""
+        if artifact_path is None:
+            self._entries.clear()
+            return
+        cache_key = str(artifact_path)
+        for key in list(self._entries):
+            if key == cache_key or key.startswith(cache_key + "#"):
+                del self._entries[key]
+
+    @staticmethod
+    def _file_signature(artifact_path) -> Tuple[int, int]:
+        file_stat = os.stat(artifact_path)
+        return file_stat.st_mtime_ns, file_stat.st_size
+
+
+class ManifestIndex:
+    """Lookup tables over the nodes, sources and exposures of a parsed dbt manifest."""
+
+    def __init__(self, manifest_data: dict):
+        self.nodes: Dict[str, dict] = dict()
+        self.by_resource_type: Dict[str, List[str]] = defaultdict(list)
+        self.by_package: Dict[str, List[str]] = defaultdict(list)
+        self.by_path: Dict[str, List[str]] = defaultdict(list)
+        self.by_tag: Dict[str, List[str]] = defaultdict(list)
+        self.by_name: Dict[str, List[str]] = defaultdict(list)
+
+        for section in MANIFEST_NODE_SECTIONS:
+            for unique_id, node in (manifest_data.get(section) or {}).items():
+                self._add_node(unique_id, node)
+        self.properties: Dict[str, Any] = {
+            key: value
+            for key, value in manifest_data.items()
+            if key not in MANIFEST_NODE_SECTIONS
+        }
+
+        self.parent_map: Dict[str, List[str]] = (
+            manifest_data.get("parent_map") or self._build_parent_map()
+        )
+        self.child_map: Dict[str, List[str]] = manifest_data.get(
+            "child_map"
+        ) or self._build_child_map(self.parent_map)
+
+    def __contains__(self, unique_id: str) -> bool:
+        return unique_id in self.nodes
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def get(self, unique_id: str) -> Optional[dict]:
+        return self.nodes.get(unique_id)
+
+    def property(self, key: str) -> Any:
+        """Return a top-level manifest property other than nodes, sources and exposures (e.g. `metadata`)."""
+        return self.properties.get(key)
+
+    def unique_ids_of_type(
+        self, resource_type: str, packages: Optional[Collection[str]] = None
+    ) -> List[str]:
+        """Return the unique_ids of nodes of a resource type, optionally only those in the given packages."""
+        unique_ids = self.by_resource_type.get(resource_type, [])
+        if not packages:
+            return list(unique_ids)
+        package_ids = set().union(
+            *(self.by_package.get(package_name, ()) for package_name in packages)
+        )
+        return [unique_id for unique_id in unique_ids if unique_id in package_ids]
+
+    def nodes_of_type(self, resource_type: str) -> List[dict]:
+        return self._resolve(self.by_resource_type.get(resource_type, ()))
+
+    def nodes_in_package(self, package_name: str) -> List[dict]:
+        return self._resolve(self.by_package.get(package_name, ()))
+
+    def nodes_at_path(self, file_path: str) -> List[dict]:
+        return self._resolve(self.by_path.get(os.path.normpath(file_path), ()))
+
+    def nodes_with_tag(self, tag: str) -> List[dict]:
+        return self._resolve(self.by_tag.get(tag, ()))
+
+    def nodes_named(self, name: str) -> List[dict]:
+        return self._resolve(self.by_name.get(name, ()))
+
+    def parents(self, unique_id: str) -> List[str]:
+        return self.parent_map.get(unique_id, [])
+
+    def children(self, unique_id: str) -> List[str]:
+        return self.child_map.get(unique_id, [])
+
+    def _add_node(self, unique_id: str, node: dict) -> None:
+        self.nodes[unique_id] = node
+        self.by_resource_type[
+            node.get("resource_type") or unique_id.split(".", 1)[0]
+        ].append(unique_id)
+        if node.get("package_name"):
+            self.by_package[node["package_name"]].append(unique_id)
+        if node.get("original_file_path"):
+            self.by_path[os.path.normpath(node["original_file_path"])].append(unique_id)
+        if node.get("name"):
+            self.by_name[node["name"]].append(unique_id)
+        for tag in node.get("tags") or ():
+            self.by_tag[tag].append(unique_id)
+
+    def _build_parent_map(self) -> Dict[str, List[str]]:
+        """Build the parent map from node dependencies, for manifests written without one."""
+        return {
+            unique_id: list((node.get("depends_on") or {}).get("nodes") or ())
+            for unique_id, node in self.nodes.items()
+        }
+
+    @staticmethod
+    def _build_child_map(parent_map: Dict[str, List[str]]) -> Dict[str, List[str]]:
+        child_map: Dict[str, List[str]] = {unique_id: [] for unique_id in parent_map}
+        for unique_id, parent_ids in parent_map.items():
+            for parent_id in parent_ids:
+                child_map.setdefault(parent_id, []).append(unique_id)
+        return child_map
+
+    def _resolve(self, unique_ids: Iterable[str]) -> List[dict]:
+        return [self.nodes[unique_id] for unique_id in unique_ids]
+
+
+class ArtifactSnapshot:
+    """On-disk SQLite snapshot of a parsed artifact, keyed by node unique_id and queried lazily.
+
+    The snapshot lives in a `dbtea` directory inside the dbt target path and records the size, mtime and SHA-256 of
+    the artifact it was built from, so later runs can answer node lookups without parsing the JSON artifact at all.
+    Lookup methods mirror `ManifestIndex`.
+    """
+
+    def __init__(self, artifact_path, connection: sqlite3.Connection):
+        self.artifact_path = Path(artifact_path)
+        self._connection = connection
+        self._parent_map: Optional[Dict[str, List[str]]] = None
+        self._child_map: Optional[Dict[str, List[str]]] = None
+
+    @staticmethod
+    def snapshot_path_for(artifact_path) -> Path:
+        artifact_path = Path(artifact_path)
+        return artifact_path.parent / SNAPSHOT_DIRECTORY / (artifact_path.name + ".db")
+
+    @classmethod
+    def load(cls, artifact_path) -> Optional["ArtifactSnapshot"]:
+        """Open the snapshot for an artifact, or return None if it is missing or was built from different content."""
+        snapshot_path = cls.snapshot_path_for(artifact_path)
+        if not snapshot_path.is_file():
+            return None
+
+        connection = sqlite3.connect(str(snapshot_path), check_same_thread=False)
+        try:
+            source = dict(connection.execute("SELECT key, value FROM snapshot_source"))
+            if cls._source_matches(artifact_path, source, connection):
+                return cls(artifact_path, connection)
+        except sqlite3.DatabaseError as error:
+            logger.debug(
+                "Ignoring unreadable artifact snapshot {}: {}".format(
+                    snapshot_path, error
+                )
+            )
+        connection.close()
+        return None
+
+    @classmethod
+    def write(cls, artifact_path, artifact_data: dict) -> Path:
+        """Build the snapshot for parsed artifact data, atomically replacing any previous snapshot."""
+        snapshot_path = cls.snapshot_path_for(artifact_path)
+        snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path = snapshot_path.with_name(
+            snapshot_path.name + ".{}.tmp".format(os.getpid())
+        )
+        if temporary_path.exists():
+            temporary_path.unlink()
+
+        artifact_stat = os.stat(artifact_path)
+        index = ManifestIndex(artifact_data)
+        node_sections = {
+            unique_id: section
+            for section in MANIFEST_NODE_SECTIONS
+            for unique_id in (artifact_data.get(section) or {})
+        }
+
+        connection = sqlite3.connect(str(temporary_path))
+        try:
+            connection.executescript(SNAPSHOT_SCHEMA)
+            connection.executemany(
+                "INSERT INTO snapshot_source (key, value) VALUES (?, ?)",
+                [
+                    ("format_version", SNAPSHOT_FORMAT_VERSION),
+                    ("size", str(artifact_stat.st_size)),
+                    ("mtime_ns", str(artifact_stat.st_mtime_ns)),
+                    ("sha256", _file_sha256(artifact_path)),
+                ],
+            )
+            connection.executemany(
+                "INSERT INTO properties (key, data) VALUES (?, ?)",
+                (
+                    (key, _compact_json(value))
+                    for key, value in artifact_data.items()
+                    if key not in MANIFEST_NODE_SECTIONS
+                ),
+            )
+            connection.executemany(
+                "INSERT INTO nodes VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        unique_id,
+                        node_sections[unique_id],
+                        node.get("resource_type") or unique_id.split(".", 1)[0],
+                        node.get("package_name"),
+                        (
+                            os.path.normpath(node["original_file_path"])
+                            if node.get("original_file_path")
+                            else None
+                        ),
+                        node.get("name"),
+                        _compact_json(node),
+                    )
+                    for unique_id, node in index.nodes.items()
+                ),
+            )
+            connection.executemany(
+                "INSERT INTO node_tags (tag, unique_id) VALUES (?, ?)",
+                (
+                    (tag, unique_id)
+                    for tag, unique_ids in index.by_tag.items()
+                    for unique_id in unique_ids
+                ),
+            )
+            connection.executemany(
+                "INSERT INTO edges (parent_id, child_id) VALUES (?, ?)",
+                (
+                    (parent_id, unique_id)
+                    for unique_id, parent_ids in index.parent_map.items()
+                    for parent_id in parent_ids
+                ),
+            )
+            connection.executescript(SNAPSHOT_INDEXES)
+            connection.commit()
+        finally:
+            connection.close()
+
+        os.replace(temporary_path, snapshot_path)
+        logger.debug("Wrote artifact snapshot {}".format(snapshot_path))
+        return snapshot_path
+
+    def __contains__(self, unique_id: str) -> bool:
+        return bool(
+            self._connection.execute(
+                "SELECT 1 FROM nodes WHERE unique_id = ?", (unique_id,)
+            ).fetchone()
+        )
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM nodes").fetchone()[0]
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def is_fresh(self) -> bool:
+        """Return true if the artifact on disk still matches the snapshot, hashing only if its mtime changed."""
+        try:
+            source = dict(
+                self._connection.execute("SELECT key, value FROM snapshot_source")
+            )
+            return self._source_matches(self.artifact_path, source, self._connection)
+        except (OSError, sqlite3.DatabaseError):
+            return False
+
+    @property
+    def nodes(self) -> "SnapshotNodes":
+        return SnapshotNodes(self)
+
+    @property
+    def parent_map(self) -> Dict[str, List[str]]:
+        """Parent unique_ids of every node, read from the snapshot's edges once and kept for later lookups."""
+        if self._parent_map is None:
+            parent_map: Dict[str, List[str]] = {
+                unique_id: []
+                for (unique_id,) in self._connection.execute(
+                    "SELECT unique_id FROM nodes ORDER BY rowid"
+                )
+            }
+            for parent_id, child_id in self._connection.execute(
+                "SELECT parent_id, child_id FROM edges ORDER BY rowid"
+            ):
+                parent_map.setdefault(child_id, []).append(parent_id)
+            self._parent_map = parent_map
+        return self._parent_map
+
+    @property
+    def child_map(self) -> Dict[str, List[str]]:
+        if self._child_map is None:
+            self._child_map = ManifestIndex._build_child_map(self.parent_map)
+        return self._child_map
+
+    def get(self, unique_id: str) -> Optional[dict]:
+        row = self._connection.execute(
+            "SELECT data FROM nodes WHERE unique_id = ?", (unique_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def unique_ids_of_type(
+        self, resource_type: str, packages: Optional[Collection[str]] = None
+    ) -> List[str]:
+        condition, values = "resource_type = ?", [resource_type]
+        if packages:
+            condition += " AND package_name IN ({})".format(
+                ", ".join("?" for _ in packages)
+            )
+            values.extend(packages)
+        return [
+            row[0]
+            for row in self._connection.execute(
+                "SELECT unique_id FROM nodes WHERE {} ORDER BY rowid".format(
+                    condition
+                ),
+                values,  # nosec
+            )
+        ]
+
+    def property(self, key: str) -> Any:
+        """Return a top-level artifact property other than nodes, sources and exposures (e.g. `metadata`)."""
+        row = self._connection.execute(
+            "SELECT data FROM properties WHERE key = ?", (key,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def nodes_of_type(self, resource_type: str) -> List[dict]:
+        return self._select_nodes("resource_type = ?", resource_type)
+
+    def nodes_in_package(self, package_name: str) -> List[dict]:
+        return self._select_nodes("package_name = ?", package_name)
+
+    def nodes_at_path(self, file_path: str) -> List[dict]:
+        return self._select_nodes("original_file_path = ?", os.path.normpath(file_path))
+
+    def nodes_with_tag(self, tag: str) -> List[dict]:
+        return self._select_nodes(
+            "unique_id IN (SELECT unique_id FROM node_tags WHERE tag = ?)", tag
+        )
+
+    def nodes_named(self, name: str) -> List[dict]:
+        return self._select_nodes("name = ?", name)
+
+    def parents(self, unique_id: str) -> List[str]:
+        return [
+            row[0]
+            for row in self._connection.execute(
+                "SELECT parent_id FROM edges WHERE child_id = ? ORDER BY rowid",
+                (unique_id,),
+            )
+        ]
+
+    def children(self, unique_id: str) -> List[str]:
+        return [
+            row[0]
+            for row in self._connection.execute(
+                "SELECT child_id FROM edges WHERE parent_id = ? ORDER BY rowid",
+                (unique_id,),
+            )
+        ]
+
+    def _select_nodes(self, condition: str, value: str) -> List[dict]:
+        return [
+            json.loads(row[0])
+            for row in self._connection.execute(
+                "SELECT data FROM nodes WHERE {} ORDER BY rowid".format(condition),
+                (value,),  # nosec
+            )
+        ]
+
+    @staticmethod
+    def _source_matches(
+        artifact_path, source: Dict[str, str], connection: sqlite3.Connection
+    ) -> bool:
+        if source.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+            return False
+        artifact_stat = os.stat(artifact_path)
+        if str(artifact_stat.st_size) != source.get("size"):
+            return False
+        if str(artifact_stat.st_mtime_ns) == source.get("mtime_ns"):
+            return True
+        if _file_sha256(artifact_path) != source.get("sha256"):
+            return False
+
+        # Same content with a new mtime (e.g. a fresh checkout): record the mtime to skip hashing next time
+        try:
+            connection.execute(
+                "UPDATE snapshot_source SET value = ? WHERE key = 'mtime_ns'",
+                (str(artifact_stat.st_mtime_ns),),
+            )
+            connection.commit()
+        except sqlite3.DatabaseError:
+            connection.rollback()
+        return True
+
+
+class SnapshotNodes(Mapping):
+    """Read-only mapping of unique_id to node over an artifact snapshot, decoding nodes only as they are read."""
+
+    def __init__(self, snapshot: ArtifactSnapshot):
+        self._snapshot = snapshot
+
+    def __getitem__(self, unique_id: str) -> dict:
+        node = self._snapshot.get(unique_id)
+        if node is None:
+            raise KeyError(unique_id)
+        return node
+
+    def __contains__(self, unique_id) -> bool:
+        return unique_id in self._snapshot
+
+    def __iter__(self) -> Iterator[str]:
+        for (unique_id,) in self._snapshot._connection.execute(
+            "SELECT unique_id FROM nodes ORDER BY rowid"
+        ):
+            yield unique_id
+
+    def __len__(self) -> int:
+        return len(self._snapshot)
+
+    def items(self) -> "SnapshotNodeItems":
+        return SnapshotNodeItems(self)
+
+
+class SnapshotNodeItems(ItemsView):
+    """Items of `SnapshotNodes`, read in a single query rather than one lookup per node."""
+
+    def __iter__(self) -> Iterator[Tuple[str, dict]]:
+        for unique_id, data in self._mapping._snapshot._connection.execute(
+            "SELECT unique_id, data FROM nodes ORDER BY rowid"
+        ):
+            yield unique_id, json.loads(data)
+
+
+def as_manifest_index(
+    manifest: Union[dict, ManifestIndex, ArtifactSnapshot]
+) -> Union[ManifestIndex, ArtifactSnapshot]:
+    """Return a manifest index or snapshot as is, or index parsed manifest data."""
+    if isinstance(manifest, (ManifestIndex, ArtifactSnapshot)):
+        return manifest
+    return ManifestIndex(manifest)
+
+
+def iter_artifact_entries(
+    artifact_path,
+    section: str = "nodes",
+    resource_types: Optional[Collection[str]] = None,
+    packages: Optional[Collection[str]] = None,
+    path_prefix: Optional[str] = None,
+) -> Iterator[Tuple[str, dict]]:
+    """Stream (unique_id, node) entries from a section of a manifest or catalog artifact, one entry at a time.
+
+    Resource type and package filters are checked against the unique_id before an entry is decoded, so entries they
+    reject are never materialized. The path prefix filter checks each entry's `original_file_path`, which catalog
+    entries do not have.
+    """
+    if section not in STREAMABLE_ARTIFACT_SECTIONS:
+        raise DbteaException(
+            name="invalid-artifact-section",
+            title="Artifact section cannot be streamed",
+            detail="Artifact section {} is not streamable, choose one of: {}".format(
+                section, STREAMABLE_ARTIFACT_SECTIONS
+            ),
+        )
+
+    def unique_id_filter(unique_id: str) -> bool:
+        resource_type, _, remainder = unique_id.partition(".")
+        if resource_types and resource_type not in resource_types:
+            return False
+        if packages and remainder.partition(".")[0] not in packages:
+            return False
+        return True
+
+    normalized_prefix = os.path.normpath(path_prefix) if path_prefix else None
+    for unique_id, node in utils.stream_json_object_items(
+        str(artifact_path),
+        section,
+        key_filter=unique_id_filter if resource_types or packages else None,
+    ):
+        if normalized_prefix and not os.path.normpath(
+            node.get("original_file_path") or ""
+        ).startswith(normalized_prefix):
+            continue
+        yield unique_id, node
+
+
+def _compact_json(data: Any) -> str:
+    return json.dumps(data, separators=(",", ":"))
+
+
+def _file_sha256(file_path, block_size: int = 1024 * 1024) -> str:
+    file_hash = hashlib.sha256()
+    with open(file_path, "rb") as file_stream:
+        for block in iter(lambda: file_stream.read(block_size), b""):
+            file_hash.update(block)
+    return file_hash.hexdigest()
@@ -2,14 +2,16 @@ import argparse
 import logging
 import os
 import sys
-from typing import Callable
+from typing import Callable, List, Optional
 
+import dbtea.instrumentation as instrumentation
 import dbtea.utils as utils
-from dbtea.config import PROFILES_DIR, DbteaConfig
+from dbtea import __version__
+from dbtea.clients.dbt_commands import DBT_NODE_SELECTION_FLAGS
+from dbtea.config import DEFAULT_DBTEA_CONFIG, PROFILES_DIR, DbteaConfig
 from dbtea.exceptions import DbteaException
 from dbtea.logger import DBTEA_LOGGER as logger
 from dbtea.version import check_installed_python_version, check_installed_dbt_version, get_dbtea_version_info
-from dbtea.clients.bi.looker import LookmlProject
 
 
 class EnvVarAction(argparse.Action):
@@ -71,6 +73,19 @@ def _build_base_subparser() -> argparse.ArgumentParser:
         default="logs",
         help="The directory that dbtea will write logs to.",
     )
+    base_subparser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always fetch fresh data from external APIs and rescan directories instead of using dbtea's on-disk "
+        "caches.",
+    )
+    base_subparser.add_argument(
+        "--profile",
+        type=str,
+        metavar="OUTPUT_PATH",
+        help="Profile the command, log where its time went and write the profile to OUTPUT_PATH: a Chrome trace for "
+        "a .json path (open in chrome://tracing or Perfetto), otherwise a cProfile pstats file.",
+    )
 
     return base_subparser
 
@@ -120,26 +135,721 @@ def create_parser() -> argparse.ArgumentParser:
         prog="dbtea", description="Manage and administer dbt"
     )
     parser.add_argument(
-        "--version", action="version", version="0.1.0", help="Current dbtea version"
+        "--version", action="version", version=__version__, help="Current dbtea version"
     )
-    # subparser_action = parser.add_subparsers(
-    #     title="Available sub-commands", dest="command"
-    # )
-    #
-    # base_subparser = _build_base_subparser()
+    subparser_action = parser.add_subparsers(
+        title="Available sub-commands", dest="command"
+    )
+
+    base_subparser = _build_base_subparser()
+    _build_lookml_subparser(subparser_action, base_subparser)
+    _build_multi_subparser(subparser_action, base_subparser)
+    _build_perf_subparser(subparser_action, base_subparser)
+    _build_critical_path_subparser(subparser_action, base_subparser)
+    _build_affected_subparser(subparser_action, base_subparser)
 
     return parser
 
 
+def _build_lookml_subparser(
+    subparser_action: argparse._SubParsersAction,
+    base_subparser: argparse.ArgumentParser,
+) -> None:
+    """Adds the subparser for the subcommand `lookml` and its own subcommands.
+    Args:
+        subparser_action: Subparsers action of the top-level parser.
+        base_subparser: Base subparser with arguments shared by every subcommand.
+    """
+    lookml_parser = subparser_action.add_parser(
+        "lookml", help="Generate and manage LookML from dbt metadata."
+    )
+    lookml_subparser_action = lookml_parser.add_subparsers(
+        title="Available lookml sub-commands", dest="lookml_command"
+    )
+
+    sync_parser = lookml_subparser_action.add_parser(
+        "sync",
+        parents=[base_subparser],
+        help="Write a LookML view per dbt model from the dbt manifest and catalog.",
+    )
+    sync_parser.add_argument(
+        "--project-dir",
+        type=str,
+        default=None,
+        help="Base directory of the dbt project. Default: closest dbt project to the current directory",
+    )
+    sync_parser.add_argument(
+        "--output-dir",
+        type=str,
+        required=True,
+        help="Directory of the Looker project to write `.view.lkml` files to.",
+    )
+    sync_parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only rewrite views whose dbt model, columns or previously generated file changed since the last sync.",
+    )
+    sync_parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of processes used to generate LookML views. Default: generate serially",
+    )
+
+    diff_parser = lookml_subparser_action.add_parser(
+        "diff",
+        parents=[base_subparser],
+        help="Report LookML views whose fields drifted from the columns of their dbt model.",
+    )
+    diff_parser.add_argument(
+        "--project-dir",
+        type=str,
+        default=None,
+        help="Base directory of the dbt project. Default: closest dbt project to the current directory",
+    )
+    diff_parser.add_argument(
+        "--lookml-dir",
+        type=str,
+        required=True,
+        help="Root directory of the local Looker project to compare with the dbt project.",
+    )
+    diff_parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of processes used to parse LookML view files. Default: parse serially",
+    )
+    diff_parser.add_argument(
+        "--fail-on-drift",
+        action="store_true",
+        help="Exit with a non-zero status if any view drifted from its dbt model.",
+    )
+
+    fetch_parser = lookml_subparser_action.add_parser(
+        "fetch",
+        parents=[base_subparser],
+        help="Fetch metadata, files and git branch state of Looker projects via the Looker API.",
+    )
+    fetch_parser.add_argument(
+        "project_ids", nargs="+", help="IDs of the Looker projects to fetch."
+    )
+    fetch_parser.add_argument(
+        "--looker-config-path",
+        action=EnvVarAction,
+        env_var="DBTEA_LOOKER_CONFIG_PATH",
+        default=None,
+        help="Path to the Looker SDK config (looker.ini) file. Default: ~/.dbt/looker.ini",
+    )
+    fetch_parser.add_argument(
+        "--looker-config-section",
+        type=str,
+        default="looker",
+        help="Section of the Looker SDK config file holding the API credentials. Default: looker",
+    )
+    fetch_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        help="Maximum number of concurrent Looker API requests. Default: 8",
+    )
+
+
+def _build_multi_subparser(
+    subparser_action: argparse._SubParsersAction,
+    base_subparser: argparse.ArgumentParser,
+) -> None:
+    """Adds the subparser for the subcommand `multi`.
+    Args:
+        subparser_action: Subparsers action of the top-level parser.
+        base_subparser: Base subparser with arguments shared by every subcommand.
+    """
+    multi_parser = subparser_action.add_parser(
+        "multi",
+        parents=[base_subparser],
+        help="Run a dbt command across many dbt projects concurrently.",
+    )
+    project_selection = multi_parser.add_mutually_exclusive_group(required=True)
+    project_selection.add_argument(
+        "--project-dirs",
+        nargs="+",
+        help="Base directories of the dbt projects to run the command in.",
+    )
+    project_selection.add_argument(
+        "--discover",
+        nargs="?",
+        const=".",
+        metavar="ROOT",
+        help="Run the command in every dbt project found below ROOT (default: current directory), skipping "
+        "git-ignored directories, target and dbt_modules.",
+    )
+    multi_parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Maximum number of projects to run the command in at once. Default: 4",
+    )
+    multi_parser.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help="Stop running and skip remaining projects as soon as one project's command fails.",
+    )
+    multi_parser.add_argument(
+        "dbt_command",
+        nargs=argparse.REMAINDER,
+        help="dbt command and arguments to run, e.g. `run --models tag:daily`.",
+    )
+
+
+def _build_perf_subparser(
+    subparser_action: argparse._SubParsersAction,
+    base_subparser: argparse.ArgumentParser,
+) -> None:
+    """Adds the subparser for the subcommand `perf`.
+    Args:
+        subparser_action: Subparsers action of the top-level parser.
+        base_subparser: Base subparser with arguments shared by every subcommand.
+    """
+    perf_parser = subparser_action.add_parser(
+        "perf",
+        parents=[base_subparser],
+        help="Report model run time statistics and trends from historical dbt run results.",
+    )
+    perf_parser.add_argument(
+        "paths",
+        nargs="*",
+        help="run_results.json files, zip/tar archives of them, or directories to search. "
+        "Default: the target directory of the dbt project",
+    )
+    perf_parser.add_argument(
+        "--project-dir",
+        type=str,
+        default=None,
+        help="Base directory of the dbt project. Default: closest dbt project to the current directory",
+    )
+    perf_parser.add_argument(
+        "--top",
+        type=int,
+        default=5,
+        help="Number of slowest and fastest-regressing models to report. Default: 5",
+    )
+    perf_parser.add_argument(
+        "--sort-by",
+        choices=["p50", "p95", "max", "mean", "latest", "total"],
+        default="total",
+        help="Statistic used to rank the slowest models. Default: total",
+    )
+    perf_parser.add_argument(
+        "--timing",
+        choices=["execution", "compile", "execute"],
+        default="execution",
+        help="Duration to analyze: dbt's execution time or its compile/execute step. Default: execution",
+    )
+    perf_parser.add_argument(
+        "--resource-types",
+        nargs="+",
+        default=["model"],
+        help="dbt resource types to include. Default: model",
+    )
+    perf_parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Write statistics for every node to a .csv or .parquet file.",
+    )
+
+
+def run_perf(
+    paths: List[str],
+    project_dir: Optional[str],
+    top: int,
+    sort_by: str,
+    timing: str,
+    resource_types: List[str],
+    output: Optional[str],
+) -> None:
+    """Report the slowest and fastest-regressing dbt models across historical runs."""
+    from dbtea.perf import PerfReport, load_run_results_history
+
+    if not paths:
+        project_directory = utils.fetch_dbt_project_directory(project_dir)
+        project_data = utils.parse_yaml_file(
+            utils.assemble_path(project_directory, utils.DBT_PROJECT_FILE)
+        )
+        paths = [
+            str(
+                utils.assemble_path(
+                    project_directory, project_data.get("target-path", "target")
+                )
+            )
+        ]
+
+    history = load_run_results_history(paths, resource_types=resource_types)
+    perf_report = PerfReport.from_history(history, timing=timing)
+    slowest = perf_report.slowest(top, column="{}_seconds".format(sort_by))
+    logger.info(
+        "Slowest {} by {} duration:\n{}".format(
+            ", ".join(resource_types), sort_by, slowest.format_table()
+        )
+    )
+    regressions = perf_report.regressions(top)
+    if len(regressions):
+        logger.info("Fastest growing durations:\n{}".format(regressions.format_table()))
+    if output:
+        perf_report.write(output)
+
+
+def _build_critical_path_subparser(
+    subparser_action: argparse._SubParsersAction,
+    base_subparser: argparse.ArgumentParser,
+) -> None:
+    """Adds the subparser for the subcommand `critical-path`.
+    Args:
+        subparser_action: Subparsers action of the top-level parser.
+        base_subparser: Base subparser with arguments shared by every subcommand.
+    """
+    critical_path_parser = subparser_action.add_parser(
+        "critical-path",
+        parents=[base_subparser],
+        help="Find the dbt DAG's critical path and how run time scales with threads.",
+    )
+    critical_path_parser.add_argument(
+        "--project-dir",
+        type=str,
+        default=None,
+        help="Base directory of the dbt project. Default: closest dbt project to the current directory",
+    )
+    critical_path_parser.add_argument(
+        "--threads",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4, 8, 16, 32],
+        help="Thread counts to simulate the run with. Default: 1 2 4 8 16 32",
+    )
+    critical_path_parser.add_argument(
+        "--history",
+        nargs="+",
+        default=None,
+        help="Use median model durations from these run results files, archives or directories "
+        "instead of the last run's durations.",
+    )
+    critical_path_parser.add_argument(
+        "--top",
+        type=int,
+        default=5,
+        help="Maximum number of critical path models to recommend changes for. Default: 5",
+    )
+
+
+def run_critical_path(
+    project_dir: Optional[str],
+    threads: List[int],
+    history: Optional[List[str]],
+    top: int,
+) -> None:
+    """Report the critical path, simulated run times per thread count and idle time of the last run."""
+    from dbtea.clients.dbt import DbtProject
+    from dbtea.dag import (
+        DbtDag,
+        recommended_thread_count,
+        run_results_durations,
+        run_thread_utilization,
+    )
+
+    dbt_project = DbtProject.from_project_root(
+        utils.fetch_dbt_project_directory(project_dir)
+    )
+    run_results_data = dbt_project.run_results_artifact_data
+    if history:
+        from dbtea.perf import PerfReport
+
+        perf_report = PerfReport.from_history(
+            dbt_project.run_results_history(*history, resource_types=None)
+        )
+        durations = dict(
+            zip(perf_report.columns["unique_id"], perf_report.columns["p50_seconds"])
+        )
+    else:
+        durations = run_results_durations(run_results_data)
+
+    dbt_dag = DbtDag.from_manifest_index(dbt_project.manifest_index)
+    critical_path = dbt_dag.critical_path(durations)
+    logger.info(
+        "Critical path of {} nodes takes {} of {} total work (parallelism at most {:.1f}):".format(
+            len(critical_path.unique_ids),
+            utils.human_readable(critical_path.length_seconds) or "0 seconds",
+            utils.human_readable(critical_path.total_work_seconds) or "0 seconds",
+            critical_path.max_parallelism,
+        )
+    )
+    for unique_id, duration in zip(critical_path.unique_ids, critical_path.durations):
+        logger.info("  {:>8.1f}s  {}".format(duration, unique_id))
+
+    simulations = dbt_dag.parallelism_profile(durations, threads)
+    for simulation in simulations:
+        logger.info(
+            "{:>3} threads: run takes {:.1f}s, {:.1f}x speedup, {:.1f}s idle thread time".format(
+                simulation.threads,
+                simulation.makespan_seconds,
+                simulation.speedup,
+                simulation.idle_seconds,
+            )
+        )
+    logger.info(
+        "Fewest threads within 5% of the best simulated run time: {}".format(
+            recommended_thread_count(simulations)
+        )
+    )
+
+    utilization = run_thread_utilization(run_results_data)
+    logger.info(
+        "Last run: {} threads over {:.1f}s were {:.0%} busy, {:.1f}s idle thread time".format(
+            utilization.threads,
+            utilization.wall_seconds,
+            utilization.utilization,
+            utilization.idle_seconds,
+        )
+    )
+    for recommendation in dbt_dag.recommendations(critical_path, limit=top):
+        logger.info(
+            "{} ({:.1f}s, {:.0%} of critical path): {}".format(
+                recommendation.unique_id,
+                recommendation.duration_seconds,
+                recommendation.share_of_critical_path,
+                recommendation.suggestion,
+            )
+        )
+
+
+def _build_affected_subparser(
+    subparser_action: argparse._SubParsersAction,
+    base_subparser: argparse.ArgumentParser,
+) -> None:
+    """Adds the subparser for the subcommand `affected`.
+    Args:
+        subparser_action: Subparsers action of the top-level parser.
+        base_subparser: Base subparser with arguments shared by every subcommand.
+    """
+    affected_parser = subparser_action.add_parser(
+        "affected",
+        parents=[base_subparser],
+        help="Select dbt nodes affected by git changes, then optionally build them and regenerate their LookML.",
+    )
+    affected_parser.add_argument(
+        "--project-dir",
+        type=str,
+        default=None,
+        help="Base directory of the dbt project. Default: closest dbt project to the current directory",
+    )
+    affected_parser.add_argument(
+        "--base",
+        type=str,
+        default="main",
+        help="Git ref to compare against, usually the pull request's target branch. Default: main",
+    )
+    affected_parser.add_argument(
+        "--head",
+        type=str,
+        default=None,
+        help="Git ref with the changes. Default: the working tree, including uncommitted changes",
+    )
+    affected_parser.add_argument(
+        "--dbt-command",
+        choices=list(DBT_NODE_SELECTION_FLAGS),
+        default=None,
+        help="dbt command to run on the affected nodes only.",
+    )
+    affected_parser.add_argument(
+        "--lookml-output-dir",
+        type=str,
+        default=None,
+        help="Regenerate the LookML views of affected models in this Looker project directory.",
+    )
+
+
+def run_affected(
+    project_dir: Optional[str],
+    base: str,
+    head: Optional[str],
+    dbt_command: Optional[str],
+    lookml_output_dir: Optional[str],
+) -> None:
+    """Select nodes affected by the git diff, run dbt on them and regenerate their LookML views."""
+    from dbtea.clients.dbt import DbtProject
+    from dbtea.clients.git.diff import changed_files, select_affected_nodes
+
+    dbt_project = DbtProject.from_project_root(
+        utils.fetch_dbt_project_directory(project_dir)
+    )
+    manifest_index = dbt_project.manifest_index
+    selection = select_affected_nodes(
+        manifest_index,
+        changed_files(dbt_project.project_root, base, head_ref=head),
+        macros=manifest_index.property("macros"),
+    )
+    selectors = selection.dbt_selectors(manifest_index)
+    if not selectors:
+        logger.info("No dbt nodes are affected by changes since {}".format(base))
+        return
+    logger.info("Affected dbt nodes: {}".format(" ".join(selectors)))
+
+    if dbt_command:
+        run_dbt_command = getattr(dbt_project, "run_dbt_{}".format(dbt_command))
+        run_dbt_command(**selection.dbt_command_options(manifest_index, dbt_command))
+
+    if lookml_output_dir:
+        from dbtea.clients.bi.looker.sync import sync_lookml_views
+
+        try:
+            catalog_data = dbt_project.catalog_artifact_data
+        except DbteaException:
+            catalog_data = None
+        sync_result = sync_lookml_views(
+            manifest_index,
+            catalog_data,
+            lookml_output_dir,
+            incremental=False,
+            packages={dbt_project.project_name},
+            unique_ids=None
+            if selection.full_build
+            else selection.nodes_of_type(manifest_index, "model"),
+            type_mapper=_lookml_type_mapper(manifest_index),
+        )
+        logger.info("LookML views of affected models synced: {}".format(sync_result))
+
+
+def run_multi(
+    project_dirs: Optional[List[str]],
+    dbt_command: List[str],
+    workers: int,
+    fail_fast: bool,
+    discover_root: Optional[str] = None,
+    no_cache: bool = False,
+) -> None:
+    """Run a dbt command across projects, exiting with an error if any project's command failed."""
+    from dbtea.clients.dbt_scheduler import run_dbt_command_across_projects
+
+    if dbt_command and dbt_command[0] == "--":
+        dbt_command = dbt_command[1:]
+    if not dbt_command:
+        raise DbteaException(
+            name="missing-dbt-command",
+            title="No dbt command specified",
+            detail="Specify the dbt command to run after the options, e.g. `dbtea multi --project-dirs a b -- run`",
+        )
+    if discover_root:
+        from dbtea.discovery import discover_dbt_projects
+
+        project_dirs = discover_dbt_projects(discover_root, use_cache=not no_cache)
+        if not project_dirs:
+            raise DbteaException(
+                name="no-dbt-projects-found",
+                title="No dbt projects found",
+                detail="No dbt_project.yml file found below {}".format(discover_root),
+            )
+        logger.info("Discovered {} dbt projects below {}".format(len(project_dirs), discover_root))
+
+    results = run_dbt_command_across_projects(
+        project_dirs,
+        ["dbt"] + dbt_command,
+        max_workers=workers,
+        fail_fast=fail_fast,
+    )
+    failed_projects = [result.project_label for result in results if not result.succeeded]
+    if failed_projects:
+        logger.error("dbt command did not succeed in: {}".format(", ".join(failed_projects)))
+        sys.exit(1)
+
+
+def run_lookml_fetch(
+    project_ids: List[str],
+    looker_config_path: Optional[str],
+    looker_config_section: str,
+    concurrency: int,
+    no_cache: bool,
+) -> None:
+    """Fetch and summarize Looker project files and git branch state for each project."""
+    from dbtea.clients.bi.looker.api import LookerApiClient
+    from dbtea.clients.bi.looker.cache import ResponseCache
+
+    api_client = LookerApiClient.from_config_file(
+        looker_config_path,
+        looker_config_section,
+        max_concurrency=concurrency,
+        response_cache=None if no_cache else ResponseCache(),
+    )
+    try:
+        projects_data = api_client.fetch_projects(
+            project_ids, resources=("project", "files", "git_branch")
+        )
+    finally:
+        api_client.close()
+
+    for project_id, project_data in projects_data.items():
+        logger.info(
+            "Looker project {}: {} files on git branch {}".format(
+                project_id,
+                len(project_data["files"] or []),
+                (project_data["git_branch"] or {}).get("name"),
+            )
+        )
+
+
+def _lookml_type_mapper(manifest_index):
+    """Return the LookML type mapper configured in the dbtea config, for the warehouse the manifest was built on."""
+    from dbtea.clients.bi.looker.types import LookmlTypeMapper
+
+    dbtea_config_path = utils.assemble_path(PROFILES_DIR, DEFAULT_DBTEA_CONFIG)
+    dbtea_config_data = (
+        utils.parse_yaml_file(dbtea_config_path)
+        if utils.file_exists(dbtea_config_path)
+        else None
+    )
+    return LookmlTypeMapper.from_config(
+        dbtea_config_data,
+        adapter=(manifest_index.property("metadata") or {}).get("adapter_type"),
+    )
+
+
+def run_lookml_sync(
+    project_dir: str, output_dir: str, incremental: bool, workers: int
+) -> None:
+    """Sync LookML views in the output directory with the models of the dbt project."""
+    from dbtea.clients.bi.looker.sync import sync_lookml_views
+    from dbtea.clients.dbt import DbtProject
+
+    dbt_project = DbtProject.from_project_root(
+        utils.fetch_dbt_project_directory(project_dir)
+    )
+    manifest_index = dbt_project.manifest_index
+    sync_result = sync_lookml_views(
+        manifest_index,
+        dbt_project.catalog_artifact_data,
+        output_dir,
+        incremental=incremental,
+        packages={dbt_project.project_name},
+        workers=workers,
+        type_mapper=_lookml_type_mapper(manifest_index),
+    )
+    logger.info("LookML sync complete: {}".format(sync_result))
+
+
+def run_lookml_diff(
+    project_dir: str,
+    lookml_dir: str,
+    workers: Optional[int],
+    fail_on_drift: bool,
+    no_cache: bool,
+) -> None:
+    """Report drift between the views of a local Looker project and the models of the dbt project."""
+    from dbtea.clients.bi.looker.drift import diff_lookml_project
+    from dbtea.clients.bi.looker.project_index import LookmlProjectIndex
+    from dbtea.clients.dbt import DbtProject
+
+    dbt_project = DbtProject.from_project_root(
+        utils.fetch_dbt_project_directory(project_dir)
+    )
+    manifest_index = dbt_project.manifest_index
+    try:
+        catalog_data = dbt_project.catalog_artifact_data
+    except DbteaException:
+        catalog_data = None
+    drift_report = diff_lookml_project(
+        LookmlProjectIndex.load(lookml_dir, use_cache=not no_cache),
+        manifest_index,
+        catalog_data,
+        packages={dbt_project.project_name},
+        type_mapper=_lookml_type_mapper(manifest_index),
+        workers=workers,
+    )
+    for view_drift in drift_report.drifted_views:
+        logger.info(str(view_drift))
+    if drift_report.models_without_views:
+        logger.info(
+            "dbt models without a LookML view: {}".format(
+                ", ".join(drift_report.models_without_views)
+            )
+        )
+    logger.info("LookML diff complete: {}".format(drift_report))
+    if fail_on_drift and drift_report.drifted_views:
+        sys.exit(1)
+
+
 def main():
     """Execute dbtea, the primary entrypoint."""
+    # Parse arguments first so `--help` and `--version` exit before dbt is imported for the version checks
+    parser = create_parser()
+    args = parser.parse_args()
+
     get_dbtea_version_info()
     check_installed_python_version()
     check_installed_dbt_version()
 
-    parser = create_parser()
-    args = parser.parse_args()
-    # print(args)
+    if getattr(args, "profile", None):
+        with instrumentation.profile(args.profile):
+            run_command(parser, args)
+    else:
+        run_command(parser, args)
+
+
+def run_command(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    """Run the subcommand selected by the parsed command line arguments."""
+    if args.command == "multi":
+        run_multi(
+            args.project_dirs,
+            args.dbt_command,
+            args.workers,
+            args.fail_fast,
+            args.discover,
+            args.no_cache,
+        )
+        return
+    if args.command == "affected":
+        run_affected(
+            args.project_dir,
+            args.base,
+            args.head,
+            args.dbt_command,
+            args.lookml_output_dir,
+        )
+        return
+    if args.command == "critical-path":
+        run_critical_path(args.project_dir, args.threads, args.history, args.top)
+        return
+    if args.command == "perf":
+        run_perf(
+            args.paths,
+            args.project_dir,
+            args.top,
+            args.sort_by,
+            args.timing,
+            args.resource_types,
+            args.output,
+        )
+        return
+    if args.command == "lookml":
+        if args.lookml_command == "sync":
+            run_lookml_sync(
+                args.project_dir, args.output_dir, args.incremental, args.workers
+            )
+        elif args.lookml_command == "diff":
+            run_lookml_diff(
+                args.project_dir,
+                args.lookml_dir,
+                args.workers,
+                args.fail_on_drift,
+                args.no_cache,
+            )
+        elif args.lookml_command == "fetch":
+            run_lookml_fetch(
+                args.project_ids,
+                args.looker_config_path,
+                args.looker_config_section,
+                args.concurrency,
+                args.no_cache,
+            )
+        else:
+            parser.parse_args(["lookml", "--help"])
+        return
 
     dbtea_config = DbteaConfig(replace_config_if_exists=False, dbt_project="4_mile_bq_sample",
                                looker_project="4_mile_analytics", looker_config_path="",
@@ -149,6 +859,8 @@ def main():
     # print(dbtea_config.config_data.get("default_project"))
 
     if dbtea_config.config_data.get(default_project):
+        from dbtea.clients.bi.looker import LookmlProject
+
         project_config_data = dbtea_config.config_data.get(default_project)
         print(project_config_data)
         lookml_project_id = project_config_data.get("lookml_project_name")
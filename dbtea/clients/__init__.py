@@ -1 +1,19 @@
-from dbtea.clients.dbt import DbtProject
+import importlib
+
+# Clients pull in dbt, lkml and the Looker SDK, so only import each one when it is first used
+_LAZY_ATTRIBUTES = {
+    "AsyncDbtProject": "dbtea.clients.dbt_async",
+    "DbtProject": "dbtea.clients.dbt",
+    "LookmlProject": "dbtea.clients.bi.looker.base",
+    "LookmlProjectIndex": "dbtea.clients.bi.looker.project_index",
+    "LookmlTypeMapper": "dbtea.clients.bi.looker.types",
+    "convert_to_lookml_data_type": "dbtea.clients.bi.looker.types",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRIBUTES:
+        return getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
@@ -1,2 +1,21 @@
-from dbtea.clients.bi.looker.base import LookmlProject
-from dbtea.clients.bi.looker.types import convert_to_lookml_data_type
+import importlib
+
+from dbtea.clients.bi.looker.types import LookmlTypeMapper, convert_to_lookml_data_type
+
+__all__ = [
+    "LookmlProject",
+    "LookmlProjectIndex",
+    "LookmlTypeMapper",
+    "convert_to_lookml_data_type",
+]
+
+
+def __getattr__(name: str):
+    # LookmlProject pulls in lkml and the Looker SDK, so only import it when first used
+    if name == "LookmlProject":
+        return importlib.import_module("dbtea.clients.bi.looker.base").LookmlProject
+    if name == "LookmlProjectIndex":
+        return importlib.import_module(
+            "dbtea.clients.bi.looker.project_index"
+        ).LookmlProjectIndex
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
@@ -0,0 +1,307 @@
+"""
+Pooled, concurrent client for the Looker API.
+
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from configparser import ConfigParser
+from typing import Any, Callable, Dict, Iterable, List, Optional, TypeVar
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import dbtea.instrumentation as instrumentation
+import dbtea.utils as utils
+from dbtea.clients.bi.looker.cache import ResponseCache
+from dbtea.exceptions import LookerException
+from dbtea.logger import DBTEA_LOGGER as logger
+
+DEFAULT_LOOKER_API_VERSION = "3.1"
+DEFAULT_LOOKER_CONCURRENCY = 8
+DEFAULT_LOOKER_MAX_RETRIES = 3
+DEFAULT_LOOKER_BACKOFF_SECONDS = 0.5
+DEFAULT_LOOKER_TIMEOUT_SECONDS = 60
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+PROJECT_RESOURCES = ("project", "files", "git_branch", "validation")
+
+ResultType = TypeVar("ResultType")
+
+
+class LookerApiClient:
+    """Looker API client sharing one pooled HTTP session across a bounded pool of worker threads.
+
+    Requests are retried with exponential backoff on connection errors and retryable status codes, honouring the
+    `Retry-After` header on rate-limited (429) responses, and the access token is refreshed when it expires. With a
+    `response_cache`, GET responses are served from disk within their endpoint's TTL and revalidated with
+    `If-None-Match`/`If-Modified-Since` afterwards.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        client_id: str,
+        client_secret: str,
+        api_version: str = DEFAULT_LOOKER_API_VERSION,
+        verify_ssl: bool = True,
+        timeout: float = DEFAULT_LOOKER_TIMEOUT_SECONDS,
+        max_concurrency: int = DEFAULT_LOOKER_CONCURRENCY,
+        max_retries: int = DEFAULT_LOOKER_MAX_RETRIES,
+        backoff_seconds: float = DEFAULT_LOOKER_BACKOFF_SECONDS,
+        response_cache: Optional[ResponseCache] = None,
+    ):
+        self.api_url = "{}/api/{}".format(base_url.rstrip("/"), api_version)
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.verify_ssl = verify_ssl
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.response_cache = response_cache
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=max_concurrency, pool_maxsize=max_concurrency
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._access_token: Optional[str] = None
+        self._access_token_expires_at = 0.0
+        self._login_lock = threading.Lock()
+
+    @classmethod
+    def from_config_file(
+        cls,
+        config_file_path: Optional[str] = None,
+        config_section: str = "looker",
+        **kwargs
+    ) -> "LookerApiClient":
+        """Create a client from a Looker SDK style `looker.ini` file (default: ~/.dbt/looker.ini)."""
+        config_file_path = config_file_path or str(
+            utils.assemble_path(utils.get_home_dir(), ".dbt", "looker.ini")
+        )
+        config = ConfigParser()
+        if not config.read(config_file_path) or not config.has_section(config_section):
+            raise LookerException(
+                name="missing-looker-config",
+                title="Looker API config not found",
+                status=0,
+                detail="No section {} found in Looker config file {}".format(
+                    config_section, config_file_path
+                ),
+            )
+
+        section = config[config_section]
+        return cls(
+            base_url=section["base_url"],
+            client_id=section["client_id"],
+            client_secret=section["client_secret"],
+            api_version=section.get("api_version", DEFAULT_LOOKER_API_VERSION),
+            verify_ssl=section.getboolean("verify_ssl", True),
+            timeout=section.getfloat("timeout", DEFAULT_LOOKER_TIMEOUT_SECONDS),
+            **kwargs,
+        )
+
+    def close(self) -> None:
+        self.session.close()
+        if self.response_cache:
+            self.response_cache.close()
+
+    def login(self) -> str:
+        """Return a valid access token, logging in with the API credentials when there is none or it expired."""
+        with self._login_lock:
+            if self._access_token and time.monotonic() < self._access_token_expires_at:
+                return self._access_token
+
+            logger.debug("Logging in to Looker API at {}".format(self.api_url))
+            login_data = self._request_with_retries(
+                "POST",
+                "login",
+                authenticate=False,
+                data={"client_id": self.client_id, "client_secret": self.client_secret},
+            ).json()
+            self._access_token = login_data["access_token"]
+            # Refresh a little early so in-flight requests do not race the token's expiry
+            self._access_token_expires_at = (
+                time.monotonic() + float(login_data.get("expires_in", 3600)) - 60
+            )
+            return self._access_token
+
+    def request(self, method: str, path: str, **kwargs) -> Any:
+        """Send an authenticated API request and return its decoded JSON body."""
+        response = self._request_with_retries(method, path, authenticate=True, **kwargs)
+        return response.json() if response.content else None
+
+    def get(self, path: str, use_cache: bool = True, **kwargs) -> Any:
+        """Send a GET request, going through the response cache for cacheable endpoints."""
+        if not (use_cache and self.response_cache) or kwargs:
+            return self.request("GET", path, **kwargs)
+        if self.response_cache.ttl_for(path) is None:
+            return self.request("GET", path)
+
+        cache_key = "{} {}/{}".format(self.client_id, self.api_url, path.lstrip("/"))
+        cached_response = self.response_cache.lookup(cache_key)
+        if cached_response and self.response_cache.is_fresh(cached_response, path):
+            return cached_response.data
+
+        headers = dict()
+        if cached_response and cached_response.etag:
+            headers["If-None-Match"] = cached_response.etag
+        if cached_response and cached_response.last_modified:
+            headers["If-Modified-Since"] = cached_response.last_modified
+        response = self._request_with_retries(
+            "GET", path, authenticate=True, headers=headers
+        )
+        if response.status_code == 304 and cached_response:
+            self.response_cache.touch(cache_key)
+            return cached_response.data
+
+        response_data = response.json() if response.content else None
+        self.response_cache.store(
+            cache_key,
+            response_data,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+        return response_data
+
+    def project(self, project_id: str) -> dict:
+        return self.get("projects/{}".format(project_id))
+
+    def project_files(self, project_id: str) -> List[dict]:
+        return self.get("projects/{}/files".format(project_id))
+
+    def project_git_branch(self, project_id: str) -> dict:
+        return self.get("projects/{}/git_branch".format(project_id))
+
+    def project_validation(self, project_id: str) -> dict:
+        """Return the results of the most recent LookML validation of the project."""
+        return self.get("projects/{}/validate".format(project_id))
+
+    def fetch_projects(
+        self, project_ids: Iterable[str], resources: Iterable[str] = PROJECT_RESOURCES
+    ) -> Dict[str, Dict[str, Any]]:
+        """Fetch metadata, files, git branch and/or validation results for many projects concurrently.
+
+        Returns a mapping of project id to a mapping of resource name (one of `PROJECT_RESOURCES`) to its API result.
+        """
+        resource_fetchers = {
+            "project": self.project,
+            "files": self.project_files,
+            "git_branch": self.project_git_branch,
+            "validation": self.project_validation,
+        }
+        requests_to_send = [
+            (project_id, resource)
+            for project_id in project_ids
+            for resource in resources
+        ]
+        invalid_resources = {resource for _, resource in requests_to_send} - set(
+            resource_fetchers
+        )
+        if invalid_resources:
+            raise ValueError(
+                "Unknown Looker project resources {}, choose from: {}".format(
+                    invalid_resources, PROJECT_RESOURCES
+                )
+            )
+
+        results = self.map_concurrently(
+            lambda request_key: resource_fetchers[request_key[1]](request_key[0]),
+            requests_to_send,
+        )
+        projects_data: Dict[str, Dict[str, Any]] = dict()
+        for (project_id, resource), result in zip(requests_to_send, results):
+            projects_data.setdefault(project_id, dict())[resource] = result
+        return projects_data
+
+    def map_concurrently(
+        self, function: Callable[[Any], ResultType], items: Iterable[Any]
+    ) -> List[ResultType]:
+        """Apply a function (usually making API calls) to each item on at most `max_concurrency` threads."""
+        items = list(items)
+        if len(items) <= 1 or self.max_concurrency <= 1:
+            return [function(item) for item in items]
+        self.login()
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            return list(executor.map(function, items))
+
+    def _request_with_retries(
+        self, method: str, path: str, authenticate: bool = True, **kwargs
+    ) -> requests.Response:
+        url = "{}/{}".format(self.api_url, path.lstrip("/"))
+        request_headers = kwargs.pop("headers", None) or {}
+        reauthenticated = False
+        attempt = 0
+        while True:
+            headers = dict(request_headers)
+            if authenticate:
+                headers["Authorization"] = "token {}".format(self.login())
+            instrumentation.increment(instrumentation.API_CALLS)
+            try:
+                with instrumentation.span(
+                    "looker_api_request", method=method, path=path
+                ):
+                    response = self.session.request(
+                        method,
+                        url,
+                        headers=headers,
+                        timeout=self.timeout,
+                        verify=self.verify_ssl,
+                        **kwargs,
+                    )
+            except requests.ConnectionError as error:
+                if attempt >= self.max_retries:
+                    raise LookerException(
+                        name="api-connection-error",
+                        title="Unable to connect to the Looker API",
+                        status=0,
+                        detail="{} {} failed after {} attempts: {}".format(
+                            method, url, attempt + 1, error
+                        ),
+                    )
+                self._wait_before_retry(attempt)
+                attempt += 1
+                continue
+
+            if response.status_code == 401 and authenticate and not reauthenticated:
+                # Token was revoked or expired early, log in again once
+                self._access_token = None
+                reauthenticated = True
+                continue
+            if (
+                response.status_code in RETRYABLE_STATUS_CODES
+                and attempt < self.max_retries
+            ):
+                logger.debug(
+                    "Looker API returned {} for {} {}, retrying".format(
+                        response.status_code, method, url
+                    )
+                )
+                self._wait_before_retry(attempt, response.headers.get("Retry-After"))
+                attempt += 1
+                continue
+            if response.status_code >= 400:
+                raise LookerException(
+                    name="api-request-failed",
+                    title="Looker API request failed",
+                    status=response.status_code,
+                    detail="{} {} returned status {}".format(
+                        method, url, response.status_code
+                    ),
+                    response=response,
+                )
+            return response
+
+    def _wait_before_retry(
+        self, attempt: int, retry_after: Optional[str] = None
+    ) -> None:
+        """Sleep for the server's requested `Retry-After` seconds, or an exponential backoff."""
+        try:
+            delay = float(retry_after) if retry_after is not None else None
+        except ValueError:
+            delay = None
+        if delay is None:
+            delay = self.backoff_seconds * (2**attempt)
+        time.sleep(delay)
@@ -1,15 +1,21 @@
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+from itertools import chain
 from pathlib import Path
-from typing import List, Optional
+from typing import IO, Iterable, Iterator, List, Optional
 
 import lkml
-import looker_sdk
 
+import dbtea.instrumentation as instrumentation
 import dbtea.utils as utils
+from dbtea.clients.bi.looker.types import DEFAULT_TYPE_MAPPER, LookmlTypeMapper
+from dbtea.clients.bi.looker.writer import LookmlWriter
+from dbtea.clients.bi.looker.writer import dump as dump_lookml
 from dbtea.exceptions import DbteaException
 from dbtea.logger import DBTEA_LOGGER as logger
 
 OUTPUT_TO_OPTIONS = {"stdout", "file"}
+DEFAULT_LOOKML_GENERATION_CHUNK_SIZE = 100
 
 LOOKML_DIMENSION = "dimension"
 LOOKML_DIMENSION_GROUP = "dimension_group"
@@ -33,7 +39,8 @@ VALID_LOOKML_VIEW_PROPERTIES = {
     "dimensions",
     "dimension",
     "dimension_groups",
-    "dimension_group" "measures",
+    "dimension_group",
+    "measures",
     "measure",
     "sets",
     "set",
@@ -89,6 +96,10 @@ VALID_LOOKML_DIMENSION_PROPERTIES = {
     "suggest_explore",
     "view_label",
 }
+LOOKML_VIEW_PROPERTIES = frozenset(VALID_LOOKML_VIEW_PROPERTIES)
+LOOKML_DIMENSION_PROPERTIES = frozenset(VALID_LOOKML_DIMENSION_PROPERTIES)
+# Model meta keys with these prefixes set the view property named by the rest of the key
+LOOKML_META_PREFIXES = ("looker_", "lookml_")
 
 
 class LookmlProject:
@@ -97,6 +108,8 @@ class LookmlProject:
     def __init__(self, project_id: str, config_file_path: Optional[str] = None, config_section: str = "looker"):
         config_path = config_file_path if config_file_path \
             else utils.assemble_path(utils.get_home_dir(), ".dbt", "looker.ini")
+        import looker_sdk
+
         super().__init__(id=project_id)
         self.api_client = looker_sdk.init31(config_file=config_path, section=config_section)
         self._project = self.api_client.project(project_id)
@@ -127,13 +140,16 @@ class LookmlFile:
             Path(full_project_path).stem,
         )
 
-        with open(full_project_path, "r") as local_file_stream:
-            return cls(
-                file_name,
-                lookml_file_type,
-                directory_path=directory,
-                lookml_data=lkml.load(local_file_stream),
-            )
+        with instrumentation.span("parse_lookml_file", path=full_project_path):
+            with open(full_project_path, "r") as local_file_stream:
+                lookml_data = lkml.load(local_file_stream)
+        instrumentation.record_file_read(full_project_path)
+        return cls(
+            file_name,
+            lookml_file_type,
+            directory_path=directory,
+            lookml_data=lookml_data,
+        )
 
     @classmethod
     def from_lookml_string(
@@ -167,7 +183,7 @@ class LookmlFile:
     @property
     def lookml_string(self) -> str:
         """"""
-        return lkml.dump(self.lookml_data)
+        return dump_lookml(self.lookml_data)
 
     def set_lookml_data(self, lookml_data: dict):
         """"""
@@ -201,9 +217,10 @@ class LookmlFile:
         with open(
             utils.assemble_path(
                 local_lookml_project_path, self.lookml_file_name_and_path
-            )
+            ),
+            "w",
         ) as lookml_file:
-            lookml_file.write(self.lookml_string)
+            dump_lookml(self.lookml_data, lookml_file)
 
 
 class LookmlModel(LookmlFile):
@@ -351,7 +368,7 @@ class LookmlView(LookmlFile):
         if sets:
             assembled_view_dict["view"]["sets"] = sets
 
-        return lkml.dump(assembled_view_dict)
+        return dump_lookml(assembled_view_dict)
 
     @property
     def dimensions(self) -> Optional[List[dict]]:
@@ -442,15 +459,16 @@ def create_lookml_model(
         assembled_model_dict["tests"] = tests
 
     if output_to == "stdout":
-        return lkml.dump(assembled_model_dict)
+        return dump_lookml(assembled_model_dict)
     else:
         model_file_name = utils.assemble_path(
             output_directory, model_name + ".model.lkml"
         )
         with open(model_file_name, "w") as output_stream:
-            output_stream.write(lkml.dump(assembled_model_dict))
+            dump_lookml(assembled_model_dict, output_stream)
 
 
+@instrumentation.timed()
 def create_lookml_view(
     view_name: str,
     sql_table_name: str = None,
@@ -507,14 +525,16 @@ def create_lookml_view(
     if sets:
         assembled_view_dict["view"]["sets"] = sets
 
-    return lkml.dump(assembled_view_dict)
+    return dump_lookml(assembled_view_dict)
 
 
 def parse_lookml_file(lookml_file_name: str) -> dict:
     """Parse a LookML file into a dictionary with keys for each of its primary properties and a list of values."""
     logger.info("Parsing data from LookML file {}".format(lookml_file_name))
-    with open(lookml_file_name, "r") as lookml_file_stream:
-        lookml_data = lkml.load(lookml_file_stream)
+    with instrumentation.span("parse_lookml_file", path=lookml_file_name):
+        with open(lookml_file_name, "r") as lookml_file_stream:
+            lookml_data = lkml.load(lookml_file_stream)
+    instrumentation.record_file_read(lookml_file_name)
 
     return lookml_data
 
@@ -528,7 +548,7 @@ def to_lookml(
 ) -> Optional[str]:
     """"""
     if output_to == "stdout":
-        return lkml.dump(data)
+        return dump_lookml(data)
     else:
         output_file = (
             utils.assemble_path(
@@ -538,65 +558,162 @@ def to_lookml(
             else utils.assemble_path(output_directory, output_file + ".lkml")
         )
         with open(output_file, "w") as output_stream:
-            output_stream.write(lkml.dump(data))
-
-
-def dbt_model_schemas_to_lookml_views(dbt_models_data: List[dict]) -> dict:
-    """"""
-    lookml_views_dbt_data = dbt_models_data
-
-    for model_data in lookml_views_dbt_data:
-        if "columns" in model_data:
-            model_data["dimensions"] = list()
-            model_data["dimension_groups"] = list()
-            invalid_column_properties = list()
-
-            for index, column_data in enumerate(model_data["columns"]):
-                for column_property_key in column_data.keys():
-                    if column_property_key not in VALID_LOOKML_DIMENSION_PROPERTIES:
-                        invalid_column_properties.append(column_property_key)
-                for invalid_column_property in invalid_column_properties:
-                    logger.debug(
-                        "Removing property invalid for LookML for dimension {}: {}".format(
-                            model_data.get("name"), invalid_column_property
-                        )
-                    )
-                    if model_data["columns"][index].get(invalid_column_property):
-                        del model_data["columns"][index][invalid_column_property]
-
-                if column_data.get("type") in LOOKML_DIMENSION_GROUP_TYPES:
-                    column_data.update({"sql": "${TABLE}." + column_data.get("name")})
-                    model_data["dimension_groups"].append(column_data)
-                else:
-                    column_data.update({"sql": "${TABLE}." + column_data.get("name")})
-                    model_data["dimensions"].append(column_data)
-                # model_data["dimensions"][index]["sql"] = "${TABLE}." + column_data.get("name")
-
-            del model_data["columns"]
-
-        if "alias" in model_data:
-            model_data["sql_table_name"] = model_data["alias"]
-        else:
-            model_data["sql_table_name"] = model_data.get(
-                "name"
-            )  # TODO: Needs to be fully qualified name]
-
-        # Process model-level meta fields
-        if "meta" in model_data:
-            for meta_key, meta_value in model_data["meta"].items():
-                if meta_key[:7] == "looker_" or meta_key[:7] == "lookml_":
-                    model_data[meta_key[7:]] = model_data["meta"][meta_key]
-
-        invalid_properties = list()
-        for model_property in model_data.keys():
-            if model_property not in VALID_LOOKML_VIEW_PROPERTIES:
-                invalid_properties.append(model_property)
-        for invalid_property in invalid_properties:
-            logger.debug(
-                "Removing property invalid for LookML for view {}: {}".format(
-                    model_data.get("name"), invalid_property
-                )
+            dump_lookml(data, output_stream)
+
+
+def dbt_manifest_node_to_model_schema(
+    node_data: dict,
+    catalog_node_data: Optional[dict] = None,
+    type_mapper: Optional[LookmlTypeMapper] = None,
+) -> dict:
+    """Build a dbt model schema dict (as in a schema.yml entry) from a manifest node and its catalog entry.
+
+    Columns follow the warehouse order from the catalog, with descriptions and meta taken from the manifest; without
+    a catalog entry only the documented manifest columns are used. Column types are mapped to LookML types with
+    `type_mapper`, by default using the type rules of every supported warehouse.
+    """
+    documented_columns = {
+        column_name.lower(): column_data
+        for column_name, column_data in (node_data.get("columns") or {}).items()
+    }
+    if catalog_node_data:
+        column_types = [
+            (column_data["name"], column_data.get("type"))
+            for column_data in sorted(
+                catalog_node_data.get("columns", {}).values(),
+                key=lambda column_data: column_data.get("index", 0),
+            )
+        ]
+    else:
+        column_types = [
+            (column_data.get("name", column_name), column_data.get("data_type"))
+            for column_name, column_data in documented_columns.items()
+        ]
+
+    lookml_types = (type_mapper or DEFAULT_TYPE_MAPPER).map_types(
+        [column_type for _, column_type in column_types],
+        [column_name for column_name, _ in column_types],
+    )
+    columns = list()
+    for (column_name, _), lookml_type in zip(column_types, lookml_types):
+        documented_column = documented_columns.get(column_name.lower(), {})
+        column_schema = {"name": column_name.lower(), "type": lookml_type}
+        if documented_column.get("description"):
+            column_schema["description"] = documented_column["description"]
+        columns.append(column_schema)
+
+    model_schema = {"name": node_data["name"], "columns": columns}
+    if node_data.get("description"):
+        model_schema["description"] = node_data["description"]
+    for relation_property in ("database", "schema", "alias"):
+        if node_data.get(relation_property):
+            model_schema[relation_property] = node_data[relation_property]
+    if node_data.get("meta"):
+        model_schema["meta"] = node_data["meta"]
+    return model_schema
+
+
+def dbt_model_schema_to_lookml_view(model_data: dict) -> dict:
+    """Build a LookML view dict from a dbt model schema dict, without modifying the model schema.
+
+    Each column becomes a dimension, or a dimension group for time and duration types, keeping only the properties
+    valid for LookML dimensions. `sql_table_name` is the model's relation, qualified with whichever of its database
+    and schema are known. Model meta keys prefixed `looker_` or `lookml_` set view properties, and only properties
+    valid for LookML views are kept.
+    """
+    view_data = {
+        view_property: value
+        for view_property, value in model_data.items()
+        if view_property in LOOKML_VIEW_PROPERTIES
+    }
+    if "columns" in model_data:
+        dimensions, dimension_groups = list(), list()
+        for column_data in model_data["columns"]:
+            dimension_data = {
+                dimension_property: value
+                for dimension_property, value in column_data.items()
+                if dimension_property in LOOKML_DIMENSION_PROPERTIES
+            }
+            dimension_data["sql"] = "${TABLE}." + column_data.get("name")
+            if column_data.get("type") in LOOKML_DIMENSION_GROUP_TYPES:
+                dimension_groups.append(dimension_data)
+            else:
+                dimensions.append(dimension_data)
+        view_data["dimensions"] = dimensions
+        view_data["dimension_groups"] = dimension_groups
+
+    view_data["sql_table_name"] = ".".join(
+        relation_part
+        for relation_part in (
+            model_data.get("database"),
+            model_data.get("schema"),
+            model_data.get("alias", model_data.get("name")),
+        )
+        if relation_part
+    )
+
+    for meta_key, meta_value in (model_data.get("meta") or {}).items():
+        if meta_key.startswith(LOOKML_META_PREFIXES):
+            view_property = meta_key.split("_", 1)[1]
+            if view_property in LOOKML_VIEW_PROPERTIES:
+                view_data[view_property] = meta_value
+    return view_data
+
+
+def iter_lookml_views(dbt_models_data: Iterable[dict]) -> Iterator[dict]:
+    """Yield a LookML view dict per dbt model schema dict, one model at a time, leaving the model schemas unchanged."""
+    for model_data in dbt_models_data:
+        yield dbt_model_schema_to_lookml_view(model_data)
+
+
+@instrumentation.timed()
+def dbt_model_schemas_to_lookml_views(dbt_models_data: Iterable[dict]) -> dict:
+    """Build LookML view dicts from dbt model schema dicts, returned under `views` as `lkml.load` would give them."""
+    return {"views": list(iter_lookml_views(dbt_models_data))}
+
+
+@instrumentation.timed()
+def write_lookml_views(dbt_models_data: Iterable[dict], output_stream: IO[str]) -> None:
+    """Write a LookML view per dbt model schema dict to a stream, converting and writing one model at a time."""
+    LookmlWriter(output_stream).write_repeated(
+        "views", iter_lookml_views(dbt_models_data)
+    )
+
+
+@instrumentation.timed()
+def dbt_models_to_lookml_view_strings(
+    dbt_models_data: List[dict],
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_LOOKML_GENERATION_CHUNK_SIZE,
+) -> List[str]:
+    """Generate the serialized LookML view for each dbt model, in input order.
+
+    With more than one worker, models are split into chunks of `chunk_size` and each chunk is converted and serialized
+    in a separate process; the output is identical to the serial path.
+    """
+    if not workers or workers <= 1 or len(dbt_models_data) <= chunk_size:
+        return _dbt_models_to_lookml_view_strings(dbt_models_data)
+
+    model_chunks = [
+        dbt_models_data[index : index + chunk_size]
+        for index in range(0, len(dbt_models_data), chunk_size)
+    ]
+    logger.info(
+        "Generating {} LookML views across {} worker processes".format(
+            len(dbt_models_data), workers
+        )
+    )
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(
+            chain.from_iterable(
+                executor.map(_dbt_models_to_lookml_view_strings, model_chunks)
             )
-            del model_data[invalid_property]
+        )
+
 
-    return {"views": lookml_views_dbt_data}
+def _dbt_models_to_lookml_view_strings(dbt_models_data: List[dict]) -> List[str]:
+    """Convert and serialize one chunk of dbt models to LookML view strings."""
+    return [
+        dump_lookml({"views": [view_data]})
+        for view_data in iter_lookml_views(dbt_models_data)
+    ]
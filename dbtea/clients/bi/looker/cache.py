@@ -0,0 +1,159 @@
+"""
+On-disk cache of Looker API responses.
+
+"""
+import fnmatch
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+from dbtea.config import DBTEA_CACHE_DIR
+from dbtea.logger import DBTEA_LOGGER as logger
+
+RESPONSE_CACHE_FILE = "looker-responses.db"
+DEFAULT_RESPONSE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# Seconds a cached response is served without asking Looker; None disables caching for matching endpoints.
+# Patterns are matched in order against the API path, so more specific patterns come first.
+DEFAULT_ENDPOINT_TTLS: Dict[str, Optional[float]] = {
+    "login": None,
+    "projects/*/validate": None,
+    "projects/*/git_branch": 60,
+    "projects/*/files": 300,
+    "projects/*": 3600,
+    "connections*": 3600,
+}
+DEFAULT_RESPONSE_TTL_SECONDS = 300
+
+
+@dataclass
+class CachedResponse:
+    """A cached API response body with the validators Looker sent with it."""
+
+    data: object
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+
+
+class ResponseCache:
+    """Size-bounded, least-recently-used cache of API responses with per-endpoint TTLs, stored in SQLite."""
+
+    def __init__(
+        self,
+        cache_directory: Optional[str] = None,
+        endpoint_ttls: Optional[Dict[str, Optional[float]]] = None,
+        default_ttl: float = DEFAULT_RESPONSE_TTL_SECONDS,
+        max_size_bytes: int = DEFAULT_RESPONSE_CACHE_MAX_BYTES,
+    ):
+        self.cache_directory = Path(cache_directory or DBTEA_CACHE_DIR)
+        self.endpoint_ttls = (
+            DEFAULT_ENDPOINT_TTLS if endpoint_ttls is None else endpoint_ttls
+        )
+        self.default_ttl = default_ttl
+        self.max_size_bytes = max_size_bytes
+
+        self.cache_directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            str(self.cache_directory / RESPONSE_CACHE_FILE), check_same_thread=False
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, data TEXT NOT NULL, etag TEXT, last_modified TEXT, "
+            "stored_at REAL NOT NULL, last_access REAL NOT NULL, size INTEGER NOT NULL)"
+        )
+        self._connection.commit()
+
+    def ttl_for(self, path: str) -> Optional[float]:
+        """Return the TTL for an API path, or None if responses for the path must not be cached."""
+        path = path.strip("/")
+        for pattern, ttl in self.endpoint_ttls.items():
+            if fnmatch.fnmatchcase(path, pattern):
+                return ttl
+        return self.default_ttl
+
+    def is_fresh(self, cached_response: CachedResponse, path: str) -> bool:
+        ttl = self.ttl_for(path)
+        return ttl is not None and time.time() - cached_response.stored_at < ttl
+
+    def lookup(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT data, etag, last_modified, stored_at FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if not row:
+                return None
+            self._connection.execute(
+                "UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key)
+            )
+            self._connection.commit()
+        return CachedResponse(json.loads(row[0]), row[1], row[2], row[3])
+
+    def store(
+        self,
+        key: str,
+        data: object,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        serialized_data = json.dumps(data, separators=(",", ":"))
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    serialized_data,
+                    etag,
+                    last_modified,
+                    now,
+                    now,
+                    len(serialized_data),
+                ),
+            )
+            self._evict()
+            self._connection.commit()
+
+    def touch(self, key: str) -> None:
+        """Mark a cached response as just revalidated (e.g. after a 304 Not Modified)."""
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "UPDATE responses SET stored_at = ?, last_access = ? WHERE key = ?",
+                (now, now, key),
+            )
+            self._connection.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM responses")
+            self._connection.commit()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def _evict(self) -> None:
+        """Delete least recently used responses until the cache fits in `max_size_bytes`."""
+        total_size = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+        if total_size <= self.max_size_bytes:
+            return
+
+        evicted_keys = list()
+        for key, size in self._connection.execute(
+            "SELECT key, size FROM responses ORDER BY last_access"
+        ).fetchall():
+            if total_size <= self.max_size_bytes:
+                break
+            evicted_keys.append((key,))
+            total_size -= size
+        self._connection.executemany(
+            "DELETE FROM responses WHERE key = ?", evicted_keys
+        )
+        logger.debug("Evicted {} cached Looker API responses".format(len(evicted_keys)))
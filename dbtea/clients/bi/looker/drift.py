@@ -0,0 +1,249 @@
+"""
+Compare the views of a local LookML project with the dbt models they are built on.
+
+"""
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Collection, Dict, FrozenSet, List, Optional, Sequence, Tuple, Union
+
+import dbtea.instrumentation as instrumentation
+from dbtea.artifacts import ArtifactSnapshot, ManifestIndex, as_manifest_index
+from dbtea.clients.bi.looker.base import dbt_manifest_node_to_model_schema
+from dbtea.clients.bi.looker.project_index import LookmlProjectIndex
+from dbtea.clients.bi.looker.types import (
+    LOOKML_DATA_TYPES,
+    LOOKML_TYPE_DATE,
+    LOOKML_TYPE_DATETIME,
+    LookmlTypeMapper,
+)
+from dbtea.logger import DBTEA_LOGGER as logger
+
+# Below this many view files, starting worker processes costs more than parsing the files serially
+MIN_FILES_FOR_PARALLEL_PARSING = 32
+LOOKML_VIEW_FILES_PER_TASK = 16
+LOOKML_FIELD_TYPES = ("dimensions", "dimension_groups", "measures")
+DEFAULT_LOOKML_DIMENSION_TYPE = "string"
+
+TABLE_COLUMN_REFERENCE_PATTERN = re.compile(r'\$\{TABLE\}\.["`]?(\w+)')
+SINGLE_COLUMN_SQL_PATTERN = re.compile(r'^\$\{TABLE\}\.["`]?(\w+)["`]?$')
+
+# Column name to LookML type, `None` when a field references the column without a comparable type
+ViewColumns = Dict[str, Optional[str]]
+
+
+@dataclass
+class ViewDrift:
+    """Differences between a LookML view and the columns of its dbt model.
+
+    `missing` columns of the dbt model are not referenced by any field of the view, `extra` columns are referenced by
+    the view but do not exist in the model, and `type_mismatches` lists `(column, LookML type, dbt type)` for fields
+    whose type disagrees with the type of the column they show.
+    """
+
+    view_name: str
+    path: str
+    missing: List[str] = field(default_factory=list)
+    extra: List[str] = field(default_factory=list)
+    type_mismatches: List[Tuple[str, str, str]] = field(default_factory=list)
+
+    @property
+    def has_drift(self) -> bool:
+        return bool(self.missing or self.extra or self.type_mismatches)
+
+    def __str__(self) -> str:
+        lines = ["view {} ({})".format(self.view_name, self.path)]
+        lines.extend("  missing: {}".format(column) for column in self.missing)
+        lines.extend("  extra: {}".format(column) for column in self.extra)
+        lines.extend(
+            "  type mismatch: {} is {} in LookML, {} in dbt".format(*type_mismatch)
+            for type_mismatch in self.type_mismatches
+        )
+        return "\n".join(lines)
+
+
+@dataclass
+class LookmlDriftReport:
+    """Drift of every LookML view built on a dbt model, and the dbt models without a view."""
+
+    views: List[ViewDrift] = field(default_factory=list)
+    models_without_views: List[str] = field(default_factory=list)
+
+    @property
+    def drifted_views(self) -> List[ViewDrift]:
+        return [view_drift for view_drift in self.views if view_drift.has_drift]
+
+    def __str__(self) -> str:
+        return "{} views compared, {} drifted, {} dbt models without a view".format(
+            len(self.views), len(self.drifted_views), len(self.models_without_views)
+        )
+
+
+def lookml_view_columns(view_data: dict) -> ViewColumns:
+    """Return the columns a view's fields reference with `${TABLE}`, each with the LookML type of the field showing it.
+
+    A column gets a type only from a dimension or dimension group whose `sql` is nothing but the column reference;
+    columns referenced in other expressions, or only by measures, get `None`.
+    """
+    view_columns: ViewColumns = dict()
+    for field_type in LOOKML_FIELD_TYPES:
+        for field_data in view_data.get(field_type) or []:
+            sql = (field_data.get("sql") or "").strip()
+            for column_name in TABLE_COLUMN_REFERENCE_PATTERN.findall(sql):
+                view_columns.setdefault(column_name.lower(), None)
+            single_column = SINGLE_COLUMN_SQL_PATTERN.match(sql)
+            if not single_column or field_type == "measures":
+                continue
+            column_name = single_column.group(1).lower()
+            if field_type == "dimension_groups":
+                lookml_type = (
+                    LOOKML_TYPE_DATETIME if field_data.get("type") == "time" else None
+                )
+            else:
+                lookml_type = field_data.get("type", DEFAULT_LOOKML_DIMENSION_TYPE)
+            if lookml_type in LOOKML_DATA_TYPES and view_columns[column_name] is None:
+                view_columns[column_name] = lookml_type
+    return view_columns
+
+
+def _parse_lookml_view_files(
+    view_files: Sequence[Tuple[str, Sequence[str]]],
+) -> List[Tuple[str, Dict[str, ViewColumns]]]:
+    """Parse a batch of LookML files, returning the columns of the named views declared in each."""
+    import lkml
+
+    parsed_files = list()
+    for file_path, view_names in view_files:
+        with open(file_path, "r") as lookml_stream:
+            lookml_data = lkml.load(lookml_stream)
+        wanted_views = set(view_names)
+        parsed_files.append(
+            (
+                file_path,
+                {
+                    view_data["name"]: lookml_view_columns(view_data)
+                    for view_data in lookml_data.get("views", [])
+                    if view_data.get("name") in wanted_views
+                },
+            )
+        )
+    return parsed_files
+
+
+def load_lookml_view_columns(
+    index: LookmlProjectIndex,
+    view_names: Collection[str],
+    workers: Optional[int] = None,
+) -> Dict[str, ViewColumns]:
+    """Parse the files declaring the given views, across a pool of worker processes, and return each view's columns."""
+    view_names_by_path: Dict[str, List[str]] = dict()
+    for view_name in view_names:
+        view_path = index.view_path(view_name)
+        if view_path is not None:
+            view_names_by_path.setdefault(view_path, []).append(view_name)
+    view_files = [
+        (os.path.join(index.project_root, path), names)
+        for path, names in sorted(view_names_by_path.items())
+    ]
+    batches = [
+        view_files[position : position + LOOKML_VIEW_FILES_PER_TASK]
+        for position in range(0, len(view_files), LOOKML_VIEW_FILES_PER_TASK)
+    ]
+    with instrumentation.span("parse_lookml_view_files", files=len(view_files)):
+        if (
+            workers
+            and workers > 1
+            and len(view_files) >= MIN_FILES_FOR_PARALLEL_PARSING
+        ):
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                parsed_batches = list(executor.map(_parse_lookml_view_files, batches))
+        else:
+            parsed_batches = [_parse_lookml_view_files(batch) for batch in batches]
+
+    views_columns = dict()
+    for parsed_files in parsed_batches:
+        for file_path, file_views_columns in parsed_files:
+            instrumentation.record_file_read(file_path)
+            views_columns.update(file_views_columns)
+    return views_columns
+
+
+def _types_match(lookml_type: Optional[str], dbt_type: str) -> bool:
+    if lookml_type is None or lookml_type == dbt_type:
+        return True
+    # Date columns are commonly shown as time dimension groups
+    return lookml_type == LOOKML_TYPE_DATETIME and dbt_type == LOOKML_TYPE_DATE
+
+
+def compare_view_columns(
+    view_name: str, path: str, view_columns: ViewColumns, model_columns: Dict[str, str]
+) -> ViewDrift:
+    """Compare the columns a view references with its model's columns, by set difference of their hashed names."""
+    view_drift = ViewDrift(view_name, path)
+    view_column_set: FrozenSet[Tuple[str, Optional[str]]] = frozenset(
+        view_columns.items()
+    )
+    if view_column_set == frozenset(model_columns.items()):
+        return view_drift
+
+    view_column_names, model_column_names = view_columns.keys(), model_columns.keys()
+    view_drift.missing = sorted(model_column_names - view_column_names)
+    view_drift.extra = sorted(view_column_names - model_column_names)
+    view_drift.type_mismatches = sorted(
+        (column_name, view_columns[column_name], model_columns[column_name])
+        for column_name in view_column_names & model_column_names
+        if not _types_match(view_columns[column_name], model_columns[column_name])
+    )
+    return view_drift
+
+
+@instrumentation.timed()
+def diff_lookml_project(
+    index: LookmlProjectIndex,
+    manifest: Union[dict, ManifestIndex, ArtifactSnapshot],
+    catalog_data: Optional[dict],
+    packages: Optional[Collection[str]] = None,
+    type_mapper: Optional[LookmlTypeMapper] = None,
+    workers: Optional[int] = None,
+) -> LookmlDriftReport:
+    """Report the columns each LookML view named after a dbt model is missing, has extra or types differently.
+
+    Columns are compared with the model's catalog entry, or its documented columns without a catalog. Views are
+    matched to models by name, as `dbtea lookml sync` names them, and only the files declaring matched views are
+    parsed. Models without known columns are skipped. `manifest` is parsed manifest data or a manifest index.
+    """
+    catalog_nodes = (catalog_data or {}).get("nodes", {})
+    manifest_index = as_manifest_index(manifest)
+    type_mapper = type_mapper or LookmlTypeMapper(
+        adapter=(manifest_index.property("metadata") or {}).get("adapter_type")
+    )
+    models_columns: Dict[str, Dict[str, str]] = dict()
+    report = LookmlDriftReport()
+    for unique_id in manifest_index.unique_ids_of_type("model", packages):
+        node_data = manifest_index.get(unique_id)
+        model_schema = dbt_manifest_node_to_model_schema(
+            node_data, catalog_nodes.get(unique_id), type_mapper=type_mapper
+        )
+        if not model_schema["columns"]:
+            continue
+        if index.view_path(model_schema["name"]) is None:
+            report.models_without_views.append(model_schema["name"])
+            continue
+        models_columns[model_schema["name"]] = {
+            column["name"]: column["type"] for column in model_schema["columns"]
+        }
+
+    views_columns = load_lookml_view_columns(index, models_columns, workers=workers)
+    for view_name in sorted(views_columns):
+        report.views.append(
+            compare_view_columns(
+                view_name,
+                index.view_path(view_name),
+                views_columns[view_name],
+                models_columns[view_name],
+            )
+        )
+    report.models_without_views.sort()
+    logger.debug("Compared LookML views with dbt models: {}".format(report))
+    return report
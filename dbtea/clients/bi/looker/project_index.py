@@ -0,0 +1,443 @@
+"""
+Index of a local Looker project: every LookML file with the views and explores it declares, parsed only on demand.
+
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from lkml.keys import EXPR_BLOCK_KEYS
+
+import dbtea.instrumentation as instrumentation
+import dbtea.utils as utils
+from dbtea.config import DBTEA_CACHE_DIR
+from dbtea.discovery import PRUNED_DIRECTORY_NAMES
+from dbtea.exceptions import DbteaException
+from dbtea.logger import DBTEA_LOGGER as logger
+
+LOOKML_PROJECT_INDEX_VERSION = 1
+LOOKML_PROJECT_FILE_EXTENSIONS = (".lkml", ".lookml")
+LOOKML_FILE_TYPE_VIEW = "view"
+LOOKML_FILE_TYPE_MODEL = "model"
+LOOKML_FILE_TYPE_EXPLORE = "explore"
+LOOKML_FILE_TYPE_DASHBOARD = "dashboard"
+LOOKML_FILE_TYPE_GENERIC = "generic"
+LOOKML_FILE_TYPES = {
+    LOOKML_FILE_TYPE_VIEW,
+    LOOKML_FILE_TYPE_MODEL,
+    LOOKML_FILE_TYPE_EXPLORE,
+    LOOKML_FILE_TYPE_DASHBOARD,
+}
+
+# Tokens of a LookML file that matter for finding views, explores and joins. Strings and `;;` terminated
+# expressions (SQL, HTML, ...) are matched whole, so braces and `#` characters inside them are never mistaken for
+# block boundaries or comments.
+LOOKML_DECLARATION_PATTERN = re.compile(
+    r'"(?:[^"\\]|\\.)*"'
+    r"|(?<![\w.]){}\s*:.*?;;".format(
+        "(?:{})".format(
+            "|".join(sorted(EXPR_BLOCK_KEYS, key=lambda key: (-len(key), key)))
+        )
+    )
+    + r"|#[^\n]*"
+    r"|(?<![\w.])(?P<block_key>\w+)\s*:\s*(?P<block_name>\+?[\w.]+)?\s*\{"
+    r"|(?<![\w.])(?P<pair_key>from|view_name)\s*:\s*(?P<pair_value>\w+)"
+    r"|(?P<brace>[{}])",
+    re.DOTALL,
+)
+LOOKML_DASHBOARD_NAME_PATTERN = re.compile(r"^-\s*dashboard:\s*([\w.]+)", re.MULTILINE)
+
+
+def lookml_file_type(file_name: str) -> str:
+    """Return the LookML file type from a file name's type suffix, e.g. `view` for `orders.view.lkml`."""
+    name_parts = file_name.split(".")
+    if len(name_parts) > 2 and name_parts[-2] in LOOKML_FILE_TYPES:
+        return name_parts[-2]
+    return LOOKML_FILE_TYPE_GENERIC
+
+
+# An open block of a LookML file being scanned: its key, its name, and the index of the view it stands for in its
+# explore's list of views, if any
+OpenBlock = Tuple[Optional[str], Optional[str], Optional[int]]
+
+
+def _open_lookml_block(
+    block_key: str,
+    block_name: Optional[str],
+    open_blocks: List[OpenBlock],
+    views: List[str],
+    explores: Dict[str, List[str]],
+) -> None:
+    """Open a `key: name {` block, recording it if it declares a view or explore, or a join of an explore."""
+    view_index = None
+    if not open_blocks and block_name:
+        if block_key == LOOKML_FILE_TYPE_VIEW:
+            views.append(block_name)
+        elif block_key == LOOKML_FILE_TYPE_EXPLORE:
+            explores[block_name] = [block_name.lstrip("+")]
+            view_index = 0
+    elif (
+        block_key == "join"
+        and block_name
+        and len(open_blocks) == 1
+        and open_blocks[0][0] == LOOKML_FILE_TYPE_EXPLORE
+    ):
+        explore_views = explores[open_blocks[0][1]]
+        explore_views.append(block_name)
+        view_index = len(explore_views) - 1
+    open_blocks.append((block_key, block_name, view_index))
+
+
+def _set_block_view(
+    pair_key: str,
+    pair_value: str,
+    open_blocks: List[OpenBlock],
+    explores: Dict[str, List[str]],
+) -> None:
+    """Replace the view an explore or join stands for with the one named by its `from` or `view_name`."""
+    if not open_blocks or open_blocks[-1][2] is None:
+        return
+    if open_blocks[-1][0] == "join" and pair_key != "from":
+        return
+    explores[open_blocks[0][1]][open_blocks[-1][2]] = pair_value
+
+
+def scan_lookml_declarations(
+    lookml_string: str,
+) -> Tuple[List[str], Dict[str, List[str]]]:
+    """Find the views a LookML file declares, and the views each of its explores joins, without fully parsing it.
+
+    Returns the declared view names, and a mapping of explore name to the names of the views it uses: its base view
+    (set with `from` or `view_name`, otherwise the explore's own name) followed by each join's view (the join's `from`,
+    otherwise the join's name). Refinements keep their `+` prefix, e.g. `+orders`.
+    """
+    views: List[str] = list()
+    explores: Dict[str, List[str]] = dict()
+    open_blocks: List[OpenBlock] = list()
+    for match in LOOKML_DECLARATION_PATTERN.finditer(lookml_string):
+        brace = match.group("brace")
+        if match.group("block_key"):
+            _open_lookml_block(
+                match.group("block_key"),
+                match.group("block_name"),
+                open_blocks,
+                views,
+                explores,
+            )
+        elif match.group("pair_key"):
+            _set_block_view(
+                match.group("pair_key"), match.group("pair_value"), open_blocks, explores
+            )
+        elif brace == "{":
+            open_blocks.append((None, None, None))
+        elif brace == "}" and open_blocks:
+            open_blocks.pop()
+    return views, explores
+
+
+@dataclass
+class LookmlFileEntry:
+    """A LookML file of a project, with the views, explores and dashboards it declares.
+
+    `path` is relative to the project root and uses `/` separators. `explores` maps each declared explore to the views
+    it uses, base view first.
+    """
+
+    path: str
+    file_type: str
+    mtime: int
+    size: int
+    views: List[str] = field(default_factory=list)
+    explores: Dict[str, List[str]] = field(default_factory=dict)
+    dashboards: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_file(cls, project_root: str, relative_path: str) -> "LookmlFileEntry":
+        file_path = os.path.join(project_root, relative_path)
+        file_stat = os.stat(file_path)
+        with open(file_path, "r", errors="replace") as lookml_stream:
+            lookml_string = lookml_stream.read()
+        entry = cls(
+            path=relative_path,
+            file_type=lookml_file_type(os.path.basename(relative_path)),
+            mtime=file_stat.st_mtime_ns,
+            size=file_stat.st_size,
+        )
+        if relative_path.endswith(".lookml"):
+            # Dashboards written as YAML rather than LookML
+            entry.dashboards = LOOKML_DASHBOARD_NAME_PATTERN.findall(lookml_string)
+        else:
+            entry.views, entry.explores = scan_lookml_declarations(lookml_string)
+        return entry
+
+    def to_dict(self) -> dict:
+        return {
+            "path": self.path,
+            "file_type": self.file_type,
+            "mtime": self.mtime,
+            "size": self.size,
+            "views": self.views,
+            "explores": self.explores,
+            "dashboards": self.dashboards,
+        }
+
+    @classmethod
+    def from_dict(cls, entry_data: dict) -> "LookmlFileEntry":
+        return cls(**entry_data)
+
+
+def iter_lookml_files(project_root: str) -> Iterator[Tuple[str, os.stat_result]]:
+    """Yield the relative path and stat of every LookML file in a project, skipping git internals and build output."""
+    pending_directories = [("", str(project_root))]
+    while pending_directories:
+        relative_directory, directory = pending_directories.pop()
+        try:
+            with os.scandir(directory) as directory_entries:
+                entries = sorted(directory_entries, key=lambda entry: entry.name)
+        except OSError:
+            continue
+        for entry in entries:
+            relative_path = (
+                "{}/{}".format(relative_directory, entry.name)
+                if relative_directory
+                else entry.name
+            )
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in PRUNED_DIRECTORY_NAMES:
+                    pending_directories.append((relative_path, entry.path))
+            elif entry.name.endswith(LOOKML_PROJECT_FILE_EXTENSIONS):
+                try:
+                    yield relative_path, entry.stat()
+                except OSError:
+                    continue
+
+
+class LookmlProjectIndex:
+    """Every LookML file of a local Looker project, with lookups from view and explore names to the files using them.
+
+    Building the index reads each file once to find its declarations with a lexical scan; files are only fully
+    parsed with `lkml.load` when their contents are asked for, and parsed contents are kept until the file changes.
+    Given the index of an earlier scan, files whose modification time and size are unchanged are not read again.
+    """
+
+    def __init__(
+        self, project_root: str, files: Optional[Dict[str, LookmlFileEntry]] = None
+    ):
+        self.project_root = os.path.abspath(project_root)
+        self.files: Dict[str, LookmlFileEntry] = dict(files or {})
+        self._view_paths: Dict[str, str] = dict()
+        self._explore_paths: Dict[str, str] = dict()
+        self._dashboard_paths: Dict[str, str] = dict()
+        self._explores_by_view: Dict[str, List[str]] = dict()
+        for entry in self.files.values():
+            for view_name in entry.views:
+                self._view_paths.setdefault(view_name, entry.path)
+            for dashboard_name in entry.dashboards:
+                self._dashboard_paths.setdefault(dashboard_name, entry.path)
+            for explore_name, view_names in entry.explores.items():
+                self._explore_paths.setdefault(explore_name, entry.path)
+                for view_name in dict.fromkeys(view_names):
+                    self._explores_by_view.setdefault(view_name, []).append(
+                        explore_name
+                    )
+        self._parsed_files: Dict[str, Tuple[Tuple[int, int], dict]] = dict()
+        self._parse_lock = threading.Lock()
+
+    @classmethod
+    def scan(
+        cls, project_root: str, previous_index: Optional["LookmlProjectIndex"] = None
+    ) -> "LookmlProjectIndex":
+        """Index every LookML file below `project_root`, reusing entries of `previous_index` for unchanged files."""
+        project_root = os.path.abspath(project_root)
+        if not os.path.isdir(project_root):
+            raise DbteaException(
+                name="missing-lookml-project-directory",
+                title="LookML project directory does not exist",
+                detail="Cannot index LookML project {}, the directory does not exist".format(
+                    project_root
+                ),
+            )
+        previous_files = (
+            previous_index.files
+            if previous_index is not None
+            and previous_index.project_root == project_root
+            else {}
+        )
+        files = dict()
+        scanned_count = 0
+        with instrumentation.span("scan_lookml_project", root=project_root):
+            for relative_path, file_stat in iter_lookml_files(project_root):
+                previous_entry = previous_files.get(relative_path)
+                if (
+                    previous_entry is not None
+                    and previous_entry.mtime == file_stat.st_mtime_ns
+                    and previous_entry.size == file_stat.st_size
+                ):
+                    files[relative_path] = previous_entry
+                    continue
+                files[relative_path] = LookmlFileEntry.from_file(
+                    project_root, relative_path
+                )
+                instrumentation.record_file_read(
+                    os.path.join(project_root, relative_path)
+                )
+                scanned_count += 1
+        logger.debug(
+            "Indexed {} LookML files in {}, {} scanned".format(
+                len(files), project_root, scanned_count
+            )
+        )
+        return cls(project_root, files)
+
+    @classmethod
+    def load(
+        cls,
+        project_root: str,
+        use_cache: bool = True,
+        cache_directory: Optional[str] = None,
+    ) -> "LookmlProjectIndex":
+        """Return an up to date index of a project, starting from the index cached by the last call, if any."""
+        project_root = os.path.abspath(project_root)
+        index_file_path = lookml_project_index_path(project_root, cache_directory)
+        previous_index = (
+            load_lookml_project_index(index_file_path) if use_cache else None
+        )
+        index = cls.scan(project_root, previous_index=previous_index)
+        if use_cache and (
+            previous_index is None or previous_index.to_dict() != index.to_dict()
+        ):
+            try:
+                write_lookml_project_index(index, index_file_path)
+            except OSError as error:
+                logger.warning(
+                    "Unable to write LookML project index {}: {}".format(
+                        index_file_path, error
+                    )
+                )
+        return index
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def view_path(self, view_name: str) -> Optional[str]:
+        """Return the path of the file declaring a view, or its refinement when given as `+<view name>`."""
+        return self._view_paths.get(view_name)
+
+    def explore_path(self, explore_name: str) -> Optional[str]:
+        return self._explore_paths.get(explore_name)
+
+    def dashboard_path(self, dashboard_name: str) -> Optional[str]:
+        return self._dashboard_paths.get(dashboard_name)
+
+    def explores_using_view(self, view_name: str) -> List[str]:
+        """Return the names of the explores built on or joining a view."""
+        return list(self._explores_by_view.get(view_name, []))
+
+    def views(self) -> List[str]:
+        return list(self._view_paths)
+
+    def files_of_type(self, file_type: str) -> List[str]:
+        return [
+            path for path, entry in self.files.items() if entry.file_type == file_type
+        ]
+
+    def lookml_data(self, relative_path: str) -> dict:
+        """Return the parsed contents of a file of the project, parsing it with `lkml.load` on first use."""
+        import lkml
+
+        if relative_path not in self.files:
+            raise DbteaException(
+                name="unindexed-lookml-file",
+                title="LookML file not in project index",
+                detail="File {} is not a LookML file of project {}".format(
+                    relative_path, self.project_root
+                ),
+            )
+        file_path = os.path.join(self.project_root, relative_path)
+        file_stat = os.stat(file_path)
+        signature = (file_stat.st_mtime_ns, file_stat.st_size)
+        with self._parse_lock:
+            parsed_file = self._parsed_files.get(relative_path)
+        if parsed_file is not None and parsed_file[0] == signature:
+            return parsed_file[1]
+
+        with instrumentation.span("parse_lookml_file", path=file_path):
+            with open(file_path, "r") as lookml_stream:
+                lookml_data = lkml.load(lookml_stream)
+        instrumentation.record_file_read(file_path)
+        with self._parse_lock:
+            self._parsed_files[relative_path] = (signature, lookml_data)
+        return lookml_data
+
+    def view_data(self, view_name: str) -> Optional[dict]:
+        """Return the parsed LookML of a view, parsing only the file that declares it."""
+        view_path = self.view_path(view_name)
+        if view_path is None:
+            return None
+        block_name = view_name.lstrip("+")
+        for view_data in self.lookml_data(view_path).get("views", []):
+            if view_data.get("name") == view_name or (
+                view_name.startswith("+") and view_data.get("name") == block_name
+            ):
+                return view_data
+        return None
+
+    def to_dict(self) -> dict:
+        return {
+            "version": LOOKML_PROJECT_INDEX_VERSION,
+            "project_root": self.project_root,
+            "files": [entry.to_dict() for entry in self.files.values()],
+        }
+
+    @classmethod
+    def from_dict(cls, index_data: dict) -> Optional["LookmlProjectIndex"]:
+        if index_data.get("version") != LOOKML_PROJECT_INDEX_VERSION:
+            return None
+        return cls(
+            index_data["project_root"],
+            {
+                entry_data["path"]: LookmlFileEntry.from_dict(entry_data)
+                for entry_data in index_data.get("files", [])
+            },
+        )
+
+
+def lookml_project_index_path(
+    project_root: str, cache_directory: Optional[str] = None
+) -> str:
+    """Return the cache file path of the LookML index of a project directory."""
+    root_hash = hashlib.sha256(
+        os.path.abspath(project_root).encode("utf-8")
+    ).hexdigest()[:16]
+    return str(
+        utils.assemble_path(
+            cache_directory or DBTEA_CACHE_DIR,
+            "lookml-index-{}.json".format(root_hash),
+        )
+    )
+
+
+def load_lookml_project_index(index_file_path: str) -> Optional[LookmlProjectIndex]:
+    if not utils.file_exists(index_file_path):
+        return None
+    try:
+        return LookmlProjectIndex.from_dict(utils.parse_json_file(index_file_path))
+    except (ValueError, KeyError, TypeError) as error:
+        logger.debug(
+            "Ignoring unreadable LookML project index {}: {}".format(
+                index_file_path, error
+            )
+        )
+        return None
+
+
+def write_lookml_project_index(index: LookmlProjectIndex, index_file_path: str) -> None:
+    os.makedirs(os.path.dirname(index_file_path), exist_ok=True)
+    temporary_path = "{}.{}.tmp".format(index_file_path, os.getpid())
+    with open(temporary_path, "w") as index_stream:
+        json.dump(index.to_dict(), index_stream, separators=(",", ":"))
+    os.replace(temporary_path, index_file_path)
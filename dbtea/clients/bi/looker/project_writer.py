@@ -0,0 +1,244 @@
+"""
+Write many LookML files to a project at once, skipping unchanged files and replacing the others atomically.
+
+"""
+import hashlib
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Tuple, Union
+
+import dbtea.instrumentation as instrumentation
+from dbtea.clients.bi.looker.base import LookmlFile
+from dbtea.clients.bi.looker.writer import dump as dump_lookml
+from dbtea.exceptions import DbteaException
+from dbtea.logger import DBTEA_LOGGER as logger
+
+DEFAULT_LOOKML_WRITE_WORKERS = 8
+LOOKML_FILES_PER_TASK = 64
+LOOKML_FILE_EXTENSION = ".lkml"
+
+FILE_CREATED = "created"
+FILE_UPDATED = "updated"
+FILE_UNCHANGED = "unchanged"
+
+LookmlFileContent = Tuple[str, Union[str, dict]]
+
+
+@dataclass
+class LookmlWriteResult:
+    """Paths of the LookML files touched by a project write, relative to the project directory, grouped by outcome.
+
+    `hashes` holds the SHA-256 hash of every file written or found unchanged.
+    """
+
+    created: List[str] = field(default_factory=list)
+    updated: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+    hashes: Dict[str, str] = field(default_factory=dict)
+
+    def __str__(self) -> str:
+        return "{} created, {} updated, {} unchanged, {} deleted".format(
+            len(self.created), len(self.updated), len(self.unchanged), len(self.deleted)
+        )
+
+
+def hash_lookml(lookml_bytes: bytes) -> str:
+    return hashlib.sha256(lookml_bytes).hexdigest()
+
+
+class LookmlProjectWriter:
+    """Writes generated LookML views and models into a LookML project directory.
+
+    A file is only replaced when its content changed: a file of a different size is rewritten straight away, one of
+    the same size only if its content hash differs, so regenerating a project leaves unchanged files, and their
+    modification times, alone. Changed files are written by a pool of `workers` threads to a temporary file next to
+    their target, then renamed over it, so readers never see a partly written file.
+    """
+
+    def __init__(
+        self, project_directory: str, workers: int = DEFAULT_LOOKML_WRITE_WORKERS
+    ):
+        if not os.path.isdir(project_directory):
+            raise DbteaException(
+                name="missing-lookml-project-directory",
+                title="LookML project directory does not exist",
+                detail="Cannot write LookML files to {}, the directory does not exist".format(
+                    project_directory
+                ),
+            )
+        self.project_directory = str(project_directory)
+        self.workers = workers
+
+    def write(
+        self,
+        lookml_files: Iterable[Union[LookmlFile, LookmlFileContent]],
+        delete_paths: Iterable[str] = (),
+        delete_unlisted: bool = False,
+    ) -> LookmlWriteResult:
+        """Write LookML files, given as `LookmlFile` objects or `(relative path, LookML string or data)` pairs.
+
+        Files at `delete_paths` are removed if present. With `delete_unlisted`, so is every other `.lkml` file in the
+        project directory that was not given, making the directory match the files given exactly.
+        """
+        contents: Dict[str, bytes] = dict()
+        for lookml_file in lookml_files:
+            relative_path, lookml_content = self._path_and_content(lookml_file)
+            if relative_path in contents:
+                raise DbteaException(
+                    name="duplicate-lookml-file",
+                    title="LookML file given more than once",
+                    detail="LookML file {} was given more than once in the same project write".format(
+                        relative_path
+                    ),
+                )
+            contents[relative_path] = lookml_content.encode("utf-8")
+
+        for directory in {os.path.dirname(path) for path in contents} - {""}:
+            os.makedirs(os.path.join(self.project_directory, directory), exist_ok=True)
+
+        result = LookmlWriteResult()
+        for written_files in self._write_batches(contents):
+            for relative_path, outcome, lookml_hash in written_files:
+                getattr(result, outcome).append(relative_path)
+                result.hashes[relative_path] = lookml_hash
+        result.deleted = self._delete_files(delete_paths, delete_unlisted, contents)
+
+        logger.debug(
+            "Wrote LookML files to {}: {}".format(self.project_directory, result)
+        )
+        return result
+
+    def _write_batches(
+        self, contents: Dict[str, bytes]
+    ) -> List[List[Tuple[str, str, str]]]:
+        """Write files in batches of `LOOKML_FILES_PER_TASK`, spread across the worker threads."""
+        relative_paths = list(contents)
+        batches = [
+            [
+                (relative_path, contents[relative_path])
+                for relative_path in relative_paths[
+                    index : index + LOOKML_FILES_PER_TASK
+                ]
+            ]
+            for index in range(0, len(relative_paths), LOOKML_FILES_PER_TASK)
+        ]
+        with instrumentation.span("write_lookml_project", files=len(relative_paths)):
+            if self.workers > 1 and len(batches) > 1:
+                with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                    return list(executor.map(self._write_batch, batches))
+            return [self._write_batch(batch) for batch in batches]
+
+    def _delete_files(
+        self,
+        delete_paths: Iterable[str],
+        delete_unlisted: bool,
+        contents: Dict[str, bytes],
+    ) -> List[str]:
+        """Remove the files to delete that were not just written, returning the paths of those that existed."""
+        delete_paths = [
+            os.path.normpath(path)
+            for path in delete_paths
+            if os.path.normpath(path) not in contents
+        ]
+        if delete_unlisted:
+            delete_paths.extend(
+                path for path in self._lookml_file_paths() if path not in contents
+            )
+        deleted_paths = list()
+        for relative_path in dict.fromkeys(delete_paths):
+            try:
+                os.remove(os.path.join(self.project_directory, relative_path))
+            except FileNotFoundError:
+                continue
+            deleted_paths.append(relative_path)
+        return deleted_paths
+
+    @staticmethod
+    def _path_and_content(
+        lookml_file: Union[LookmlFile, LookmlFileContent],
+    ) -> Tuple[str, str]:
+        if isinstance(lookml_file, LookmlFile):
+            relative_path = str(lookml_file.lookml_file_name_and_path)
+            lookml_content = lookml_file.lookml_string
+        else:
+            relative_path, lookml_content = lookml_file
+            if not isinstance(lookml_content, str):
+                lookml_content = dump_lookml(lookml_content)
+        return os.path.normpath(relative_path), lookml_content
+
+    def _write_batch(
+        self, batch: List[Tuple[str, bytes]]
+    ) -> List[Tuple[str, str, str]]:
+        return [
+            self._write_file(relative_path, lookml_bytes)
+            for relative_path, lookml_bytes in batch
+        ]
+
+    def _write_file(
+        self, relative_path: str, lookml_bytes: bytes
+    ) -> Tuple[str, str, str]:
+        """Write one file unless its content is unchanged, returning its path, outcome and content hash."""
+        file_path = os.path.join(self.project_directory, relative_path)
+        lookml_hash = hash_lookml(lookml_bytes)
+        try:
+            file_stat = os.stat(file_path)
+        except FileNotFoundError:
+            file_stat = None
+
+        if file_stat is not None and file_stat.st_size == len(lookml_bytes):
+            with open(file_path, "rb") as lookml_stream:
+                if hash_lookml(lookml_stream.read()) == lookml_hash:
+                    return relative_path, FILE_UNCHANGED, lookml_hash
+
+        # Created like `open` would, so the kernel applies the umask to new files; a replaced file keeps its own mode.
+        temporary_path = os.path.join(
+            os.path.dirname(file_path),
+            ".{}.{}.tmp".format(os.path.basename(file_path), uuid.uuid4().hex),
+        )
+        file_descriptor = os.open(
+            temporary_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666
+        )
+        try:
+            with os.fdopen(file_descriptor, "wb") as temporary_stream:
+                temporary_stream.write(lookml_bytes)
+            if file_stat is not None:
+                os.chmod(temporary_path, file_stat.st_mode & 0o7777)
+            os.replace(temporary_path, file_path)
+        except BaseException:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+        return (
+            relative_path,
+            FILE_UPDATED if file_stat is not None else FILE_CREATED,
+            lookml_hash,
+        )
+
+    def _lookml_file_paths(self) -> List[str]:
+        lookml_file_paths = list()
+        for directory, directory_names, file_names in os.walk(self.project_directory):
+            directory_names[:] = [name for name in directory_names if name != ".git"]
+            for file_name in file_names:
+                if file_name.endswith(LOOKML_FILE_EXTENSION):
+                    lookml_file_paths.append(
+                        os.path.relpath(
+                            os.path.join(directory, file_name), self.project_directory
+                        )
+                    )
+        return sorted(lookml_file_paths)
+
+
+def write_lookml_project(
+    project_directory: str,
+    lookml_files: Iterable[Union[LookmlFile, LookmlFileContent]],
+    workers: int = DEFAULT_LOOKML_WRITE_WORKERS,
+    delete_paths: Iterable[str] = (),
+    delete_unlisted: bool = False,
+) -> LookmlWriteResult:
+    """Write LookML files to a project directory, replacing only files whose content changed."""
+    return LookmlProjectWriter(project_directory, workers=workers).write(
+        lookml_files, delete_paths=delete_paths, delete_unlisted=delete_unlisted
+    )
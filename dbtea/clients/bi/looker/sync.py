@@ -0,0 +1,197 @@
+"""
+Synchronize LookML views with dbt models, regenerating only views whose dbt inputs changed.
+
+"""
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Collection, Dict, List, Optional, Union
+
+import dbtea.instrumentation as instrumentation
+import dbtea.utils as utils
+from dbtea.artifacts import ArtifactSnapshot, ManifestIndex, as_manifest_index
+from dbtea.clients.bi.looker.base import (
+    dbt_manifest_node_to_model_schema,
+    dbt_models_to_lookml_view_strings,
+)
+from dbtea.clients.bi.looker.project_writer import (
+    DEFAULT_LOOKML_WRITE_WORKERS,
+    LookmlProjectWriter,
+)
+from dbtea.clients.bi.looker.types import LookmlTypeMapper
+from dbtea.exceptions import DbteaException
+from dbtea.logger import DBTEA_LOGGER as logger
+
+LOOKML_SYNC_STATE_FILE = ".dbtea-lookml-state.json"
+LOOKML_SYNC_STATE_VERSION = 1
+
+
+@dataclass
+class LookmlSyncResult:
+    """Names of the LookML view files touched by a sync, grouped by outcome."""
+
+    created: List[str] = field(default_factory=list)
+    updated: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+
+    def __str__(self) -> str:
+        return "{} created, {} updated, {} unchanged, {} deleted".format(
+            len(self.created), len(self.updated), len(self.unchanged), len(self.deleted)
+        )
+
+
+@instrumentation.timed()
+def sync_lookml_views(
+    manifest: Union[dict, ManifestIndex, ArtifactSnapshot],
+    catalog_data: Optional[dict],
+    output_directory: str,
+    incremental: bool = True,
+    packages: Optional[Collection[str]] = None,
+    state_file_path: Optional[str] = None,
+    workers: Optional[int] = None,
+    unique_ids: Optional[Collection[str]] = None,
+    type_mapper: Optional[LookmlTypeMapper] = None,
+) -> LookmlSyncResult:
+    """Write a `.view.lkml` file per dbt model to the output directory and delete views of removed models.
+
+    A state file records, per model, the manifest checksum, a hash of its columns and other inputs, and a hash of the
+    LookML generated from them. In incremental mode only views whose inputs changed, or whose file was edited or
+    removed since the last sync, are regenerated. Given `unique_ids`, only those models' views are synced and the
+    views of all other models are left as they are. Column types are mapped with `type_mapper`, by default using
+    the type rules of the warehouse recorded in the manifest.
+
+    `manifest` is parsed manifest data or, to avoid indexing it again, `DbtProject.manifest_index`.
+    """
+    if not os.path.isdir(output_directory):
+        raise DbteaException(
+            name="missing-lookml-output-directory",
+            title="LookML output directory does not exist",
+            detail="Cannot sync LookML views to {}, the directory does not exist".format(
+                output_directory
+            ),
+        )
+    state_file_path = state_file_path or str(
+        utils.assemble_path(output_directory, LOOKML_SYNC_STATE_FILE)
+    )
+    previous_state = _read_sync_state(state_file_path)
+    catalog_nodes = (catalog_data or {}).get("nodes", {})
+    manifest_index = as_manifest_index(manifest)
+    type_mapper = type_mapper or LookmlTypeMapper(
+        adapter=(manifest_index.property("metadata") or {}).get("adapter_type")
+    )
+
+    current_state = dict()
+    models_to_generate = list()
+    result = LookmlSyncResult()
+    for unique_id in manifest_index.unique_ids_of_type("model", packages):
+        if unique_ids is not None and unique_id not in unique_ids:
+            if unique_id in previous_state:
+                current_state[unique_id] = previous_state[unique_id]
+            continue
+
+        node_data = manifest_index.get(unique_id)
+        model_schema = dbt_manifest_node_to_model_schema(
+            node_data, catalog_nodes.get(unique_id), type_mapper=type_mapper
+        )
+        view_state = {
+            "view_file": "{}.view.lkml".format(model_schema["name"]),
+            "checksum": (node_data.get("checksum") or {}).get("checksum"),
+            "columns_hash": _hash_data(model_schema["columns"]),
+            "inputs_hash": _hash_data(model_schema),
+        }
+        previous_view_state = previous_state.get(unique_id)
+        if (
+            incremental
+            and previous_view_state
+            and _is_view_current(output_directory, view_state, previous_view_state)
+        ):
+            view_state["lookml_hash"] = previous_view_state["lookml_hash"]
+            result.unchanged.append(view_state["view_file"])
+        else:
+            models_to_generate.append((unique_id, model_schema))
+        current_state[unique_id] = view_state
+
+    lookml_view_strings = dbt_models_to_lookml_view_strings(
+        [model_schema for _, model_schema in models_to_generate], workers=workers
+    )
+    current_view_files = {
+        view_state["view_file"] for view_state in current_state.values()
+    }
+    with instrumentation.span("write_lookml_views", count=len(models_to_generate)):
+        write_result = LookmlProjectWriter(
+            output_directory, workers=workers or DEFAULT_LOOKML_WRITE_WORKERS
+        ).write(
+            (
+                (current_state[unique_id]["view_file"], lookml_string)
+                for (unique_id, _), lookml_string in zip(
+                    models_to_generate, lookml_view_strings
+                )
+            ),
+            delete_paths=[
+                previous_view_state["view_file"]
+                for previous_view_state in previous_state.values()
+                if previous_view_state["view_file"] not in current_view_files
+            ],
+        )
+    for unique_id, _ in models_to_generate:
+        view_state = current_state[unique_id]
+        view_state["lookml_hash"] = write_result.hashes[view_state["view_file"]]
+    result.created.extend(write_result.created)
+    result.updated.extend(write_result.updated)
+    result.unchanged.extend(write_result.unchanged)
+    result.deleted.extend(write_result.deleted)
+
+    _write_sync_state(state_file_path, current_state)
+    logger.info("Synced LookML views to {}: {}".format(output_directory, result))
+    return result
+
+
+def _hash_data(data) -> str:
+    return _hash_text(json.dumps(data, sort_keys=True, separators=(",", ":")))
+
+
+def _hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _is_view_current(
+    output_directory: str, view_state: dict, previous_view_state: dict
+) -> bool:
+    """Return true if a view's dbt inputs are unchanged and its file still holds the LookML last generated."""
+    for state_key in ("view_file", "checksum", "columns_hash", "inputs_hash"):
+        if view_state[state_key] != previous_view_state.get(state_key):
+            return False
+
+    view_file_path = utils.assemble_path(output_directory, view_state["view_file"])
+    if not utils.file_exists(view_file_path):
+        return False
+    with open(view_file_path, "r") as view_stream:
+        return _hash_text(view_stream.read()) == previous_view_state.get("lookml_hash")
+
+
+def _read_sync_state(state_file_path: str) -> Dict[str, dict]:
+    if not utils.file_exists(state_file_path):
+        return {}
+    state_data = utils.parse_json_file(state_file_path)
+    if state_data.get("version") != LOOKML_SYNC_STATE_VERSION:
+        logger.warning(
+            "Ignoring LookML sync state file {} written by an incompatible dbtea version".format(
+                state_file_path
+            )
+        )
+        return {}
+    return state_data.get("views", {})
+
+
+def _write_sync_state(state_file_path: str, views_state: Dict[str, dict]) -> None:
+    temporary_path = "{}.tmp".format(state_file_path)
+    with open(temporary_path, "w") as state_stream:
+        json.dump(
+            {"version": LOOKML_SYNC_STATE_VERSION, "views": views_state},
+            state_stream,
+            indent=2,
+            sort_keys=True,
+        )
+    os.replace(temporary_path, state_file_path)
@@ -1,3 +1,7 @@
+import re
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Union
+
+from dbtea.exceptions import DbteaException
 from dbtea.logger import DBTEA_LOGGER as logger
 
 LOOKML_TYPE_STRING = "string"
@@ -6,6 +10,14 @@ LOOKML_TYPE_DATE = "date"
 LOOKML_TYPE_DATETIME = "time"
 LOOKML_TYPE_BOOL = "yesno"
 LOOKML_TYPE_ZIP = "zipcode"
+LOOKML_DATA_TYPES = {
+    LOOKML_TYPE_STRING,
+    LOOKML_TYPE_NUMBER,
+    LOOKML_TYPE_DATE,
+    LOOKML_TYPE_DATETIME,
+    LOOKML_TYPE_BOOL,
+    LOOKML_TYPE_ZIP,
+}
 
 LOOKML_ZIPCODE_FIELD_NAMES = {"zipcode", "zip", "zip_code", "postalcode", "postal_code"}
 
@@ -35,25 +47,198 @@ LOOKML_NUMBER_DATA_TYPES = {
     "double precision",
 }
 
+# Warehouse specific type names, on top of the types above that most warehouses share
+ADAPTER_NUMBER_DATA_TYPES = {
+    "bigquery": {"float64", "bignumeric", "bigdecimal"},
+    "snowflake": {"fixed", "byteint", "float4", "float8"},
+    "redshift": {"int2", "int4", "int8", "float4", "float8"},
+    "postgres": {
+        "int2",
+        "int4",
+        "int8",
+        "float4",
+        "float8",
+        "smallserial",
+        "bigserial",
+        "serial2",
+        "serial4",
+        "serial8",
+    },
+}
+ADAPTER_TIME_DATA_TYPES = {
+    "bigquery": set(),
+    "snowflake": {"timestamptz", "timestampltz", "timestampntz"},
+    "redshift": {
+        "timestamptz",
+        "timestamp with time zone",
+        "timestamp without time zone",
+    },
+    "postgres": {
+        "timestamptz",
+        "timestamp with time zone",
+        "timestamp without time zone",
+    },
+}
+SUPPORTED_ADAPTERS = set(ADAPTER_NUMBER_DATA_TYPES)
+
+DATA_TYPE_PARAMETERS_PATTERN = re.compile(r"\s*\([^()]*\)")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_data_type(data_type: Optional[str]) -> str:
+    """Reduce a warehouse type name to its base type: lower case, without parameters or element types.
+
+    For example `NUMERIC(38,0)` becomes `numeric`, `TIMESTAMP(6) WITH TIME ZONE` becomes `timestamp with time zone`
+    and `ARRAY<STRUCT<id INT64>>` becomes `array`.
+    """
+    normalized_type = WHITESPACE_PATTERN.sub(" ", (data_type or "").lower()).strip()
+    normalized_type = normalized_type.split("<", 1)[0]
+    normalized_type = DATA_TYPE_PARAMETERS_PATTERN.sub("", normalized_type)
+    return normalized_type.strip()
+
+
+def _data_type_mapping(adapter: Optional[str] = None) -> Dict[str, str]:
+    """Return the normalized data type to LookML type mapping for an adapter, or for every adapter when not given."""
+    adapters = [adapter] if adapter else sorted(SUPPORTED_ADAPTERS)
+    mapping = dict()
+    for lookml_type, data_types in (
+        (LOOKML_TYPE_NUMBER, LOOKML_NUMBER_DATA_TYPES),
+        (LOOKML_TYPE_DATE, LOOKML_DATE_DATA_TYPES),
+        (LOOKML_TYPE_DATETIME, LOOKML_TIME_DATA_TYPES),
+        (LOOKML_TYPE_BOOL, LOOKML_YESNO_DATA_TYPES),
+    ):
+        mapping.update(dict.fromkeys(data_types, lookml_type))
+    for adapter_name in adapters:
+        mapping.update(
+            dict.fromkeys(ADAPTER_NUMBER_DATA_TYPES[adapter_name], LOOKML_TYPE_NUMBER)
+        )
+        mapping.update(
+            dict.fromkeys(ADAPTER_TIME_DATA_TYPES[adapter_name], LOOKML_TYPE_DATETIME)
+        )
+    return mapping
+
+
+class LookmlTypeMapper:
+    """Maps warehouse column types to LookML dimension types, with rules for the warehouse dbt runs against.
+
+    Each distinct type string is normalized and looked up once, then remembered, so mapping a whole catalog costs a
+    dictionary lookup per column. `type_overrides` map type names to LookML types ahead of the built-in rules; a
+    parameterized name like `number(38,2)` only matches that exact type, a base name like `number` matches any
+    parameters.
+    """
+
+    def __init__(
+        self,
+        adapter: Optional[str] = None,
+        type_overrides: Optional[Mapping[str, str]] = None,
+        include_postal_code: bool = False,
+    ):
+        adapter = adapter.lower() if adapter else None
+        if adapter and adapter not in SUPPORTED_ADAPTERS:
+            logger.warning(
+                "No LookML type rules for adapter {}, using rules of all supported adapters: {}".format(
+                    adapter, ", ".join(sorted(SUPPORTED_ADAPTERS))
+                )
+            )
+            adapter = None
+        self.adapter = adapter
+        self.include_postal_code = include_postal_code
+        self.type_overrides = dict()
+        for data_type, lookml_type in (type_overrides or {}).items():
+            if lookml_type not in LOOKML_DATA_TYPES:
+                raise DbteaException(
+                    name="invalid-lookml-type-override",
+                    title="Invalid LookML type override",
+                    detail="Type {} is mapped to {}, which is not one of the LookML types: {}".format(
+                        data_type, lookml_type, ", ".join(sorted(LOOKML_DATA_TYPES))
+                    ),
+                )
+            compact_type = WHITESPACE_PATTERN.sub(" ", data_type.lower()).strip()
+            self.type_overrides[compact_type.replace(", ", ",")] = lookml_type
+        self._data_type_mapping = _data_type_mapping(adapter)
+        self._lookml_types: Dict[Optional[str], str] = dict()
+
+    @classmethod
+    def from_config(
+        cls, config_data: Optional[dict], adapter: Optional[str] = None
+    ) -> "LookmlTypeMapper":
+        """Create a mapper from the `lookml_types` section of a dbtea config, e.g.
+
+        lookml_types:
+          adapter: snowflake
+          include_postal_code: true
+          overrides:
+            geography: string
+            number(38,0): number
+        """
+        type_config = (config_data or {}).get("lookml_types") or {}
+        return cls(
+            adapter=type_config.get("adapter") or adapter,
+            type_overrides=type_config.get("overrides"),
+            include_postal_code=bool(type_config.get("include_postal_code", False)),
+        )
+
+    def lookml_type(self, data_type: Optional[str]) -> str:
+        lookml_type = self._lookml_types.get(data_type)
+        if lookml_type is None:
+            lookml_type = self._map_data_type(data_type)
+            self._lookml_types[data_type] = lookml_type
+        return lookml_type
+
+    def _map_data_type(self, data_type: Optional[str]) -> str:
+        if self.type_overrides:
+            compact_type = WHITESPACE_PATTERN.sub(" ", (data_type or "").lower())
+            compact_type = compact_type.strip().replace(", ", ",")
+            if compact_type in self.type_overrides:
+                return self.type_overrides[compact_type]
+        normalized_type = normalize_data_type(data_type)
+        return self.type_overrides.get(normalized_type) or self._data_type_mapping.get(
+            normalized_type, LOOKML_TYPE_STRING
+        )
+
+    def map_types(
+        self,
+        data_types: Sequence[Optional[str]],
+        column_names: Optional[Sequence[str]] = None,
+    ) -> List[str]:
+        """Map many column types at once, looking up each distinct type only once.
+
+        With `include_postal_code`, columns whose name (from `column_names`) is a postal code name map to `zipcode`.
+        """
+        lookml_types = self._lookml_types
+        for data_type in set(data_types).difference(lookml_types):
+            lookml_types[data_type] = self._map_data_type(data_type)
+        mapped_types = [lookml_types[data_type] for data_type in data_types]
+        if self.include_postal_code and column_names is not None:
+            for index, column_name in enumerate(column_names):
+                if column_name.lower() in LOOKML_ZIPCODE_FIELD_NAMES:
+                    mapped_types[index] = LOOKML_TYPE_ZIP
+        return mapped_types
+
+    def map_columns(
+        self, catalog_columns: Union[Mapping[str, dict], Iterable[dict]]
+    ) -> Dict[str, str]:
+        """Map the columns of a catalog table (its `columns` mapping, or a list of column entries) to LookML types.
+
+        Returns a mapping of column name to LookML type, in the order the columns were given.
+        """
+        if isinstance(catalog_columns, Mapping):
+            catalog_columns = catalog_columns.values()
+        column_names, data_types = list(), list()
+        for column_data in catalog_columns:
+            column_names.append(column_data["name"])
+            data_types.append(column_data.get("type"))
+        return dict(zip(column_names, self.map_types(data_types, column_names)))
+
+
+DEFAULT_TYPE_MAPPER = LookmlTypeMapper()
+DEFAULT_POSTAL_CODE_TYPE_MAPPER = LookmlTypeMapper(include_postal_code=True)
+
 
 def convert_to_lookml_data_type(
     field_name: str, field_type: str, include_postal_code: bool = False
 ) -> str:
-    """"""
-    if include_postal_code and field_name in LOOKML_ZIPCODE_FIELD_NAMES:
-        lookml_data_type = LOOKML_TYPE_ZIP
-    elif field_type in LOOKML_YESNO_DATA_TYPES:
-        lookml_data_type = LOOKML_TYPE_BOOL
-    elif field_type in LOOKML_TIME_DATA_TYPES:
-        lookml_data_type = LOOKML_TYPE_DATETIME
-    elif field_type in LOOKML_DATE_DATA_TYPES:
-        lookml_data_type = LOOKML_TYPE_DATE
-    elif field_type in LOOKML_NUMBER_DATA_TYPES:
-        lookml_data_type = LOOKML_TYPE_NUMBER
-    else:
-        lookml_data_type = LOOKML_TYPE_STRING
-
-    logger.debug(
-        f"Field: {field_name} with data type: {field_type} was mapped to LookML type: {lookml_data_type}"
-    )
-    return lookml_data_type
+    """Map one column's warehouse type to a LookML type, using the rules of every supported adapter."""
+    if include_postal_code:
+        return DEFAULT_POSTAL_CODE_TYPE_MAPPER.map_types([field_type], [field_name])[0]
+    return DEFAULT_TYPE_MAPPER.lookml_type(field_type)
@@ -0,0 +1,206 @@
+"""
+Serialize LookML dictionaries straight to text, without building a syntax tree.
+
+"""
+import io
+from typing import IO, Any, Callable, Dict, Iterable, Optional, Sequence
+
+from lkml.keys import (
+    EXPR_BLOCK_KEYS,
+    KEYS_WITH_NAME_FIELDS,
+    PLURAL_KEYS,
+    QUOTED_LITERAL_KEYS,
+    singularize,
+)
+
+# Key tables shared with the lkml parser, as sets for constant time lookups
+LOOKML_EXPRESSION_KEYS = frozenset(EXPR_BLOCK_KEYS)
+LOOKML_KEYS_WITH_NAME_FIELDS = frozenset(KEYS_WITH_NAME_FIELDS)
+LOOKML_PLURAL_KEYS = frozenset(PLURAL_KEYS)
+LOOKML_QUOTED_KEYS = frozenset(QUOTED_LITERAL_KEYS)
+LOOKML_INDENT = "  "
+# Lists with at least this many items are written one item per line
+MULTILINE_LIST_MIN_ITEMS = 5
+
+# What was last written at the current nesting level, which decides the whitespace before the next field
+_DOCUMENT_START = "document"
+_BLOCK_START = "block start"
+_BLOCK = "block"
+_FIELD = "field"
+
+
+class LookmlWriter:
+    """Writes LookML dictionaries, in the shape `lkml.load` returns, as LookML text to a stream.
+
+    Output is identical to `lkml.dump`: repeated fields are given under their plural key (`dimensions`,
+    `dimension_groups`, `measures`, `sets`, ...) and written as one singular block per item, a block's `name` becomes
+    its block name, and values are quoted or terminated with `;;` according to their key.
+    """
+
+    def __init__(self, stream: IO[str]):
+        self._write: Callable[[str], Any] = stream.write
+        self._level = 0
+        self._parent_key: Optional[str] = None
+        self._latest = _DOCUMENT_START
+
+    def write(self, lookml_data: Dict[str, Any]) -> None:
+        self._level = 0
+        self._parent_key = None
+        self._latest = _DOCUMENT_START
+        for key, value in lookml_data.items():
+            self._write_any(key, value)
+
+    def write_repeated(self, key: str, values: Iterable[Dict[str, Any]]) -> None:
+        """Write each value under the singular of a plural key, e.g. each view of `views`, consuming values lazily.
+
+        Continues the document written so far, so the output is the same as writing a list of the values under `key`.
+        """
+        singular_key = singularize(key)
+        for value in values:
+            self._write_any(singular_key, value)
+
+    def _newline_indent(self) -> str:
+        return "\n" + LOOKML_INDENT * self._level
+
+    def _prefix(self) -> str:
+        if self._latest == _DOCUMENT_START:
+            return ""
+        if self._latest == _BLOCK:
+            return "\n" + self._newline_indent()
+        return self._newline_indent()
+
+    def _is_plural_key(self, key: str) -> bool:
+        singular_key = singularize(key)
+        return (
+            singular_key in LOOKML_PLURAL_KEYS
+            and not (
+                singular_key == "allowed_value"
+                and (self._parent_key or "").rstrip("s") == "access_grant"
+            )
+            and not (self._parent_key == "query" and singular_key != "filters")
+        )
+
+    def _write_any(self, key: str, value: Any) -> None:
+        if isinstance(value, str):
+            self._write_pair(key, value)
+        elif isinstance(value, (list, tuple)):
+            if not self._is_plural_key(key):
+                self._write_list(key, value)
+            elif key == "filters":
+                self._write_filters(value)
+            else:
+                singular_key = singularize(key)
+                for item in value:
+                    self._write_any(singular_key, item)
+        elif isinstance(value, dict):
+            if key in LOOKML_KEYS_WITH_NAME_FIELDS or "name" not in value:
+                self._write_block(key, value)
+            else:
+                self._write_block(key, value, value["name"])
+        else:
+            raise TypeError("Value must be a string, list, tuple, or dict.")
+
+    def _write_filters(self, values: Sequence[dict]) -> None:
+        """Write `filters` in whichever of LookML's three filter syntaxes the values are in."""
+        if "name" in values[0]:
+            for value in values:
+                self._write_block("filter", value, value["name"])
+        elif "field" in values[0] and "value" in values[0]:
+            for value in values:
+                self._write_block("filters", value)
+        else:
+            self._write_list("filters", values)
+
+    def _write_block(
+        self, key: str, items: Dict[str, Any], name: Optional[str] = None
+    ) -> None:
+        """Write a block, leaving out its `name` item when that is written as the block name instead."""
+        if self._latest in (_DOCUMENT_START, _BLOCK_START):
+            prefix = self._prefix()
+        else:
+            prefix = "\n" + self._newline_indent()
+        self._write(
+            "{}{}: {} {{".format(prefix, key, name)
+            if name
+            else "{}{}: {{".format(prefix, key)
+        )
+
+        parent_key = self._parent_key
+        self._parent_key = key
+        self._level += 1
+        self._latest = _BLOCK_START
+        for item_key, item_value in items.items():
+            if name is None or item_key != "name":
+                self._write_any(item_key, item_value)
+        wrote_items = self._latest != _BLOCK_START
+        self._level -= 1
+        self._parent_key = parent_key
+
+        self._write(self._newline_indent() + "}" if wrote_items else "}")
+        self._latest = _BLOCK
+
+    def _write_list(self, key: str, values: Sequence[Any]) -> None:
+        force_quote = key == "suggestions"
+        self._write("{}{}: [".format(self._prefix(), key))
+        parent_key = self._parent_key
+        self._parent_key = key
+
+        pair_mode = bool(values) and not isinstance(values[0], (str, int))
+        if len(values) >= MULTILINE_LIST_MIN_ITEMS or pair_mode:
+            self._level += 1
+            self._latest = _BLOCK_START
+            for index, value in enumerate(values):
+                if index:
+                    self._write(",")
+                if pair_mode:
+                    [(pair_key, pair_value)] = value.items()
+                    self._write_pair(pair_key, pair_value)
+                else:
+                    self._write(
+                        self._newline_indent()
+                        + self._format_value(key, value, force_quote)
+                    )
+            self._level -= 1
+            self._write("," + self._newline_indent() + "]")
+        else:
+            self._write(
+                ", ".join(
+                    self._format_value(key, value, force_quote) for value in values
+                )
+                + "]"
+            )
+
+        self._parent_key = parent_key
+        self._latest = _FIELD
+
+    def _write_pair(self, key: str, value: str) -> None:
+        force_quote = self._parent_key == "filters" and key != "field"
+        self._write(
+            "{}{}: {}".format(
+                self._prefix(), key, self._format_value(key, value, force_quote)
+            )
+        )
+        self._latest = _FIELD
+
+    @staticmethod
+    def _format_value(key: str, value: Any, force_quote: bool = False) -> str:
+        if force_quote or key in LOOKML_QUOTED_KEYS:
+            return '"{}"'.format(str(value).replace('\\"', '"').replace('"', '\\"'))
+        if key in LOOKML_EXPRESSION_KEYS:
+            return "{} ;;".format(str(value).strip())
+        return str(value)
+
+
+def dump(
+    lookml_data: Dict[str, Any], stream: Optional[IO[str]] = None
+) -> Optional[str]:
+    """Serialize a LookML dictionary, writing it to `stream` if given, otherwise returning it as a string.
+
+    A drop-in replacement for `lkml.dump` on dbtea's generation path.
+    """
+    if stream is not None:
+        LookmlWriter(stream).write(lookml_data)
+        return None
+    string_stream = io.StringIO()
+    LookmlWriter(string_stream).write(lookml_data)
+    return string_stream.getvalue()
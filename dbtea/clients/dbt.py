@@ -2,10 +2,42 @@
 Initialize dbt project data.
 
 """
+import shlex
+import sqlite3
+import subprocess
+from pathlib import Path
+from typing import Callable, Optional, Union
+
 import dbt.config.project as dbt_project
 from dbt.config.profile import PROFILES_DIR
 
 import dbtea.utils as utils
+from dbtea.artifacts import (
+    ArtifactCache,
+    ArtifactSnapshot,
+    ManifestIndex,
+    iter_artifact_entries,
+)
+from dbtea.clients.dbt_commands import (
+    DBT_CLEAN,
+    DBT_COMPILE,
+    DBT_DEBUG,
+    DBT_DEPS,
+    DBT_DOCS_GENERATE,
+    DBT_DOCS_SERVE,
+    DBT_INIT,
+    DBT_LIST,
+    DBT_PARSE,
+    DBT_RPC,
+    DBT_RUN,
+    DBT_RUN_OPERATION,
+    DBT_SEED,
+    DBT_SNAPSHOT,
+    DBT_SOURCE_SNAPSHOT_FRESHNESS,
+    DBT_TEST,
+)
+from dbtea.clients.dbt_engine import DbtEngine
+from dbtea.clients.dbt_progress import DbtProgressEvent, DbtProgressLogger
 from dbtea.exceptions import DbteaException
 from dbtea.logger import DBTEA_LOGGER as logger
 
@@ -15,27 +47,24 @@ ARTIFACT_DATA_FILES = {
     "run_results": "run_results.json",
     "sources": "sources.json",
 }
-DBT_CLEAN = ["dbt", "clean"]
-DBT_COMPILE = ["dbt", "compile"]
-DBT_DEBUG = ["dbt", "debug"]
-DBT_DEPS = ["dbt", "deps"]
-DBT_DOCS_GENERATE = ["dbt", "docs", "generate"]
-DBT_DOCS_SERVE = ["dbt", "docs", "serve"]
-DBT_LIST = ["dbt", "list"]
-DBT_INIT = ["dbt", "init"]
-DBT_PARSE = ["dbt", "parse"]
-DBT_RPC = ["dbt", "rpc"]
-DBT_RUN_OPERATION = ["dbt", "run-operation"]
-DBT_RUN = ["dbt", "run"]
-DBT_SEED = ["dbt", "seed"]
-DBT_SNAPSHOT = ["dbt", "snapshot"]
-DBT_SOURCE_SNAPSHOT_FRESHNESS = ["dbt", "source", "snapshot-freshness"]
-DBT_TEST = ["dbt", "test"]
+ARTIFACT_PARSE_MODE_FULL = "full"
+ARTIFACT_PARSE_MODE_STREAM = "stream"
+ARTIFACT_PARSE_MODES = {ARTIFACT_PARSE_MODE_FULL, ARTIFACT_PARSE_MODE_STREAM}
 
 
 class DbtProject(dbt_project.PartialProject):
     """"""
 
+    # Write a queryable snapshot of the parsed manifest to the target path, read by `manifest_index` in later runs
+    use_artifact_snapshots = True
+    # Persistent dbt worker for `run_dbt_*` commands; when unset, each command runs in a new shell subprocess
+    dbt_engine: Optional[DbtEngine] = None
+    # Log dbt subprocess output line by line as it is written, rather than once the command exits. Opt in per
+    # project: when set, `run_dbt_*` commands return a summary of node results instead of dbt's captured stdout
+    stream_dbt_output = False
+    # Called with each node start/finish event parsed from streamed dbt output
+    dbt_progress_callback: Optional[Callable[[DbtProgressEvent], None]] = None
+
     @property
     def log_path(self):
         return utils.assemble_path(
@@ -52,6 +81,12 @@ class DbtProject(dbt_project.PartialProject):
             self.project_root, self.project_dict.get("target-path", "target")
         )
 
+    @property
+    def artifact_cache(self) -> ArtifactCache:
+        if not hasattr(self, "_artifact_cache"):
+            self._artifact_cache = ArtifactCache()
+        return self._artifact_cache
+
     @property
     def catalog_artifact_data(self):
         return self._parse_artifact(ARTIFACT_DATA_FILES["catalog"])
@@ -60,6 +95,22 @@ class DbtProject(dbt_project.PartialProject):
     def manifest_artifact_data(self):
         return self._parse_artifact(ARTIFACT_DATA_FILES["manifest"])
 
+    @property
+    def manifest_index(self) -> Union[ManifestIndex, ArtifactSnapshot]:
+        """Indexes over manifest nodes, built once per version of the manifest artifact on disk.
+
+        When a fresh on-disk snapshot of the manifest exists, it is queried lazily instead of parsing the manifest.
+        """
+        manifest_file = ARTIFACT_DATA_FILES["manifest"]
+        manifest_path = self._artifact_path(manifest_file)
+        if manifest_path not in self.artifact_cache:
+            snapshot = self.artifact_snapshot(manifest_file)
+            if snapshot:
+                return snapshot
+        return self.artifact_cache.get_derived(
+            manifest_path, "index", ManifestIndex, loader=self._load_artifact
+        )
+
     @property
     def run_results_artifact_data(self):
         return self._parse_artifact(ARTIFACT_DATA_FILES["run_results"])
@@ -68,6 +119,77 @@ class DbtProject(dbt_project.PartialProject):
     def sources_artifact_data(self):
         return self._parse_artifact(ARTIFACT_DATA_FILES["sources"])
 
+    def artifact_snapshot(self, artifact_file: str) -> Optional[ArtifactSnapshot]:
+        """Return the on-disk snapshot of an artifact if one exists and still matches the artifact's content."""
+        if not self.use_artifact_snapshots:
+            return None
+        if not hasattr(self, "_artifact_snapshots"):
+            self._artifact_snapshots = dict()
+
+        snapshot = self._artifact_snapshots.get(artifact_file)
+        if snapshot and snapshot.is_fresh():
+            return snapshot
+        if snapshot:
+            snapshot.close()
+
+        snapshot = ArtifactSnapshot.load(self._artifact_path(artifact_file))
+        self._artifact_snapshots[artifact_file] = snapshot
+        return snapshot
+
+    def use_dbt_engine(self, dbt_engine: Optional[DbtEngine] = None) -> DbtEngine:
+        """Run subsequent `run_dbt_*` commands in a long-lived dbt worker process, starting one if not supplied."""
+        self.dbt_engine = dbt_engine or DbtEngine()
+        self.dbt_engine.start()
+        return self.dbt_engine
+
+    def run_results_history(self, *archive_paths: str, **kwargs):
+        """Load the latest run results with archived ones (files, archives or directories) for performance analysis.
+
+        See `dbtea.perf.load_run_results_history` for options; requires NumPy.
+        """
+        from dbtea.perf import load_run_results_history
+
+        return load_run_results_history(
+            [self._artifact_path(ARTIFACT_DATA_FILES["run_results"])]
+            + list(archive_paths),
+            **kwargs,
+        )
+
+    def schema_files(self, workers: Optional[int] = None):
+        """Load the schema YAML files under the project's model paths into a `dbtea.schema_files.SchemaFileIndex`."""
+        from dbtea.schema_files import iter_yaml_files, load_schema_files
+
+        model_paths = (
+            self.project_dict.get("model-paths")
+            or self.project_dict.get("source-paths")
+            or ["models"]
+        )
+        return load_schema_files(
+            [
+                yaml_file_path
+                for model_path in model_paths
+                for yaml_file_path in iter_yaml_files(
+                    str(utils.assemble_path(self.project_root, model_path))
+                )
+            ],
+            workers=workers,
+        )
+
+    def iter_catalog_nodes(self, **filters):
+        """Stream catalog table entries one at a time; see `dbtea.artifacts.iter_artifact_entries` for filters."""
+        return self._parse_artifact(
+            ARTIFACT_DATA_FILES["catalog"], mode=ARTIFACT_PARSE_MODE_STREAM, **filters
+        )
+
+    def iter_manifest_nodes(self, section: str = "nodes", **filters):
+        """Stream manifest nodes, sources or exposures one at a time, optionally filtered."""
+        return self._parse_artifact(
+            ARTIFACT_DATA_FILES["manifest"],
+            mode=ARTIFACT_PARSE_MODE_STREAM,
+            section=section,
+            **filters,
+        )
+
     def run_dbt_clean(self, *args, **kwargs) -> None:
         """Run `dbt clean` command to remove clean target folders (usually dbt_modules, target) from dbt project."""
         logger.info("Removing dbt clean target folders from dbt project...")
@@ -194,20 +316,31 @@ class DbtProject(dbt_project.PartialProject):
 
     def _dbt_cli_runner(self, input_command_as_list: list, *args, **kwargs):
         """Run dbt CLI command based on input options."""
-        arg_flags = list()
-        kwarg_flags = list()
-        if args:
-            for flag in args:
-                arg_flags.append(f"--{flag}")
-            input_command_as_list.extend(arg_flags)
-        if kwargs:
-            for flag, flag_value in kwargs.items():
-                kwarg_flags.append(f"--{flag} '{flag_value}'")
-            input_command_as_list.extend(kwarg_flags)
-
-        input_command = " ".join(input_command_as_list)
-
-        logger.info("Running dbt command: ".format(" ".join(input_command_as_list)))
+        input_command = utils.assemble_dbt_command(
+            input_command_as_list, *args, **kwargs
+        )
+
+        logger.info("Running dbt command: {}".format(input_command))
+        if self.dbt_engine:
+            try:
+                return self._dbt_engine_runner(input_command)
+            except (EOFError, OSError) as error:
+                logger.warning(
+                    "dbt engine is unavailable ({}), falling back to a dbt subprocess".format(
+                        error
+                    )
+                )
+                self.dbt_engine = None
+
+        if self.stream_dbt_output:
+            progress_logger = DbtProgressLogger(on_event=self.dbt_progress_callback)
+            utils.stream_cli_command(
+                shlex.split(input_command),
+                working_directory=self.project_root,
+                line_handler=progress_logger,
+            )
+            return progress_logger.summary()
+
         return utils.run_cli_command(
             input_command,
             working_directory=self.project_root,
@@ -216,12 +349,21 @@ class DbtProject(dbt_project.PartialProject):
             capture_output=True,
         )
 
-    def _parse_artifact(self, artifact_file: str):
-        """"""
-        if artifact_file not in ARTIFACT_DATA_FILES.values():
-            logger.warning(
-                "You have specified an artifact file which is not in the list of known dbt artifacts"
+    def _dbt_engine_runner(self, input_command: str) -> str:
+        """Run a dbt shell command string in the dbt engine, raising like `utils.run_cli_command` on failure."""
+        dbt_args = shlex.split(input_command)[1:]
+        result = self.dbt_engine.run(dbt_args, working_directory=self.project_root)
+        if not result.success:
+            logger.error("dbt Error: {}".format(result.output))
+            raise subprocess.CalledProcessError(
+                returncode=1, cmd=input_command, stderr=result.output
             )
+
+        logger.debug("Command Result:\n{}".format(result.output))
+        return result.output
+
+    def _artifact_path(self, artifact_file: str):
+        """Return the path of an artifact file, raising if it has not been generated yet."""
         artifact_path = utils.assemble_path(
             self.project_root, self.target_path, artifact_file
         )
@@ -234,4 +376,56 @@ class DbtProject(dbt_project.PartialProject):
                     artifact_file, artifact_path
                 ),
             )
-        return utils.parse_json_file(artifact_path)
+        return artifact_path
+
+    def _parse_artifact(
+        self,
+        artifact_file: str,
+        mode: str = ARTIFACT_PARSE_MODE_FULL,
+        section: str = "nodes",
+        **filters,
+    ):
+        """Parse an artifact file.
+
+        In `full` mode the whole file is loaded, reusing the cached result while the file is unchanged on disk. In
+        `stream` mode an iterator of (unique_id, node) entries from `section` is returned instead, decoding only the
+        entries selected by the `resource_types`, `packages` and `path_prefix` filters.
+        """
+        if artifact_file not in ARTIFACT_DATA_FILES.values():
+            logger.warning(
+                "You have specified an artifact file which is not in the list of known dbt artifacts"
+            )
+        if mode not in ARTIFACT_PARSE_MODES:
+            raise DbteaException(
+                name="invalid-artifact-parse-mode",
+                title="Invalid artifact parse mode",
+                detail="Artifact parse mode must be one of: {}".format(
+                    ARTIFACT_PARSE_MODES
+                ),
+            )
+
+        artifact_path = self._artifact_path(artifact_file)
+        if mode == ARTIFACT_PARSE_MODE_STREAM:
+            return iter_artifact_entries(artifact_path, section=section, **filters)
+        return self.artifact_cache.get(artifact_path, loader=self._load_artifact)
+
+    def _load_artifact(self, artifact_path: str) -> dict:
+        """Parse an artifact JSON file, writing the manifest's on-disk snapshot if it is missing or stale.
+
+        Only the manifest is snapshotted: `manifest_index` is the only reader of snapshots.
+        """
+        artifact_data = utils.parse_json_file(artifact_path)
+        manifest_file = ARTIFACT_DATA_FILES["manifest"]
+        if not self.use_artifact_snapshots or Path(artifact_path).name != manifest_file:
+            return artifact_data
+
+        if self.artifact_snapshot(manifest_file) is None:
+            try:
+                ArtifactSnapshot.write(artifact_path, artifact_data)
+            except (OSError, sqlite3.Error) as error:
+                logger.warning(
+                    "Unable to write snapshot for artifact {}: {}".format(
+                        artifact_path, error
+                    )
+                )
+        return artifact_data
@@ -0,0 +1,237 @@
+"""
+Run dbt commands from an asyncio event loop.
+
+"""
+import asyncio
+import shlex
+import subprocess
+import timeit
+from collections import deque
+from typing import Callable, List, Optional
+
+import dbtea.instrumentation as instrumentation
+import dbtea.utils as utils
+from dbtea.clients.dbt_commands import (
+    DBT_CLEAN,
+    DBT_COMPILE,
+    DBT_DEBUG,
+    DBT_DEPS,
+    DBT_DOCS_GENERATE,
+    DBT_LIST,
+    DBT_PARSE,
+    DBT_RUN,
+    DBT_RUN_OPERATION,
+    DBT_SEED,
+    DBT_SNAPSHOT,
+    DBT_SOURCE_SNAPSHOT_FRESHNESS,
+    DBT_TEST,
+)
+from dbtea.clients.dbt_progress import DbtProgressEvent, DbtProgressLogger
+from dbtea.exceptions import DbteaException
+from dbtea.logger import DBTEA_LOGGER as logger
+
+# Largest single line of output read from a subprocess; dbt JSON log lines can exceed asyncio's 64 KiB default
+ASYNC_STREAM_LINE_LIMIT = 16 * 1024 * 1024
+# Seconds a cancelled or timed out command is given to exit after SIGTERM before it is killed
+ASYNC_TERMINATE_GRACE_SECONDS = 10
+
+
+async def astream_cli_command(
+    command: List[str],
+    working_directory: str,
+    line_handler: Optional[Callable[[str, str], None]] = None,
+    timeout: Optional[float] = None,
+    check: bool = True,
+    tail_lines: int = utils.STREAMED_OUTPUT_TAIL_LINES,
+    **kwargs,
+) -> utils.StreamedCommandResult:
+    """Async counterpart of `utils.stream_cli_command`, run on the event loop without blocking it or using threads.
+
+    If the command runs longer than `timeout` seconds a `DbteaException` is raised, and if the awaiting task is
+    cancelled the `CancelledError` propagates; either way the subprocess is terminated first.
+    """
+    line_handler = line_handler or utils.log_output_line
+    output_tail = deque(maxlen=tail_lines)
+
+    async def handle_stream(stream: asyncio.StreamReader, stream_name: str) -> None:
+        async for raw_line in stream:
+            line = raw_line.decode("utf-8", errors="replace").rstrip("\r\n")
+            output_tail.append(line)
+            line_handler(line, stream_name)
+
+    instrumentation.increment(instrumentation.SUBPROCESSES_RUN)
+    with instrumentation.span("subprocess", command=command):
+        start_time = timeit.default_timer()
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            cwd=working_directory,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=ASYNC_STREAM_LINE_LIMIT,
+            **kwargs,
+        )
+
+        async def run_to_completion() -> int:
+            await asyncio.gather(
+                handle_stream(process.stdout, "stdout"),
+                handle_stream(process.stderr, "stderr"),
+            )
+            return await process.wait()
+
+        try:
+            returncode = await asyncio.wait_for(run_to_completion(), timeout=timeout)
+        except asyncio.TimeoutError:
+            await _terminate_process(process)
+            raise DbteaException(
+                name="command-timeout",
+                title="Command timed out",
+                detail="`{}` did not finish within {} seconds and was stopped".format(
+                    " ".join(command), timeout
+                ),
+            )
+        except asyncio.CancelledError:
+            await asyncio.shield(_terminate_process(process))
+            raise
+
+    result = utils.StreamedCommandResult(
+        args=command,
+        returncode=returncode,
+        output_tail=list(output_tail),
+        duration_seconds=timeit.default_timer() - start_time,
+    )
+    if check and not result.succeeded:
+        raise subprocess.CalledProcessError(
+            returncode=returncode, cmd=command, stderr="\n".join(result.output_tail)
+        )
+    return result
+
+
+async def _terminate_process(process: asyncio.subprocess.Process) -> None:
+    if process.returncode is not None:
+        return
+    process.terminate()
+    try:
+        await asyncio.wait_for(process.wait(), timeout=ASYNC_TERMINATE_GRACE_SECONDS)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+
+
+class AsyncDbtProject:
+    """Runs dbt commands for a dbt project as asyncio subprocesses, with `arun_dbt_*` counterparts of `DbtProject`.
+
+    Commands stream their output to the logger and report node progress to `progress_callback` as they run. Many
+    commands can be awaited concurrently from one event loop; pass a shared `concurrency_limit` semaphore to bound how
+    many dbt processes run at once. Concurrent commands in the same project should use separate target paths.
+    """
+
+    def __init__(
+        self,
+        project_root: str,
+        timeout: Optional[float] = None,
+        concurrency_limit: Optional[asyncio.Semaphore] = None,
+        progress_callback: Optional[Callable[[DbtProgressEvent], None]] = None,
+    ):
+        self.project_root = str(project_root)
+        self.timeout = timeout
+        self.concurrency_limit = concurrency_limit
+        self.progress_callback = progress_callback
+
+    async def arun_dbt_command(
+        self,
+        input_command_as_list: List[str],
+        *args,
+        timeout: Optional[float] = None,
+        **kwargs,
+    ) -> utils.StreamedCommandResult:
+        """Run a dbt command with flags assembled like `DbtProject` commands, raising on a non-zero exit code."""
+        input_command = utils.assemble_dbt_command(
+            input_command_as_list, *args, **kwargs
+        )
+        progress_logger = DbtProgressLogger(on_event=self.progress_callback)
+        timeout = timeout if timeout is not None else self.timeout
+
+        if self.concurrency_limit:
+            async with self.concurrency_limit:
+                result = await self._arun(input_command, progress_logger, timeout)
+        else:
+            result = await self._arun(input_command, progress_logger, timeout)
+        logger.info(progress_logger.summary())
+        return result
+
+    async def arun_dbt_clean(self, *args, **kwargs) -> utils.StreamedCommandResult:
+        """Run `dbt clean` command to remove clean target folders (usually dbt_modules, target) from dbt project."""
+        return await self.arun_dbt_command(DBT_CLEAN, *args, **kwargs)
+
+    async def arun_dbt_compile(self, *args, **kwargs) -> utils.StreamedCommandResult:
+        """Run `dbt compile` command to compile dbt models."""
+        return await self.arun_dbt_command(DBT_COMPILE, *args, **kwargs)
+
+    async def arun_dbt_debug(self, *args, **kwargs) -> utils.StreamedCommandResult:
+        """Run `dbt debug` command to check if your dbt_project.yml and profiles.yml files are properly configured."""
+        return await self.arun_dbt_command(DBT_DEBUG, *args, **kwargs)
+
+    async def arun_dbt_deps(self, *args, **kwargs) -> utils.StreamedCommandResult:
+        """Run `dbt deps` command to install dbt project dependencies."""
+        return await self.arun_dbt_command(DBT_DEPS, *args, **kwargs)
+
+    async def arun_dbt_docs_generate(
+        self, *args, **kwargs
+    ) -> utils.StreamedCommandResult:
+        """Run `dbt docs generate` command to generate dbt documentation artifacts."""
+        return await self.arun_dbt_command(DBT_DOCS_GENERATE, *args, **kwargs)
+
+    async def arun_dbt_list(self, *args, **kwargs) -> utils.StreamedCommandResult:
+        """Run `dbt list` (ls) command to list all resources within the dbt project."""
+        return await self.arun_dbt_command(DBT_LIST, *args, **kwargs)
+
+    async def arun_dbt_parse(self, *args, **kwargs) -> utils.StreamedCommandResult:
+        """Run `dbt parse` command to provide information on performance."""
+        return await self.arun_dbt_command(DBT_PARSE, *args, **kwargs)
+
+    async def arun_dbt_run_operation(
+        self, macro_name: str, macro_args: dict = None, *args, **kwargs
+    ) -> utils.StreamedCommandResult:
+        """Run `dbt run-operation` command to run dbt macros."""
+        operation_with_macro = DBT_RUN_OPERATION + [macro_name]
+        if macro_args:
+            operation_with_macro.append(f"--args '{macro_args}'")
+        return await self.arun_dbt_command(operation_with_macro, *args, **kwargs)
+
+    async def arun_dbt_run(self, *args, **kwargs) -> utils.StreamedCommandResult:
+        """Run `dbt run` command to run dbt models."""
+        return await self.arun_dbt_command(DBT_RUN, *args, **kwargs)
+
+    async def arun_dbt_seed(self, *args, **kwargs) -> utils.StreamedCommandResult:
+        """Run `dbt seed` command to upload seed data."""
+        return await self.arun_dbt_command(DBT_SEED, *args, **kwargs)
+
+    async def arun_dbt_snapshot(self, *args, **kwargs) -> utils.StreamedCommandResult:
+        """Run `dbt snapshot` command to execute dbt snapshots."""
+        return await self.arun_dbt_command(DBT_SNAPSHOT, *args, **kwargs)
+
+    async def arun_dbt_source_snapshot_freshness(
+        self, *args, **kwargs
+    ) -> utils.StreamedCommandResult:
+        """Run `dbt source snapshot-freshness` command to get freshness of data sources."""
+        return await self.arun_dbt_command(
+            DBT_SOURCE_SNAPSHOT_FRESHNESS, *args, **kwargs
+        )
+
+    async def arun_dbt_test(self, *args, **kwargs) -> utils.StreamedCommandResult:
+        """Run `dbt test` command to run dbt models."""
+        return await self.arun_dbt_command(DBT_TEST, *args, **kwargs)
+
+    async def _arun(
+        self,
+        input_command: str,
+        progress_logger: DbtProgressLogger,
+        timeout: Optional[float],
+    ) -> utils.StreamedCommandResult:
+        logger.info("Running dbt command: {}".format(input_command))
+        return await astream_cli_command(
+            shlex.split(input_command),
+            working_directory=self.project_root,
+            line_handler=progress_logger,
+            timeout=timeout,
+        )
@@ -0,0 +1,29 @@
+"""
+dbt CLI commands run by dbtea, as argument lists.
+
+"""
+DBT_CLEAN = ["dbt", "clean"]
+DBT_COMPILE = ["dbt", "compile"]
+DBT_DEBUG = ["dbt", "debug"]
+DBT_DEPS = ["dbt", "deps"]
+DBT_DOCS_GENERATE = ["dbt", "docs", "generate"]
+DBT_DOCS_SERVE = ["dbt", "docs", "serve"]
+DBT_LIST = ["dbt", "list"]
+DBT_INIT = ["dbt", "init"]
+DBT_PARSE = ["dbt", "parse"]
+DBT_RPC = ["dbt", "rpc"]
+DBT_RUN_OPERATION = ["dbt", "run-operation"]
+DBT_RUN = ["dbt", "run"]
+DBT_SEED = ["dbt", "seed"]
+DBT_SNAPSHOT = ["dbt", "snapshot"]
+DBT_SOURCE_SNAPSHOT_FRESHNESS = ["dbt", "source", "snapshot-freshness"]
+DBT_TEST = ["dbt", "test"]
+
+# Flag each dbt command selects nodes with: `dbt seed` and `dbt snapshot` only accept `--select`, not `--models`
+DBT_NODE_SELECTION_FLAGS = {
+    "run": "models",
+    "test": "models",
+    "seed": "select",
+    "snapshot": "select",
+    "compile": "models",
+}
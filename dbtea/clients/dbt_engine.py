@@ -0,0 +1,204 @@
+"""
+Run dbt commands in a long-lived worker process instead of a new shell subprocess per command.
+
+"""
+import importlib
+import multiprocessing
+import os
+import sys
+import tempfile
+import traceback
+from contextlib import contextmanager, redirect_stderr, redirect_stdout
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, TextIO
+
+import dbtea.instrumentation as instrumentation
+from dbtea.exceptions import DbteaException
+from dbtea.logger import DBTEA_LOGGER as logger
+
+DEFAULT_DBT_ENTRYPOINT = "dbt.main:handle_and_check"
+DEFAULT_ENGINE_START_TIMEOUT_SECONDS = 120
+DEFAULT_ENGINE_COMMAND_TIMEOUT_SECONDS = 6 * 60 * 60
+
+
+@dataclass
+class DbtEngineResult:
+    """Outcome of one dbt command run by the engine."""
+
+    success: bool
+    output: str
+
+
+class DbtEngine:
+    """Worker process that imports dbt once and runs dbt commands sent to it over a pipe.
+
+    Each command runs in-process in the worker, so back-to-back commands skip interpreter start-up and the dbt import,
+    and with `partial_parse` enabled they reuse the parse results dbt stores in the target directory instead of
+    reparsing the whole project.
+    """
+
+    def __init__(
+        self,
+        entrypoint: str = DEFAULT_DBT_ENTRYPOINT,
+        partial_parse: bool = True,
+        start_timeout: float = DEFAULT_ENGINE_START_TIMEOUT_SECONDS,
+        command_timeout: Optional[float] = DEFAULT_ENGINE_COMMAND_TIMEOUT_SECONDS,
+    ):
+        self.entrypoint = entrypoint
+        self.partial_parse = partial_parse
+        self.start_timeout = start_timeout
+        self.command_timeout = command_timeout
+        self._connection = None
+        self._process: Optional[multiprocessing.Process] = None
+
+    def __enter__(self) -> "DbtEngine":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self._process and self._process.is_alive())
+
+    def start(self) -> None:
+        """Start the worker process and wait until it has imported dbt."""
+        if self.is_running:
+            return
+
+        self._connection, worker_connection = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(
+            target=_run_engine_worker,
+            args=(worker_connection, self.entrypoint),
+            name="dbtea-dbt-engine",
+            daemon=True,
+        )
+        self._process.start()
+        worker_connection.close()
+
+        if not self._connection.poll(self.start_timeout):
+            self.close()
+            raise DbteaException(
+                name="dbt-engine-start-timeout",
+                title="dbt engine did not start",
+                detail="The dbt engine worker did not finish importing {} within {} seconds".format(
+                    self.entrypoint, self.start_timeout
+                ),
+            )
+        message = self._connection.recv()
+        if message[0] != "ready":
+            self.close()
+            raise DbteaException(
+                name="dbt-engine-start-failed",
+                title="dbt engine failed to start",
+                detail="The dbt engine worker could not load {}:\n{}".format(
+                    self.entrypoint, message[1]
+                ),
+            )
+        logger.debug("Started dbt engine worker process {}".format(self._process.pid))
+
+    def run(self, dbt_args: List[str], working_directory: str) -> DbtEngineResult:
+        """Run a dbt command (arguments after `dbt`) in the worker and return its success and captured output.
+
+        Raises:
+            EOFError, OSError: The worker process died or the pipe to it is broken.
+            DbteaException: The command did not finish within `command_timeout` seconds; the worker is restarted.
+        """
+        if not self.is_running:
+            self.start()
+        if self.partial_parse and "--partial-parse" not in dbt_args:
+            dbt_args = ["--partial-parse"] + list(dbt_args)
+
+        with instrumentation.span("dbt_engine_command", command=dbt_args):
+            self._connection.send(("run", list(dbt_args), str(working_directory)))
+            if not self._connection.poll(self.command_timeout):
+                self._restart()
+                raise DbteaException(
+                    name="dbt-engine-command-timeout",
+                    title="dbt command timed out",
+                    detail="dbt {} did not finish within {} seconds; the dbt engine worker was restarted".format(
+                        " ".join(dbt_args), self.command_timeout
+                    ),
+                )
+            _, success, output = self._connection.recv()
+        return DbtEngineResult(success=success, output=output)
+
+    def _restart(self) -> None:
+        """Terminate a worker stuck on a command and start a fresh one."""
+        logger.warning("Restarting dbt engine worker process {}".format(self._process.pid))
+        self._process.terminate()
+        self.close()
+        self.start()
+
+    def close(self) -> None:
+        """Stop the worker process."""
+        if self._connection:
+            try:
+                self._connection.send(("stop",))
+            except (OSError, ValueError):
+                pass
+            self._connection.close()
+            self._connection = None
+        if self._process:
+            self._process.join(timeout=5)
+            if self._process.is_alive():
+                self._process.terminate()
+            self._process = None
+
+
+def _run_engine_worker(connection, entrypoint: str) -> None:
+    """Worker loop: import the dbt entrypoint once, then run each command received until told to stop."""
+    try:
+        module_name, function_name = entrypoint.split(":")
+        run_dbt_command = getattr(importlib.import_module(module_name), function_name)
+    except Exception:
+        connection.send(("error", traceback.format_exc()))
+        return
+    connection.send(("ready",))
+
+    while True:
+        try:
+            message = connection.recv()
+        except EOFError:
+            break
+        if message[0] == "stop":
+            break
+
+        _, dbt_args, working_directory = message
+        with tempfile.TemporaryFile(mode="w+", buffering=1) as output:
+            with _capture_output(output):
+                try:
+                    os.chdir(working_directory)
+                    _, success = run_dbt_command(dbt_args)
+                except SystemExit as error:
+                    success = error.code in (0, None)
+                except Exception:
+                    traceback.print_exc()
+                    success = False
+            output.seek(0)
+            connection.send(("result", bool(success), output.read()))
+
+
+@contextmanager
+def _capture_output(output: TextIO) -> Iterator[None]:
+    """Send everything written to stdout and stderr into `output`, at the file descriptor level.
+
+    dbt's logbook handlers hold on to the `sys.stdout` they saw at import time, so swapping `sys.stdout` alone misses
+    them; pointing descriptors 1 and 2 at `output` catches those writes as well as any from subprocesses.
+    """
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved_descriptors = [os.dup(1), os.dup(2)]
+    os.dup2(output.fileno(), 1)
+    os.dup2(output.fileno(), 2)
+    try:
+        with redirect_stdout(output), redirect_stderr(output):
+            yield
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        output.flush()
+        for descriptor, saved_descriptor in zip((1, 2), saved_descriptors):
+            os.dup2(saved_descriptor, descriptor)
+            os.close(saved_descriptor)
@@ -0,0 +1,202 @@
+"""
+Parse dbt log output into node progress events.
+
+"""
+import json
+import re
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
+from dbtea.logger import DBTEA_LOGGER as logger
+
+DBT_PROGRESS_STARTED = "started"
+DBT_PROGRESS_FINISHED = "finished"
+# Node statuses structured (JSON) dbt logs report for a node that is still running
+DBT_RUNNING_NODE_STATUSES = {"started", "running", "compiling", "executing"}
+DBT_TEXT_START_PATTERN = re.compile(
+    r"\b(?P<index>\d+) of (?P<total>\d+) START (?P<description>.+?)[\s.]*\[RUN\]"
+)
+DBT_TEXT_FINISH_PATTERN = re.compile(
+    r"\b(?P<index>\d+) of (?P<total>\d+) (?P<status>OK|PASS|WARN|ERROR|FAIL|SKIP)\b"
+    r"(?P<description>.*?)[\s.]*\[(?P<result>[^\]]*?)(?: in (?P<elapsed>[\d.]+)s)?\]"
+)
+
+
+@dataclass
+class DbtProgressEvent:
+    """A dbt node starting or finishing, as reported by one line of dbt's log output."""
+
+    kind: str
+    node: str
+    index: Optional[int] = None
+    total: Optional[int] = None
+    status: Optional[str] = None
+    elapsed_seconds: Optional[float] = None
+
+
+def parse_dbt_log_line(line: str) -> Tuple[str, Optional[DbtProgressEvent]]:
+    """Return the human-readable message of a dbt log line, and the progress event it reports, if any.
+
+    Handles dbt's default text log lines (`1 of 5 START ... [RUN]`, `1 of 5 OK created ... [OK in 0.12s]`) as well as
+    structured lines written with `--log-format json`.
+    """
+    stripped_line = line.strip()
+    if stripped_line.startswith("{"):
+        try:
+            log_record = json.loads(stripped_line)
+        except ValueError:
+            log_record = None
+        if isinstance(log_record, dict):
+            return _parse_dbt_json_log_record(log_record)
+    return line, _parse_dbt_text_log_message(line)
+
+
+def _parse_dbt_text_log_message(message: str) -> Optional[DbtProgressEvent]:
+    start_match = DBT_TEXT_START_PATTERN.search(message)
+    if start_match:
+        return DbtProgressEvent(
+            kind=DBT_PROGRESS_STARTED,
+            node=_relation_from_description(start_match.group("description")),
+            index=int(start_match.group("index")),
+            total=int(start_match.group("total")),
+        )
+    finish_match = DBT_TEXT_FINISH_PATTERN.search(message)
+    if finish_match:
+        elapsed = finish_match.group("elapsed")
+        return DbtProgressEvent(
+            kind=DBT_PROGRESS_FINISHED,
+            node=_relation_from_description(finish_match.group("description")),
+            index=int(finish_match.group("index")),
+            total=int(finish_match.group("total")),
+            status=finish_match.group("status").lower(),
+            elapsed_seconds=float(elapsed) if elapsed else None,
+        )
+    return None
+
+
+def _parse_dbt_json_log_record(
+    log_record: dict,
+) -> Tuple[str, Optional[DbtProgressEvent]]:
+    """Handle the JSON log layouts of dbt 0.19 (`message`/`extra`) and later versions (`msg`/`info`/`data`)."""
+    info = log_record.get("info") or {}
+    data = log_record.get("data") or {}
+    message = (
+        info.get("msg") or log_record.get("msg") or log_record.get("message") or ""
+    )
+    node_info = (
+        data.get("node_info")
+        or log_record.get("node_info")
+        or log_record.get("extra")
+        or {}
+    )
+
+    node_status = node_info.get("node_status")
+    unique_id = node_info.get("unique_id")
+    if not (unique_id and node_status):
+        return message, _parse_dbt_text_log_message(message)
+
+    node_status = node_status.lower()
+    text_event = _parse_dbt_text_log_message(message)
+    index = node_info.get("node_index") or (text_event.index if text_event else None)
+    total = node_info.get("node_total") or (text_event.total if text_event else None)
+    if node_status in DBT_RUNNING_NODE_STATUSES:
+        return (
+            message,
+            DbtProgressEvent(
+                kind=DBT_PROGRESS_STARTED, node=unique_id, index=index, total=total
+            ),
+        )
+
+    elapsed_seconds = data.get("execution_time") or _elapsed_between(
+        node_info.get("node_started_at"), node_info.get("node_finished_at")
+    )
+    if elapsed_seconds is None and text_event:
+        elapsed_seconds = text_event.elapsed_seconds
+    return (
+        message,
+        DbtProgressEvent(
+            kind=DBT_PROGRESS_FINISHED,
+            node=unique_id,
+            index=index,
+            total=total,
+            status=node_status,
+            elapsed_seconds=elapsed_seconds,
+        ),
+    )
+
+
+def _relation_from_description(description: str) -> str:
+    """Return the node or relation name at the end of a description like `created view model analytics.orders`."""
+    description_parts = description.split()
+    return description_parts[-1] if description_parts else description
+
+
+def _elapsed_between(
+    started_at: Optional[str], finished_at: Optional[str]
+) -> Optional[float]:
+    if not (started_at and finished_at):
+        return None
+    try:
+        return (
+            datetime.fromisoformat(finished_at.replace("Z", "+00:00"))
+            - datetime.fromisoformat(started_at.replace("Z", "+00:00"))
+        ).total_seconds()
+    except ValueError:
+        return None
+
+
+class DbtProgressLogger:
+    """Line handler for `utils.stream_cli_command` that logs dbt output and tracks node progress events.
+
+    JSON log lines are logged as their message text, optionally prefixed (e.g. with a project name), and each node's
+    start and finish events are passed to `on_event` as they are parsed.
+    """
+
+    def __init__(
+        self,
+        prefix: str = "",
+        on_event: Optional[Callable[[DbtProgressEvent], None]] = None,
+    ):
+        self.prefix = prefix
+        self.on_event = on_event
+        self.events: List[DbtProgressEvent] = list()
+        self.status_counts: Counter = Counter()
+        self._reported_events = set()
+
+    def __call__(self, line: str, stream_name: str = "stdout") -> None:
+        message, event = parse_dbt_log_line(line)
+        if self.prefix:
+            message = "{} {}".format(self.prefix, message)
+        if stream_name == "stderr":
+            logger.warning(message)
+        else:
+            logger.info(message)
+
+        # Structured logs repeat a node's status on every line about the node, report each start and finish once
+        if event and (event.kind, event.node) not in self._reported_events:
+            self._reported_events.add((event.kind, event.node))
+            if event.kind == DBT_PROGRESS_FINISHED:
+                self.status_counts[event.status] += 1
+            self.events.append(event)
+            if self.on_event:
+                self.on_event(event)
+
+    @property
+    def finished_events(self) -> List[DbtProgressEvent]:
+        return [event for event in self.events if event.kind == DBT_PROGRESS_FINISHED]
+
+    def summary(self) -> str:
+        """Return a one-line count of finished nodes by status, e.g. `12 nodes finished: 11 ok, 1 error`."""
+        finished_count = sum(self.status_counts.values())
+        if not finished_count:
+            return "No dbt node progress reported"
+        return "{} node{} finished: {}".format(
+            finished_count,
+            "s" if finished_count != 1 else "",
+            ", ".join(
+                "{} {}".format(count, status)
+                for status, count in sorted(self.status_counts.items())
+            ),
+        )
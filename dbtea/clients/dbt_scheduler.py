@@ -0,0 +1,158 @@
+"""
+Run a dbt command across many dbt projects concurrently.
+
+"""
+import os
+import shlex
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import dbtea.utils as utils
+from dbtea.clients.dbt_progress import DbtProgressLogger
+from dbtea.logger import DBTEA_LOGGER as logger
+
+DEFAULT_SCHEDULER_WORKERS = 4
+
+
+@dataclass
+class ProjectCommandResult:
+    """Exit code and duration of a dbt command run in one project; skipped if it never started."""
+
+    project_directory: str
+    command: str
+    returncode: Optional[int] = None
+    duration_seconds: float = 0.0
+    skipped: bool = False
+
+    @property
+    def succeeded(self) -> bool:
+        return self.returncode == 0
+
+    @property
+    def project_label(self) -> str:
+        return os.path.basename(os.path.normpath(self.project_directory))
+
+
+class DbtCommandScheduler:
+    """Runs one dbt command in each of many project directories on a bounded pool of workers.
+
+    Each project's dbt output is logged line by line as it is produced, prefixed with the project's directory name. With
+    `fail_fast`, the first failure terminates running commands and skips those not yet started.
+    """
+
+    def __init__(
+        self, max_workers: int = DEFAULT_SCHEDULER_WORKERS, fail_fast: bool = False
+    ):
+        self.max_workers = max_workers
+        self.fail_fast = fail_fast
+        self._failed = threading.Event()
+        self._running_processes: Dict[str, subprocess.Popen] = dict()
+        self._lock = threading.Lock()
+
+    def run(
+        self,
+        project_directories: Sequence[str],
+        dbt_command: List[str],
+        *args,
+        **kwargs,
+    ) -> List[ProjectCommandResult]:
+        """Run the dbt command (e.g. `["dbt", "run"]`, flags as in `run_dbt_*`) in each project, in input order."""
+        command_arguments = utils.dbt_command_arguments(dbt_command, *args, **kwargs)
+        self._failed.clear()
+        logger.info(
+            "Running `{}` across {} dbt projects with {} workers".format(
+                shlex.join(command_arguments),
+                len(project_directories),
+                self.max_workers,
+            )
+        )
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = list(
+                executor.map(
+                    lambda project_directory: self._run_project_command(
+                        project_directory, command_arguments
+                    ),
+                    project_directories,
+                )
+            )
+
+        for result in results:
+            if result.skipped:
+                logger.info("[{}] skipped".format(result.project_label))
+            else:
+                logger.info(
+                    "[{}] exited with code {} in {}".format(
+                        result.project_label,
+                        result.returncode,
+                        utils.human_readable(result.duration_seconds) or "0 seconds",
+                    )
+                )
+        return results
+
+    def _run_project_command(
+        self, project_directory: str, command_arguments: List[str]
+    ) -> ProjectCommandResult:
+        result = ProjectCommandResult(project_directory, shlex.join(command_arguments))
+        if self.fail_fast and self._failed.is_set():
+            result.skipped = True
+            return result
+
+        def register_process(process: subprocess.Popen) -> None:
+            with self._lock:
+                self._running_processes[project_directory] = process
+
+        try:
+            command_result = utils.stream_cli_command(
+                command_arguments,
+                working_directory=project_directory,
+                line_handler=DbtProgressLogger(
+                    prefix="[{}]".format(result.project_label)
+                ),
+                process_started=register_process,
+                check=False,
+            )
+        except OSError as error:
+            logger.error("[{}] {}".format(result.project_label, error))
+            result.returncode = 127
+            self._failed.set()
+            if self.fail_fast:
+                self._terminate_running_processes()
+            return result
+        finally:
+            with self._lock:
+                self._running_processes.pop(project_directory, None)
+        result.returncode = command_result.returncode
+        result.duration_seconds = command_result.duration_seconds
+
+        if result.returncode != 0 and not self._failed.is_set():
+            self._failed.set()
+            if self.fail_fast:
+                self._terminate_running_processes()
+        return result
+
+    def _terminate_running_processes(self) -> None:
+        with self._lock:
+            for project_directory, process in self._running_processes.items():
+                logger.warning(
+                    "Stopping dbt command in {} after a failure in another project".format(
+                        project_directory
+                    )
+                )
+                process.terminate()
+
+
+def run_dbt_command_across_projects(
+    project_directories: Sequence[str],
+    dbt_command: List[str],
+    *args,
+    max_workers: int = DEFAULT_SCHEDULER_WORKERS,
+    fail_fast: bool = False,
+    **kwargs,
+) -> List[ProjectCommandResult]:
+    """Run a dbt command in each project directory concurrently and return per-project results in input order."""
+    return DbtCommandScheduler(max_workers=max_workers, fail_fast=fail_fast).run(
+        project_directories, dbt_command, *args, **kwargs
+    )
@@ -0,0 +1,239 @@
+"""
+Select the dbt nodes affected by the files changed in a git diff.
+
+"""
+import os
+import subprocess
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, Optional, Set
+
+from dbtea.artifacts import ManifestIndex
+from dbtea.clients.dbt_commands import DBT_NODE_SELECTION_FLAGS
+from dbtea.exceptions import DbteaException
+from dbtea.logger import DBTEA_LOGGER as logger
+
+# Changes to these project files can affect every node, so they select the whole project
+PROJECT_WIDE_FILES = {"dbt_project.yml", "packages.yml"}
+SELECTABLE_RESOURCE_TYPES = {"model", "seed", "snapshot", "test", "source", "exposure"}
+
+
+@dataclass
+class AffectedSelection:
+    """dbt nodes changed in a diff and every node downstream of them."""
+
+    changed_files: List[str]
+    changed_nodes: Set[str] = field(default_factory=set)
+    affected_nodes: Set[str] = field(default_factory=set)
+    full_build: bool = False
+
+    def nodes_of_type(
+        self, manifest_index: ManifestIndex, resource_type: str
+    ) -> Set[str]:
+        return {
+            unique_id
+            for unique_id in self.affected_nodes
+            if (manifest_index.get(unique_id) or {}).get("resource_type")
+            == resource_type
+        }
+
+    def dbt_selectors(self, manifest_index: ManifestIndex) -> List[str]:
+        """Return dbt node selectors (for `--models`/`--select`) of the affected nodes, sorted."""
+        return sorted(
+            {
+                dbt_node_selector(manifest_index.get(unique_id))
+                for unique_id in self.affected_nodes
+                if (manifest_index.get(unique_id) or {}).get("resource_type")
+                in SELECTABLE_RESOURCE_TYPES
+            }
+        )
+
+    def dbt_command_options(
+        self, manifest_index: ManifestIndex, dbt_command: str
+    ) -> Dict[str, str]:
+        """Return the `run_dbt_*` keyword arguments selecting the affected nodes, with the flag the command takes."""
+        if self.full_build:
+            return {}
+        return {
+            DBT_NODE_SELECTION_FLAGS[dbt_command]: " ".join(
+                self.dbt_selectors(manifest_index)
+            )
+        }
+
+
+def dbt_node_selector(node: dict) -> str:
+    """Return a selector matching exactly one node: its fully qualified name, or `source:`/`exposure:` method."""
+    if node.get("resource_type") == "source":
+        return "source:{}.{}".format(node["source_name"], node["name"])
+    if node.get("resource_type") == "exposure":
+        return "exposure:{}".format(node["name"])
+    return ".".join(node.get("fqn") or [node["name"]])
+
+
+def _run_git_command(arguments: List[str], working_directory: str) -> str:
+    try:
+        result = subprocess.run(
+            ["git"] + arguments,
+            cwd=working_directory,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError) as error:
+        raise DbteaException(
+            name="git-command-failed",
+            title="Unable to read git changes",
+            detail="`git {}` failed in {}: {}".format(
+                " ".join(arguments),
+                working_directory,
+                getattr(error, "stderr", None) or error,
+            ),
+        )
+    return result.stdout
+
+
+def changed_files(
+    project_directory: str,
+    base_ref: str,
+    head_ref: Optional[str] = None,
+    include_uncommitted: bool = True,
+) -> List[str]:
+    """List files changed since the merge base of `base_ref`, relative to the dbt project directory.
+
+    Compares against `head_ref`, or against the working tree (including untracked files) when it is not given and
+    `include_uncommitted` is set. Both the old and new paths of renamed files are listed; files outside the dbt
+    project directory are left out.
+    """
+    repository_root = _run_git_command(
+        ["rev-parse", "--show-toplevel"], project_directory
+    ).strip()
+    merge_base = _run_git_command(
+        ["merge-base", base_ref, head_ref or "HEAD"], project_directory
+    ).strip()
+
+    diff_arguments = ["diff", "--name-status", "-z", merge_base]
+    if head_ref:
+        diff_arguments.append(head_ref)
+    elif not include_uncommitted:
+        diff_arguments.append("HEAD")
+    diff_fields = _run_git_command(diff_arguments, project_directory).split("\0")
+
+    repository_paths = set()
+    field_index = 0
+    while field_index < len(diff_fields) and diff_fields[field_index]:
+        status = diff_fields[field_index]
+        # Renames and copies list the old and new path, other statuses list one path
+        path_count = 2 if status[0] in "RC" else 1
+        repository_paths.update(
+            diff_fields[field_index + 1 : field_index + 1 + path_count]
+        )
+        field_index += 1 + path_count
+    if not head_ref and include_uncommitted:
+        repository_paths.update(
+            path
+            for path in _run_git_command(
+                ["ls-files", "--others", "--exclude-standard", "-z", "--full-name"],
+                project_directory,
+            ).split("\0")
+            if path
+        )
+
+    project_directory = os.path.realpath(project_directory)
+    project_paths = list()
+    for repository_path in repository_paths:
+        project_path = os.path.relpath(
+            os.path.join(os.path.realpath(repository_root), repository_path),
+            project_directory,
+        )
+        if not project_path.startswith(os.pardir + os.sep):
+            project_paths.append(project_path.replace(os.sep, "/"))
+    return sorted(project_paths)
+
+
+def _changed_macros(macros: Mapping[str, dict], changed_path_set: Set[str]) -> Set[str]:
+    """Return macros defined in changed files, and the macros that call them, directly or indirectly."""
+    changed_macros = {
+        unique_id
+        for unique_id, macro in macros.items()
+        if os.path.normpath(macro.get("original_file_path") or "") in changed_path_set
+    }
+    calling_macros = dict()
+    for unique_id, macro in macros.items():
+        for called_macro in (macro.get("depends_on") or {}).get("macros") or ():
+            calling_macros.setdefault(called_macro, []).append(unique_id)
+
+    pending_macros = deque(changed_macros)
+    while pending_macros:
+        for calling_macro in calling_macros.get(pending_macros.popleft(), ()):
+            if calling_macro not in changed_macros:
+                changed_macros.add(calling_macro)
+                pending_macros.append(calling_macro)
+    return changed_macros
+
+
+def _changed_nodes(
+    manifest_index: ManifestIndex,
+    changed_path_set: Set[str],
+    macros: Mapping[str, dict],
+) -> Set[str]:
+    """Return nodes defined in, or documented in, changed files, and nodes using changed macros."""
+    changed_nodes = {
+        node["unique_id"]
+        for changed_path in changed_path_set
+        for node in manifest_index.nodes_at_path(changed_path)
+    }
+    changed_macros = _changed_macros(macros, changed_path_set)
+    for unique_id, node in manifest_index.nodes.items():
+        patch_path = node.get("patch_path")
+        if (
+            patch_path
+            and os.path.normpath(patch_path.split("://")[-1]) in changed_path_set
+        ):
+            changed_nodes.add(unique_id)
+        if changed_macros and changed_macros.intersection(
+            (node.get("depends_on") or {}).get("macros") or ()
+        ):
+            changed_nodes.add(unique_id)
+    return changed_nodes
+
+
+def select_affected_nodes(
+    manifest_index: ManifestIndex,
+    changed_paths: Iterable[str],
+    macros: Optional[Mapping[str, dict]] = None,
+    include_downstream: bool = True,
+) -> AffectedSelection:
+    """Map changed project files to manifest nodes and expand them to all downstream nodes via the child map.
+
+    Files are matched to nodes by `original_file_path` and YAML property files by each node's `patch_path`. Given
+    the manifest's `macros`, changed macros select the nodes that use them.
+    """
+    selection = AffectedSelection(changed_files=sorted(changed_paths))
+    changed_path_set = {os.path.normpath(path) for path in selection.changed_files}
+    if changed_path_set & PROJECT_WIDE_FILES:
+        logger.info("Project configuration changed, selecting every node")
+        selection.full_build = True
+        selection.changed_nodes = set(manifest_index.nodes)
+        selection.affected_nodes = set(manifest_index.nodes)
+        return selection
+
+    selection.changed_nodes = _changed_nodes(
+        manifest_index, changed_path_set, macros or {}
+    )
+    selection.affected_nodes = set(selection.changed_nodes)
+    if include_downstream:
+        pending_nodes = deque(selection.changed_nodes)
+        while pending_nodes:
+            for child_id in manifest_index.children(pending_nodes.popleft()):
+                if child_id not in selection.affected_nodes:
+                    selection.affected_nodes.add(child_id)
+                    pending_nodes.append(child_id)
+
+    logger.info(
+        "{} changed files select {} changed and {} affected dbt nodes".format(
+            len(selection.changed_files),
+            len(selection.changed_nodes),
+            len(selection.affected_nodes),
+        )
+    )
+    return selection
@@ -2,6 +2,7 @@ import json
 
 import requests
 
+import dbtea.instrumentation as instrumentation
 import dbtea.utils as utils
 from dbtea.exceptions import GitException
 from dbtea.logger import DBTEA_LOGGER as logger
@@ -34,9 +35,11 @@ def create_pull_request(
         "base": base_branch,
     }
 
-    response = requests.post(
-        github_pulls_url, headers=headers, data=json.dumps(payload)
-    )
+    instrumentation.increment(instrumentation.API_CALLS)
+    with instrumentation.span("github_api_request", path="pulls"):
+        response = requests.post(
+            github_pulls_url, headers=headers, data=json.dumps(payload)
+        )
     if response.status_code >= 400:
         raise GitException(
             name="pull-request-create-fail",
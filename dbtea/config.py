@@ -1,13 +1,18 @@
+import os
 from configparser import ConfigParser
 from pathlib import Path
 from typing import Optional
 
 import dbtea.utils as utils
-from dbtea.clients.dbt import PROFILES_DIR
 from dbtea.exceptions import DbteaException
 from dbtea.logger import DBTEA_LOGGER as logger
 
 DEFAULT_DBTEA_CONFIG = "dbtea-config.yml"
+# Resolved the same way as dbt.config.profile.PROFILES_DIR, without importing dbt
+DEFAULT_PROFILES_DIR = os.path.join(os.path.expanduser("~"), ".dbt")
+PROFILES_DIR = os.path.expanduser(os.getenv("DBT_PROFILES_DIR", DEFAULT_PROFILES_DIR))
+# Indexes and API responses cached by dbtea between runs
+DBTEA_CACHE_DIR = os.path.join(PROFILES_DIR, "dbtea-cache")
 
 
 class DbteaConfig:
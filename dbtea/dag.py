@@ -0,0 +1,360 @@
+"""
+Critical-path and parallelism analysis of the dbt DAG.
+
+"""
+import heapq
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Union
+
+from dbtea.artifacts import ArtifactSnapshot, ManifestIndex
+from dbtea.exceptions import DbteaException
+
+DEFAULT_THREAD_COUNTS = (1, 2, 4, 8, 16, 32)
+DEFAULT_RECOMMENDATION_COUNT = 5
+# Critical path nodes taking less than this share of the path's length are not worth a recommendation
+MIN_RECOMMENDATION_PATH_SHARE = 0.05
+# Smallest thread count whose simulated run time is within this factor of the best is recommended
+THREAD_RECOMMENDATION_TOLERANCE = 1.05
+MATERIALIZATION_SUGGESTIONS = {
+    "view": "materialize as a table so downstream models stop recomputing its query",
+    "table": "make incremental so each run only processes new or changed rows",
+    "incremental": "split into smaller models that can build in parallel",
+}
+DEFAULT_SUGGESTION = "split into smaller models that can build in parallel"
+
+
+@dataclass
+class CriticalPath:
+    """Longest chain of dependent nodes by duration, which bounds a run's wall-clock time at any thread count."""
+
+    unique_ids: List[str]
+    durations: List[float]
+    length_seconds: float
+    total_work_seconds: float
+    slack_seconds: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def max_parallelism(self) -> float:
+        """Average number of threads that could be kept busy with unlimited threads: total work over path length."""
+        if not self.length_seconds:
+            return 1.0
+        return self.total_work_seconds / self.length_seconds
+
+
+@dataclass
+class ScheduleSimulation:
+    """Simulated run of the DAG on a fixed number of threads."""
+
+    threads: int
+    makespan_seconds: float
+    busy_seconds: float
+
+    @property
+    def idle_seconds(self) -> float:
+        return self.threads * self.makespan_seconds - self.busy_seconds
+
+    @property
+    def speedup(self) -> float:
+        return (
+            self.busy_seconds / self.makespan_seconds if self.makespan_seconds else 1.0
+        )
+
+
+@dataclass
+class RunUtilization:
+    """How busy dbt's threads were during a recorded run."""
+
+    threads: int
+    wall_seconds: float
+    busy_seconds: float
+
+    @property
+    def idle_seconds(self) -> float:
+        return max(self.threads * self.wall_seconds - self.busy_seconds, 0.0)
+
+    @property
+    def utilization(self) -> float:
+        if not (self.threads and self.wall_seconds):
+            return 0.0
+        return self.busy_seconds / (self.threads * self.wall_seconds)
+
+
+@dataclass
+class Recommendation:
+    unique_id: str
+    duration_seconds: float
+    share_of_critical_path: float
+    materialization: Optional[str]
+    suggestion: str
+
+
+class DbtDag:
+    """dbt DAG with nodes numbered in topological order and adjacency held as lists of node numbers.
+
+    Numbering nodes so every parent comes before its children turns longest-path and scheduling computations into
+    single passes over integer lists, with no dictionary lookups per edge.
+    """
+
+    def __init__(
+        self,
+        parent_map: Mapping[str, Iterable[str]],
+        nodes: Optional[Mapping[str, dict]] = None,
+    ):
+        self.node_metadata = nodes or {}
+        unique_ids = list(parent_map)
+        node_numbers = {
+            unique_id: number for number, unique_id in enumerate(unique_ids)
+        }
+        for parent_ids in list(parent_map.values()):
+            for parent_id in parent_ids:
+                if parent_id not in node_numbers:
+                    node_numbers[parent_id] = len(unique_ids)
+                    unique_ids.append(parent_id)
+
+        parents = [
+            sorted(
+                {node_numbers[parent_id] for parent_id in parent_map.get(unique_id, ())}
+            )
+            for unique_id in unique_ids
+        ]
+        topological_order = self._topological_order(parents)
+        if len(topological_order) < len(unique_ids):
+            cyclic_nodes = sorted(
+                set(unique_ids) - {unique_ids[n] for n in topological_order}
+            )
+            raise DbteaException(
+                name="dbt-dag-cycle",
+                title="dbt DAG contains a cycle",
+                detail="Cannot order nodes with circular dependencies, including: {}".format(
+                    ", ".join(cyclic_nodes[:10])
+                ),
+            )
+
+        renumbered = [0] * len(unique_ids)
+        for position, number in enumerate(topological_order):
+            renumbered[number] = position
+        self.unique_ids: List[str] = [
+            unique_ids[number] for number in topological_order
+        ]
+        self.node_numbers: Dict[str, int] = {
+            unique_id: position for position, unique_id in enumerate(self.unique_ids)
+        }
+        self.parents: List[List[int]] = [
+            [renumbered[parent] for parent in parents[number]]
+            for number in topological_order
+        ]
+        self.children: List[List[int]] = [[] for _ in self.unique_ids]
+        for position, node_parents in enumerate(self.parents):
+            for parent in node_parents:
+                self.children[parent].append(position)
+
+    @classmethod
+    def from_manifest(cls, manifest_data: dict) -> "DbtDag":
+        return cls.from_manifest_index(ManifestIndex(manifest_data))
+
+    @classmethod
+    def from_manifest_index(
+        cls, manifest_index: Union[ManifestIndex, ArtifactSnapshot]
+    ) -> "DbtDag":
+        """Build the DAG from an existing manifest index, such as the one cached by `DbtProject.manifest_index`."""
+        return cls(manifest_index.parent_map, manifest_index.nodes)
+
+    def __len__(self) -> int:
+        return len(self.unique_ids)
+
+    @staticmethod
+    def _topological_order(parents: List[List[int]]) -> List[int]:
+        """Kahn's algorithm, keeping nodes in their original order where dependencies allow."""
+        remaining_parents = [len(node_parents) for node_parents in parents]
+        children: List[List[int]] = [[] for _ in parents]
+        for number, node_parents in enumerate(parents):
+            for parent in node_parents:
+                children[parent].append(number)
+
+        ready = deque(
+            number for number, count in enumerate(remaining_parents) if not count
+        )
+        order = list()
+        while ready:
+            number = ready.popleft()
+            order.append(number)
+            for child in children[number]:
+                remaining_parents[child] -= 1
+                if not remaining_parents[child]:
+                    ready.append(child)
+        return order
+
+    def node_durations(self, durations: Mapping[str, float]) -> List[float]:
+        """Durations in node order; nodes without a duration (e.g. sources, nodes not run) take no time."""
+        return [float(durations.get(unique_id) or 0.0) for unique_id in self.unique_ids]
+
+    def critical_path(self, durations: Mapping[str, float]) -> CriticalPath:
+        """Find the longest path by duration, and each node's slack: how much it could slow before delaying the run."""
+        node_durations = self.node_durations(durations)
+        node_count = len(node_durations)
+        earliest_finish = [0.0] * node_count
+        longest_parent = [-1] * node_count
+        for number in range(node_count):
+            start = 0.0
+            for parent in self.parents[number]:
+                if longest_parent[number] < 0 or earliest_finish[parent] > start:
+                    start = earliest_finish[parent]
+                    longest_parent[number] = parent
+            earliest_finish[number] = start + node_durations[number]
+
+        length = max(earliest_finish, default=0.0)
+        latest_finish = [length] * node_count
+        for number in range(node_count - 1, -1, -1):
+            for child in self.children[number]:
+                child_latest_start = latest_finish[child] - node_durations[child]
+                if child_latest_start < latest_finish[number]:
+                    latest_finish[number] = child_latest_start
+
+        path = list()
+        number = (
+            max(range(node_count), key=earliest_finish.__getitem__)
+            if node_count
+            else -1
+        )
+        while number >= 0:
+            path.append(number)
+            number = longest_parent[number]
+        path.reverse()
+
+        return CriticalPath(
+            unique_ids=[self.unique_ids[number] for number in path],
+            durations=[node_durations[number] for number in path],
+            length_seconds=length,
+            total_work_seconds=sum(node_durations),
+            slack_seconds={
+                unique_id: latest_finish[number] - earliest_finish[number]
+                for number, unique_id in enumerate(self.unique_ids)
+            },
+        )
+
+    def simulate_schedule(
+        self, durations: Mapping[str, float], threads: int
+    ) -> ScheduleSimulation:
+        """Simulate dbt running the DAG on `threads` threads, starting ready nodes in graph order as threads free up."""
+        if threads < 1:
+            raise ValueError("Thread count must be at least 1, got {}".format(threads))
+        node_durations = self.node_durations(durations)
+        remaining_parents = [len(node_parents) for node_parents in self.parents]
+        ready = [number for number, count in enumerate(remaining_parents) if not count]
+        heapq.heapify(ready)
+        running: List[tuple] = list()
+        now = 0.0
+
+        while ready or running:
+            while ready and len(running) < threads:
+                number = heapq.heappop(ready)
+                heapq.heappush(running, (now + node_durations[number], number))
+            now, number = heapq.heappop(running)
+            for child in self.children[number]:
+                remaining_parents[child] -= 1
+                if not remaining_parents[child]:
+                    heapq.heappush(ready, child)
+
+        return ScheduleSimulation(
+            threads=threads, makespan_seconds=now, busy_seconds=sum(node_durations)
+        )
+
+    def parallelism_profile(
+        self,
+        durations: Mapping[str, float],
+        thread_counts: Sequence[int] = DEFAULT_THREAD_COUNTS,
+    ) -> List[ScheduleSimulation]:
+        return [self.simulate_schedule(durations, threads) for threads in thread_counts]
+
+    def recommendations(
+        self,
+        critical_path: CriticalPath,
+        limit: int = DEFAULT_RECOMMENDATION_COUNT,
+    ) -> List[Recommendation]:
+        """Suggest changes to the slowest nodes on the critical path, where shortening them shortens the run."""
+        recommendations = list()
+        if not critical_path.length_seconds:
+            return recommendations
+        for unique_id, duration in sorted(
+            zip(critical_path.unique_ids, critical_path.durations),
+            key=lambda node_duration: node_duration[1],
+            reverse=True,
+        )[:limit]:
+            share = duration / critical_path.length_seconds
+            if share < MIN_RECOMMENDATION_PATH_SHARE:
+                break
+            materialization = (
+                (self.node_metadata.get(unique_id) or {}).get("config") or {}
+            ).get("materialized")
+            recommendations.append(
+                Recommendation(
+                    unique_id=unique_id,
+                    duration_seconds=duration,
+                    share_of_critical_path=share,
+                    materialization=materialization,
+                    suggestion=MATERIALIZATION_SUGGESTIONS.get(
+                        materialization, DEFAULT_SUGGESTION
+                    ),
+                )
+            )
+        return recommendations
+
+
+def recommended_thread_count(simulations: Sequence[ScheduleSimulation]) -> int:
+    """Return the fewest threads whose simulated run time is close to the best achievable."""
+    best_makespan = min(simulation.makespan_seconds for simulation in simulations)
+    return min(
+        simulation.threads
+        for simulation in simulations
+        if simulation.makespan_seconds
+        <= best_makespan * THREAD_RECOMMENDATION_TOLERANCE
+    )
+
+
+def run_results_durations(run_results_data: dict) -> Dict[str, float]:
+    """Map each node in a run results artifact to its execution time in seconds."""
+    return {
+        result["unique_id"]: float(result.get("execution_time") or 0.0)
+        for result in run_results_data.get("results") or []
+        if result.get("unique_id")
+    }
+
+
+def _parse_timestamp(timestamp: Optional[str]) -> Optional[float]:
+    if not timestamp:
+        return None
+    try:
+        return datetime.fromisoformat(timestamp.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def run_thread_utilization(run_results_data: dict) -> RunUtilization:
+    """Measure thread busy and idle time of a recorded run from its node timings and thread count."""
+    started_at, completed_at = list(), list()
+    thread_ids = set()
+    busy_seconds = 0.0
+    for result in run_results_data.get("results") or []:
+        busy_seconds += float(result.get("execution_time") or 0.0)
+        if result.get("thread_id"):
+            thread_ids.add(result["thread_id"])
+        for timing in result.get("timing") or []:
+            timing_start = _parse_timestamp(timing.get("started_at"))
+            timing_end = _parse_timestamp(timing.get("completed_at"))
+            if timing_start is not None:
+                started_at.append(timing_start)
+            if timing_end is not None:
+                completed_at.append(timing_end)
+
+    if started_at and completed_at:
+        wall_seconds = max(completed_at) - min(started_at)
+    else:
+        wall_seconds = float(run_results_data.get("elapsed_time") or 0.0)
+    threads = (
+        (run_results_data.get("args") or {}).get("threads") or len(thread_ids) or 1
+    )
+    return RunUtilization(
+        threads=int(threads), wall_seconds=wall_seconds, busy_seconds=busy_seconds
+    )
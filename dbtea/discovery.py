@@ -0,0 +1,370 @@
+"""
+Discover every dbt project below a directory, with a cached index of project roots.
+
+"""
+import hashlib
+import json
+import os
+import queue
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import dbtea.instrumentation as instrumentation
+import dbtea.utils as utils
+from dbtea.config import DBTEA_CACHE_DIR
+from dbtea.logger import DBTEA_LOGGER as logger
+
+PROJECT_INDEX_VERSION = 1
+GITIGNORE_FILE = ".gitignore"
+# Directories that never hold dbt projects of their own: git internals, dbt build output and installed packages
+PRUNED_DIRECTORY_NAMES = frozenset(
+    {".git", "target", "dbt_modules", "dbt_packages", "logs", "node_modules"}
+)
+DEFAULT_DISCOVERY_WORKERS = 8
+
+
+@dataclass(frozen=True)
+class GitignoreRule:
+    """One pattern line of a `.gitignore` file, relative to the directory holding the file."""
+
+    base_directory: str
+    pattern: "re.Pattern"
+    negated: bool = False
+    basename_only: bool = False
+
+    def matches(self, relative_path: str, name: str) -> bool:
+        if self.basename_only:
+            return bool(self.pattern.fullmatch(name))
+        if self.base_directory:
+            if not relative_path.startswith(self.base_directory + "/"):
+                return False
+            relative_path = relative_path[len(self.base_directory) + 1 :]
+        return bool(self.pattern.fullmatch(relative_path))
+
+
+def _gitignore_pattern_to_regex(pattern: str) -> "re.Pattern":
+    """Translate gitignore glob syntax (`*`, `?`, `[...]`, `**`) to a regular expression over `/`-separated paths."""
+    regex_parts = list()
+    index = 0
+    while index < len(pattern):
+        if pattern.startswith("**/", index):
+            regex_parts.append("(?:.*/)?")
+            index += 3
+        elif pattern.startswith("/**", index) and index + 3 == len(pattern):
+            regex_parts.append("/.*")
+            index += 3
+        elif pattern[index] == "*":
+            regex_parts.append("[^/]*")
+            index += 1
+        elif pattern[index] == "?":
+            regex_parts.append("[^/]")
+            index += 1
+        elif pattern[index] == "[" and "]" in pattern[index + 1 :]:
+            class_end = pattern.index("]", index + 1)
+            character_class = pattern[index + 1 : class_end].replace("\\", "\\\\")
+            if character_class.startswith("!"):
+                character_class = "^" + character_class[1:]
+            regex_parts.append("[{}]".format(character_class))
+            index = class_end + 1
+        else:
+            regex_parts.append(re.escape(pattern[index]))
+            index += 1
+    return re.compile("".join(regex_parts))
+
+
+def parse_gitignore_file(
+    gitignore_file_path: str, base_directory: str = ""
+) -> List[GitignoreRule]:
+    """Read the rules of a `.gitignore` file found at `base_directory`, relative to the scan root."""
+    rules = list()
+    try:
+        with open(gitignore_file_path, "r", errors="replace") as gitignore_stream:
+            lines = gitignore_stream.read().splitlines()
+    except OSError:
+        return rules
+
+    for line in lines:
+        line = line.rstrip()
+        if not line or line.startswith("#"):
+            continue
+        negated = line.startswith("!")
+        if negated:
+            line = line[1:]
+        line = line.rstrip("/")
+        if line.startswith("\\"):
+            line = line[1:]
+        if not line:
+            continue
+        # A pattern with a slash other than a trailing one is relative to the .gitignore's directory
+        basename_only = "/" not in line
+        rules.append(
+            GitignoreRule(
+                base_directory=base_directory,
+                pattern=_gitignore_pattern_to_regex(line.lstrip("/")),
+                negated=negated,
+                basename_only=basename_only,
+            )
+        )
+    return rules
+
+
+def is_ignored(rules: Iterable[GitignoreRule], relative_path: str, name: str) -> bool:
+    """Return true if the last rule matching the path ignores it, as git resolves conflicting patterns."""
+    ignored = False
+    for rule in rules:
+        if rule.matches(relative_path, name):
+            ignored = not rule.negated
+    return ignored
+
+
+@dataclass
+class ProjectIndex:
+    """dbt project roots found below a directory, with the modification times of every directory scanned.
+
+    Creating or removing a file or directory changes its parent directory's modification time, so the index is
+    current as long as every scanned directory, and every `.gitignore` file consulted, has the recorded time.
+    """
+
+    root: str
+    project_roots: List[str] = field(default_factory=list)
+    mtimes: Dict[str, int] = field(default_factory=dict)
+
+    def is_current(self) -> bool:
+        for relative_path, mtime in self.mtimes.items():
+            try:
+                if os.stat(os.path.join(self.root, relative_path)).st_mtime_ns != mtime:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def to_dict(self) -> dict:
+        return {
+            "version": PROJECT_INDEX_VERSION,
+            "root": self.root,
+            "project_roots": self.project_roots,
+            "mtimes": self.mtimes,
+        }
+
+    @classmethod
+    def from_dict(cls, index_data: dict) -> Optional["ProjectIndex"]:
+        if index_data.get("version") != PROJECT_INDEX_VERSION:
+            return None
+        return cls(
+            root=index_data["root"],
+            project_roots=index_data.get("project_roots", []),
+            mtimes=index_data.get("mtimes", {}),
+        )
+
+
+def _read_gitignore_rules(
+    directory: str, relative_path: str, rules: tuple, mtimes: Dict[str, int]
+) -> tuple:
+    """Add the rules of a directory's `.gitignore` file to those of its parents, recording the file's mtime."""
+    gitignore_path = os.path.join(directory, GITIGNORE_FILE)
+    try:
+        mtimes[_join_relative(relative_path, GITIGNORE_FILE)] = os.stat(
+            gitignore_path
+        ).st_mtime_ns
+    except OSError:
+        pass
+    return rules + tuple(parse_gitignore_file(gitignore_path, relative_path))
+
+
+def _subdirectories_to_scan(
+    entries: Iterable[os.DirEntry],
+    relative_path: str,
+    rules: tuple,
+    pruned_directory_names: FrozenSet[str],
+) -> List[Tuple[str, str]]:
+    """Return the path and relative path of each subdirectory entry that is neither pruned nor ignored."""
+    subdirectories = list()
+    for entry in entries:
+        if entry.name in pruned_directory_names:
+            continue
+        try:
+            if not entry.is_dir(follow_symlinks=False):
+                continue
+        except OSError:
+            continue
+        child_relative_path = _join_relative(relative_path, entry.name)
+        if rules and is_ignored(rules, child_relative_path, entry.name):
+            continue
+        subdirectories.append((entry.path, child_relative_path))
+    return subdirectories
+
+
+def _scan_queued_directories(
+    pending_directories: "queue.Queue", scan_directory: Callable, errors: list
+) -> None:
+    """Scan directories taken from the queue until a `None` sentinel, collecting errors for the caller to raise."""
+    while True:
+        pending_directory = pending_directories.get()
+        try:
+            if pending_directory is None:
+                return
+            scan_directory(*pending_directory)
+        except BaseException as error:
+            errors.append(error)
+        finally:
+            pending_directories.task_done()
+
+
+def _drain_directory_queue(
+    pending_directories: "queue.Queue", scan_directory: Callable, workers: int
+) -> None:
+    """Scan queued directories until none are left, on `workers` threads; scanning queues the subdirectories."""
+    if workers <= 1:
+        while not pending_directories.empty():
+            scan_directory(*pending_directories.get())
+        return
+
+    errors = list()
+    threads = [
+        threading.Thread(
+            target=_scan_queued_directories,
+            args=(pending_directories, scan_directory, errors),
+            daemon=True,
+        )
+        for _ in range(workers)
+    ]
+    for thread in threads:
+        thread.start()
+    pending_directories.join()
+    for _ in threads:
+        pending_directories.put(None)
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+
+
+def scan_dbt_projects(
+    root: str,
+    workers: int = DEFAULT_DISCOVERY_WORKERS,
+    pruned_directory_names: FrozenSet[str] = PRUNED_DIRECTORY_NAMES,
+) -> ProjectIndex:
+    """Find every directory holding a `dbt_project.yml` below `root` by scanning the tree with `os.scandir`.
+
+    Directories named in `pruned_directory_names` or ignored by a `.gitignore` file inside the scanned tree are not
+    descended into. Directories are scanned by a pool of `workers` threads sharing one queue, so large and small
+    subtrees are spread evenly across threads.
+    """
+    root = os.path.abspath(root)
+    index = ProjectIndex(root=root)
+    pending_directories: "queue.Queue[Optional[Tuple[str, str, tuple]]]" = queue.Queue()
+    results_lock = threading.Lock()
+
+    def scan_directory(directory: str, relative_path: str, rules: tuple) -> None:
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+            with os.scandir(directory) as directory_entries:
+                entries = list(directory_entries)
+        except OSError as error:
+            logger.debug(
+                "Skipping unreadable directory {}: {}".format(directory, error)
+            )
+            return
+
+        mtimes = {relative_path or ".": mtime}
+        names = {entry.name for entry in entries}
+        if GITIGNORE_FILE in names:
+            rules = _read_gitignore_rules(directory, relative_path, rules, mtimes)
+        for subdirectory in _subdirectories_to_scan(
+            entries, relative_path, rules, pruned_directory_names
+        ):
+            pending_directories.put(subdirectory + (rules,))
+
+        with results_lock:
+            index.mtimes.update(mtimes)
+            if utils.DBT_PROJECT_FILE in names:
+                index.project_roots.append(directory)
+
+    with instrumentation.span("scan_dbt_projects", root=root):
+        pending_directories.put((root, "", ()))
+        _drain_directory_queue(pending_directories, scan_directory, workers)
+
+    index.project_roots.sort()
+    logger.debug(
+        "Scanned {} directories below {}, found {} dbt projects".format(
+            len(index.mtimes), root, len(index.project_roots)
+        )
+    )
+    return index
+
+
+def _join_relative(relative_path: str, name: str) -> str:
+    return "{}/{}".format(relative_path, name) if relative_path else name
+
+
+def project_index_path(root: str, cache_directory: Optional[str] = None) -> str:
+    """Return the cache file path of the project index for a root directory."""
+    root_hash = hashlib.sha256(os.path.abspath(root).encode("utf-8")).hexdigest()[:16]
+    return str(
+        utils.assemble_path(
+            cache_directory or DBTEA_CACHE_DIR,
+            "project-index-{}.json".format(root_hash),
+        )
+    )
+
+
+def load_project_index(index_file_path: str) -> Optional[ProjectIndex]:
+    """Read a cached project index, or return None if it is missing, unreadable or from another dbtea version."""
+    if not utils.file_exists(index_file_path):
+        return None
+    try:
+        return ProjectIndex.from_dict(utils.parse_json_file(index_file_path))
+    except (ValueError, KeyError) as error:
+        logger.debug(
+            "Ignoring unreadable project index {}: {}".format(index_file_path, error)
+        )
+        return None
+
+
+def write_project_index(index: ProjectIndex, index_file_path: str) -> None:
+    os.makedirs(os.path.dirname(index_file_path), exist_ok=True)
+    temporary_path = "{}.{}.tmp".format(index_file_path, os.getpid())
+    with open(temporary_path, "w") as index_stream:
+        json.dump(index.to_dict(), index_stream, separators=(",", ":"))
+    os.replace(temporary_path, index_file_path)
+
+
+def _current_project_index(root: str, index_file_path: str) -> Optional[ProjectIndex]:
+    """Return the cached project index of `root` if nothing in the scanned tree changed since it was written."""
+    cached_index = load_project_index(index_file_path)
+    if cached_index and cached_index.root == root and cached_index.is_current():
+        return cached_index
+    return None
+
+
+def discover_dbt_projects(
+    root: str = ".",
+    workers: int = DEFAULT_DISCOVERY_WORKERS,
+    use_cache: bool = True,
+    cache_directory: Optional[str] = None,
+) -> List[str]:
+    """Return the root directory of every dbt project below `root`, sorted.
+
+    The result is cached in dbtea's cache directory and reused, after checking the recorded directory modification
+    times, until something in the scanned tree is added, removed or renamed.
+    """
+    root = os.path.abspath(root)
+    index_file_path = project_index_path(root, cache_directory)
+    cached_index = _current_project_index(root, index_file_path) if use_cache else None
+    if cached_index:
+        logger.debug("Using cached dbt project index {}".format(index_file_path))
+        return list(cached_index.project_roots)
+
+    index = scan_dbt_projects(root, workers=workers)
+    if use_cache:
+        try:
+            write_project_index(index, index_file_path)
+        except OSError as error:
+            logger.warning(
+                "Unable to write dbt project index {}: {}".format(
+                    index_file_path, error
+                )
+            )
+    return list(index.project_roots)
@@ -1,6 +1,7 @@
-from typing import Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, Optional
 
-import requests
+if TYPE_CHECKING:  # requests is slow to import and only used here for annotations
+    import requests
 
 
 class DbteaException(Exception):
@@ -32,16 +33,41 @@ class GitException(Exception):
         title: str,
         status: int,
         detail: str,
-        response: requests.Response,
+        response: "requests.Response",
     ):
-        request: requests.PreparedRequest = response.request
+        request: "requests.PreparedRequest" = response.request
         super().__init__("git-errors/" + provider + "/" + name, title, detail)
         self.status = status
         self.looker_api_response: Optional[dict] = _details_from_http_error(response)
         self.request = {"url": request.url, "method": request.method}
 
 
-def _details_from_http_error(response: requests.Response) -> Optional[Dict[str, Any]]:
+class LookerException(DbteaException):
+    """Exception related to Looker configuration or API calls."""
+
+    exit_code = 102
+
+    def __init__(
+        self,
+        name: str,
+        title: str,
+        status: int,
+        detail: str,
+        response: Optional["requests.Response"] = None,
+    ):
+        super().__init__("looker-errors/" + name, title, detail)
+        self.status = status
+        self.looker_api_response: Optional[dict] = (
+            _details_from_http_error(response) if response is not None else None
+        )
+        self.request = (
+            {"url": response.request.url, "method": response.request.method}
+            if response is not None
+            else None
+        )
+
+
+def _details_from_http_error(response: "requests.Response") -> Optional[Dict[str, Any]]:
     """"""
     try:
         details = response.json()
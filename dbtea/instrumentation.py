@@ -0,0 +1,248 @@
+"""
+Timing spans and counters for dbtea's hot paths, with opt-in profiling output.
+
+"""
+import cProfile
+import functools
+import json
+import os
+import threading
+import timeit
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from dbtea.logger import DBTEA_LOGGER as logger
+
+FILES_PARSED = "files_parsed"
+BYTES_READ = "bytes_read"
+API_CALLS = "api_calls"
+SUBPROCESSES_RUN = "subprocesses_run"
+CHROME_TRACE_EXTENSION = ".json"
+DEFAULT_SUMMARY_SPAN_COUNT = 15
+
+
+@dataclass
+class Span:
+    """A named, timed section of work, nested inside the span that was open when it started."""
+
+    name: str
+    start_seconds: float
+    duration_seconds: float = 0.0
+    depth: int = 0
+    parent: Optional[str] = None
+    thread_id: int = 0
+    attributes: Dict[str, object] = field(default_factory=dict)
+
+
+@dataclass
+class SpanTotals:
+    name: str
+    count: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+
+class Instrumentation:
+    """Collects timing spans and counters from every thread and asyncio task of a dbtea run.
+
+    Recording is off until `enable` is called, and while it is off spans and counters cost one attribute check, so
+    hot paths can stay instrumented. Span nesting is tracked with a context variable, which keeps concurrent threads
+    and asyncio tasks from nesting inside each other's spans.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.spans: List[Span] = list()
+        self.counters: Counter = Counter()
+        self._origin_seconds = timeit.default_timer()
+        self._lock = threading.Lock()
+        self._open_spans: ContextVar[Tuple[str, ...]] = ContextVar(
+            "dbtea_open_spans", default=()
+        )
+
+    def enable(self) -> None:
+        self.reset()
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self.spans = list()
+            self.counters = Counter()
+            self._origin_seconds = timeit.default_timer()
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[None]:
+        """Time the enclosed block as a span named `name`, with optional attributes (e.g. a file path)."""
+        if not self.enabled:
+            yield
+            return
+        open_spans = self._open_spans.get()
+        span = Span(
+            name=name,
+            start_seconds=timeit.default_timer() - self._origin_seconds,
+            depth=len(open_spans),
+            parent=open_spans[-1] if open_spans else None,
+            thread_id=threading.get_ident(),
+            attributes=attributes,
+        )
+        token = self._open_spans.set(open_spans + (name,))
+        try:
+            yield
+        finally:
+            self._open_spans.reset(token)
+            span.duration_seconds = (
+                timeit.default_timer() - self._origin_seconds - span.start_seconds
+            )
+            with self._lock:
+                self.spans.append(span)
+
+    def timed(self, name: Optional[str] = None) -> Callable:
+        """Decorator recording each call of the function as a span, named after the function by default."""
+
+        def decorator(function: Callable) -> Callable:
+            span_name = name or function.__qualname__
+
+            @functools.wraps(function)
+            def timed_function(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                with self.span(span_name):
+                    return function(*args, **kwargs)
+
+            return timed_function
+
+        return decorator
+
+    def increment(self, counter: str, amount: int = 1) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[counter] += amount
+
+    def record_file_read(self, file_path: str) -> None:
+        """Count a parsed file and its size in bytes."""
+        if not self.enabled:
+            return
+        try:
+            file_size = os.path.getsize(file_path)
+        except OSError:
+            file_size = 0
+        with self._lock:
+            self.counters[FILES_PARSED] += 1
+            self.counters[BYTES_READ] += file_size
+
+    def span_totals(self) -> List[SpanTotals]:
+        """Aggregate recorded spans by name, slowest total first."""
+        totals: Dict[str, SpanTotals] = dict()
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            span_totals = totals.setdefault(span.name, SpanTotals(span.name))
+            span_totals.count += 1
+            span_totals.total_seconds += span.duration_seconds
+            span_totals.max_seconds = max(
+                span_totals.max_seconds, span.duration_seconds
+            )
+        return sorted(
+            totals.values(),
+            key=lambda span_totals: span_totals.total_seconds,
+            reverse=True,
+        )
+
+    def format_summary(self, limit: int = DEFAULT_SUMMARY_SPAN_COUNT) -> str:
+        """Return a plain text table of the spans taking the most total time, followed by the counters."""
+        lines = [
+            "{:<48} {:>7} {:>11} {:>11}".format("span", "calls", "total (s)", "max (s)")
+        ]
+        for span_totals in self.span_totals()[:limit]:
+            lines.append(
+                "{:<48} {:>7} {:>11.3f} {:>11.3f}".format(
+                    span_totals.name[:48],
+                    span_totals.count,
+                    span_totals.total_seconds,
+                    span_totals.max_seconds,
+                )
+            )
+        for counter, value in sorted(self.counters.items()):
+            lines.append("{}: {}".format(counter, value))
+        return "\n".join(lines)
+
+    def chrome_trace(self) -> dict:
+        """Return recorded spans and counters in the Chrome trace event format (chrome://tracing, Perfetto)."""
+        process_id = os.getpid()
+        with self._lock:
+            spans = list(self.spans)
+            counters = dict(self.counters)
+        trace_events = [
+            {
+                "name": span.name,
+                "cat": "dbtea",
+                "ph": "X",
+                "ts": span.start_seconds * 1e6,
+                "dur": span.duration_seconds * 1e6,
+                "pid": process_id,
+                "tid": span.thread_id,
+                "args": {key: str(value) for key, value in span.attributes.items()},
+            }
+            for span in sorted(spans, key=lambda span: span.start_seconds)
+        ]
+        if counters:
+            trace_events.append(
+                {
+                    "name": "counters",
+                    "cat": "dbtea",
+                    "ph": "C",
+                    "ts": max(
+                        (span.start_seconds + span.duration_seconds for span in spans),
+                        default=0.0,
+                    )
+                    * 1e6,
+                    "pid": process_id,
+                    "args": counters,
+                }
+            )
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, trace_file_path: str) -> None:
+        with open(trace_file_path, "w") as trace_stream:
+            json.dump(self.chrome_trace(), trace_stream)
+
+
+INSTRUMENTATION = Instrumentation()
+span = INSTRUMENTATION.span
+timed = INSTRUMENTATION.timed
+increment = INSTRUMENTATION.increment
+record_file_read = INSTRUMENTATION.record_file_read
+
+
+@contextmanager
+def profile(output_path: Optional[str] = None) -> Iterator[Instrumentation]:
+    """Record spans and counters for the enclosed block, then log a summary and write them to `output_path`.
+
+    A `.json` output path gets a Chrome trace of the spans; any other path gets a cProfile pstats dump of the whole
+    block, for `python -m pstats` or snakeviz. Without an output path only the summary is logged.
+    """
+    write_trace = bool(output_path) and output_path.endswith(CHROME_TRACE_EXTENSION)
+    profiler = cProfile.Profile() if output_path and not write_trace else None
+    INSTRUMENTATION.enable()
+    if profiler:
+        profiler.enable()
+    try:
+        yield INSTRUMENTATION
+    finally:
+        if profiler:
+            profiler.disable()
+        INSTRUMENTATION.disable()
+        logger.info("Profile summary:\n{}".format(INSTRUMENTATION.format_summary()))
+        if write_trace:
+            INSTRUMENTATION.write_chrome_trace(output_path)
+            logger.info("Wrote Chrome trace to {}".format(output_path))
+        elif profiler:
+            profiler.dump_stats(output_path)
+            logger.info("Wrote pstats profile to {}".format(output_path))
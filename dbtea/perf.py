@@ -0,0 +1,470 @@
+"""
+Analyze dbt run performance across many historical run results artifacts.
+
+"""
+import csv
+import gzip
+import json
+import os
+import tarfile
+import zipfile
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from dbtea.exceptions import DbteaException
+from dbtea.logger import DBTEA_LOGGER as logger
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+RUN_RESULTS_FILE_PREFIX = "run_results"
+RUN_RESULTS_FILE_EXTENSIONS = (".json", ".json.gz")
+ARCHIVE_FILE_EXTENSIONS = (".zip", ".tar", ".tar.gz", ".tgz")
+DEFAULT_PERF_RESOURCE_TYPES = ("model",)
+DEFAULT_SLOWEST_NODE_COUNT = 5
+DURATION_TIMINGS = ("execution", "compile", "execute")
+PERF_REPORT_COLUMNS = (
+    "unique_id",
+    "runs",
+    "p50_seconds",
+    "p95_seconds",
+    "max_seconds",
+    "mean_seconds",
+    "latest_seconds",
+    "total_seconds",
+    "share_of_runtime",
+    "trend_seconds_per_day",
+)
+PERF_REPORT_SORT_COLUMNS = (
+    "p50_seconds",
+    "p95_seconds",
+    "max_seconds",
+    "mean_seconds",
+    "latest_seconds",
+    "total_seconds",
+    "trend_seconds_per_day",
+)
+SECONDS_PER_DAY = 86400.0
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise DbteaException(
+            name="missing-numpy",
+            title="NumPy is not installed",
+            detail="dbtea performance analysis requires NumPy, install it with `pip install dbtea[perf]`",
+        )
+
+
+def _is_run_results_file(file_name: str) -> bool:
+    return file_name.startswith(RUN_RESULTS_FILE_PREFIX) and file_name.endswith(
+        RUN_RESULTS_FILE_EXTENSIONS
+    )
+
+
+def iter_run_results_documents(paths: Iterable[str]) -> Iterator[Tuple[str, dict]]:
+    """Yield (source, data) for each run results artifact found in the given paths.
+
+    Paths may be `run_results*.json` files (optionally gzipped), zip or tar archives holding such files, or
+    directories, which are searched recursively for both.
+    """
+    for path in paths:
+        path = str(path)
+        if os.path.isdir(path):
+            for root, directory_names, file_names in os.walk(path):
+                directory_names.sort()
+                for file_name in sorted(file_names):
+                    if _is_run_results_file(file_name) or file_name.endswith(
+                        ARCHIVE_FILE_EXTENSIONS
+                    ):
+                        yield from _read_run_results_path(os.path.join(root, file_name))
+        else:
+            yield from _read_run_results_path(path)
+
+
+def _read_run_results_path(path: str) -> Iterator[Tuple[str, dict]]:
+    if path.endswith(".zip"):
+        with zipfile.ZipFile(path) as archive:
+            for member_name in sorted(archive.namelist()):
+                if _is_run_results_file(os.path.basename(member_name)):
+                    with archive.open(member_name) as member_stream:
+                        yield "{}:{}".format(path, member_name), _load_json_stream(
+                            member_stream, member_name
+                        )
+    elif path.endswith(ARCHIVE_FILE_EXTENSIONS):
+        with tarfile.open(path, "r:*") as archive:
+            for member in sorted(archive.getmembers(), key=lambda item: item.name):
+                if member.isfile() and _is_run_results_file(
+                    os.path.basename(member.name)
+                ):
+                    yield "{}:{}".format(path, member.name), _load_json_stream(
+                        archive.extractfile(member), member.name
+                    )
+    else:
+        with open(path, "rb") as run_results_stream:
+            yield path, _load_json_stream(run_results_stream, path)
+
+
+def _load_json_stream(stream, name: str) -> dict:
+    if name.endswith(".gz"):
+        stream = gzip.GzipFile(fileobj=stream)
+    return json.load(stream)
+
+
+def _parse_timestamp(timestamp: Optional[str]) -> float:
+    if not timestamp:
+        return float("nan")
+    try:
+        return datetime.fromisoformat(timestamp.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return float("nan")
+
+
+@dataclass
+class RunResultsHistory:
+    """Per-node timings from many dbt runs, held as columnar NumPy arrays with one entry per node result.
+
+    `node_codes` and `run_codes` index into `unique_ids` and `run_sources`; runs are ordered by their
+    `generated_at` time, oldest first.
+    """
+
+    unique_ids: List[str]
+    run_sources: List[str]
+    run_generated_at: "np.ndarray"
+    node_codes: "np.ndarray"
+    run_codes: "np.ndarray"
+    execution_seconds: "np.ndarray"
+    compile_seconds: "np.ndarray"
+    execute_seconds: "np.ndarray"
+    statuses: List[str]
+
+    @classmethod
+    def from_documents(
+        cls,
+        documents: Iterable[Tuple[str, dict]],
+        resource_types: Optional[Sequence[str]] = DEFAULT_PERF_RESOURCE_TYPES,
+    ) -> "RunResultsHistory":
+        _require_numpy()
+        resource_prefixes = (
+            tuple("{}.".format(resource_type) for resource_type in resource_types)
+            if resource_types
+            else None
+        )
+        runs = list()
+        for source, run_results_data in documents:
+            generated_at = _parse_timestamp(
+                (run_results_data.get("metadata") or {}).get("generated_at")
+                or run_results_data.get("generated_at")
+            )
+            runs.append((generated_at, source, run_results_data.get("results") or []))
+        # Runs without a timestamp sort first, in the order they were read
+        runs.sort(key=lambda run: -float("inf") if run[0] != run[0] else run[0])
+
+        unique_id_codes: Dict[str, int] = dict()
+        node_codes, run_codes, statuses = list(), list(), list()
+        execution_seconds, compile_seconds, execute_seconds = list(), list(), list()
+        for run_code, (_, _, results) in enumerate(runs):
+            for result in results:
+                unique_id = result.get("unique_id")
+                if not unique_id or (
+                    resource_prefixes and not unique_id.startswith(resource_prefixes)
+                ):
+                    continue
+                timings = {
+                    timing.get("name"): _parse_timestamp(timing.get("completed_at"))
+                    - _parse_timestamp(timing.get("started_at"))
+                    for timing in result.get("timing") or []
+                }
+                node_codes.append(
+                    unique_id_codes.setdefault(unique_id, len(unique_id_codes))
+                )
+                run_codes.append(run_code)
+                statuses.append(str(result.get("status")))
+                execution_time = result.get("execution_time")
+                execution_seconds.append(
+                    float("nan") if execution_time is None else float(execution_time)
+                )
+                compile_seconds.append(timings.get("compile", float("nan")))
+                execute_seconds.append(timings.get("execute", float("nan")))
+
+        return cls(
+            unique_ids=list(unique_id_codes),
+            run_sources=[source for _, source, _ in runs],
+            run_generated_at=np.array([run[0] for run in runs], dtype=np.float64),
+            node_codes=np.array(node_codes, dtype=np.int64),
+            run_codes=np.array(run_codes, dtype=np.int64),
+            execution_seconds=np.array(execution_seconds, dtype=np.float64),
+            compile_seconds=np.array(compile_seconds, dtype=np.float64),
+            execute_seconds=np.array(execute_seconds, dtype=np.float64),
+            statuses=statuses,
+        )
+
+    def __len__(self) -> int:
+        return len(self.node_codes)
+
+    def durations(self, timing: str = "execution") -> "np.ndarray":
+        """Return per-result durations in seconds: dbt's `execution_time`, or the `compile`/`execute` timing step."""
+        if timing not in DURATION_TIMINGS:
+            raise ValueError(
+                "Unknown timing {}, choose from: {}".format(timing, DURATION_TIMINGS)
+            )
+        return getattr(self, "{}_seconds".format(timing))
+
+
+def load_run_results_history(
+    paths: Iterable[str],
+    resource_types: Optional[Sequence[str]] = DEFAULT_PERF_RESOURCE_TYPES,
+) -> RunResultsHistory:
+    """Load every run results artifact in the given files, archives and directories into one columnar history."""
+    history = RunResultsHistory.from_documents(
+        iter_run_results_documents(paths), resource_types=resource_types
+    )
+    logger.info(
+        "Loaded {} node results for {} nodes from {} dbt runs".format(
+            len(history), len(history.unique_ids), len(history.run_sources)
+        )
+    )
+    return history
+
+
+def _grouped_percentile(
+    sorted_values: "np.ndarray",
+    group_starts: "np.ndarray",
+    group_counts: "np.ndarray",
+    quantile: float,
+) -> "np.ndarray":
+    """Linearly interpolated percentile of each group of `sorted_values`, whose groups are contiguous and sorted."""
+    positions = group_starts + quantile * (group_counts - 1)
+    lower_positions = np.floor(positions).astype(np.int64)
+    upper_positions = np.ceil(positions).astype(np.int64)
+    lower_values = sorted_values[lower_positions]
+    return lower_values + (sorted_values[upper_positions] - lower_values) * (
+        positions - lower_positions
+    )
+
+
+@dataclass
+class PerfReport:
+    """Duration statistics per dbt node, one array per column of `PERF_REPORT_COLUMNS`."""
+
+    columns: Dict[str, "np.ndarray"]
+
+    @classmethod
+    def from_history(
+        cls, history: RunResultsHistory, timing: str = "execution"
+    ) -> "PerfReport":
+        """Compute p50/p95/max/mean/latest durations, share of total runtime and trend per node, vectorized."""
+        _require_numpy()
+        durations = history.durations(timing)
+        has_duration = ~np.isnan(durations)
+        node_codes = history.node_codes[has_duration]
+        durations = durations[has_duration]
+        run_times = history.run_generated_at[history.run_codes[has_duration]]
+        if not len(durations):
+            return cls(
+                columns={
+                    column: np.array(
+                        [], dtype=object if column == "unique_id" else None
+                    )
+                    for column in PERF_REPORT_COLUMNS
+                }
+            )
+
+        node_count = len(history.unique_ids)
+        counts = np.bincount(node_codes, minlength=node_count)
+        present = counts > 0
+        node_codes_present = np.flatnonzero(present)
+        counts_present = counts[present]
+
+        # Sort by node, then duration, so each node's durations form one sorted, contiguous group
+        value_order = np.lexsort((durations, node_codes))
+        sorted_durations = durations[value_order]
+        group_starts = np.concatenate(([0], np.cumsum(counts_present)[:-1]))
+        totals = np.bincount(node_codes, weights=durations, minlength=node_count)[
+            present
+        ]
+
+        # Latest duration per node: sort by node, then run time, and take the end of each group
+        time_order = np.lexsort((np.nan_to_num(run_times, nan=-np.inf), node_codes))
+        latest = durations[time_order][group_starts + counts_present - 1]
+
+        # Least-squares slope of duration against run time, from per-node sums
+        timed_runs = run_times[~np.isnan(run_times)]
+        first_run_time = timed_runs.min() if len(timed_runs) else 0.0
+        days = np.nan_to_num((run_times - first_run_time) / SECONDS_PER_DAY)
+        sum_days = np.bincount(node_codes, weights=days, minlength=node_count)[present]
+        sum_days_squared = np.bincount(
+            node_codes, weights=days * days, minlength=node_count
+        )[present]
+        sum_days_durations = np.bincount(
+            node_codes, weights=days * durations, minlength=node_count
+        )[present]
+        trend_denominator = counts_present * sum_days_squared - sum_days**2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            trend = np.where(
+                trend_denominator > 0,
+                (counts_present * sum_days_durations - sum_days * totals)
+                / trend_denominator,
+                np.nan,
+            )
+
+        grand_total = totals.sum()
+        return cls(
+            columns={
+                "unique_id": np.array(history.unique_ids, dtype=object)[
+                    node_codes_present
+                ],
+                "runs": counts_present,
+                "p50_seconds": _grouped_percentile(
+                    sorted_durations, group_starts, counts_present, 0.5
+                ),
+                "p95_seconds": _grouped_percentile(
+                    sorted_durations, group_starts, counts_present, 0.95
+                ),
+                "max_seconds": sorted_durations[group_starts + counts_present - 1],
+                "mean_seconds": totals / counts_present,
+                "latest_seconds": latest,
+                "total_seconds": totals,
+                "share_of_runtime": (
+                    totals / grand_total if grand_total else np.zeros_like(totals)
+                ),
+                "trend_seconds_per_day": trend,
+            }
+        )
+
+    def __len__(self) -> int:
+        return len(self.columns["unique_id"])
+
+    def sorted_by(
+        self, column: str = "p50_seconds", limit: Optional[int] = None
+    ) -> "PerfReport":
+        """Return the report ordered by a column, largest first, optionally keeping only the first `limit` nodes."""
+        if column not in PERF_REPORT_SORT_COLUMNS:
+            raise ValueError(
+                "Cannot sort by {}, choose from: {}".format(
+                    column, PERF_REPORT_SORT_COLUMNS
+                )
+            )
+        order = np.argsort(
+            -np.nan_to_num(self.columns[column], nan=-np.inf), kind="stable"
+        )[:limit]
+        return PerfReport(
+            columns={name: values[order] for name, values in self.columns.items()}
+        )
+
+    def slowest(
+        self, count: int = DEFAULT_SLOWEST_NODE_COUNT, column: str = "p50_seconds"
+    ) -> "PerfReport":
+        return self.sorted_by(column, limit=count)
+
+    def regressions(self, count: int = DEFAULT_SLOWEST_NODE_COUNT) -> "PerfReport":
+        """Return the nodes whose duration grows fastest over time."""
+        growing = np.nan_to_num(self.columns["trend_seconds_per_day"]) > 0
+        return PerfReport(
+            columns={name: values[growing] for name, values in self.columns.items()}
+        ).sorted_by("trend_seconds_per_day", limit=count)
+
+    def rows(self) -> Iterator[dict]:
+        for row_index in range(len(self)):
+            yield {
+                column: _to_python_value(self.columns[column][row_index])
+                for column in self.columns
+            }
+
+    def format_table(self) -> str:
+        """Format the report as a fixed-width text table for the terminal."""
+        header = [
+            "unique_id",
+            "runs",
+            "p50",
+            "p95",
+            "max",
+            "latest",
+            "share",
+            "trend/day",
+        ]
+        table_rows = [header]
+        for row in self.rows():
+            table_rows.append(
+                [
+                    row["unique_id"],
+                    str(row["runs"]),
+                    _format_seconds(row["p50_seconds"]),
+                    _format_seconds(row["p95_seconds"]),
+                    _format_seconds(row["max_seconds"]),
+                    _format_seconds(row["latest_seconds"]),
+                    "{:.1%}".format(row["share_of_runtime"]),
+                    _format_seconds(row["trend_seconds_per_day"], signed=True),
+                ]
+            )
+        widths = [
+            max(len(row[index]) for row in table_rows) for index in range(len(header))
+        ]
+        return "\n".join(
+            "  ".join(
+                value.ljust(width) if index == 0 else value.rjust(width)
+                for index, (value, width) in enumerate(zip(row, widths))
+            )
+            for row in table_rows
+        )
+
+    def write(self, output_path: str) -> None:
+        """Write the report to a `.csv` or `.parquet` file, chosen by the file extension."""
+        if output_path.endswith(".parquet"):
+            self._write_parquet(output_path)
+        elif output_path.endswith(".csv"):
+            self._write_csv(output_path)
+        else:
+            raise DbteaException(
+                name="unsupported-report-format",
+                title="Unsupported performance report format",
+                detail="Cannot write report to {}, use a .csv or .parquet file".format(
+                    output_path
+                ),
+            )
+        logger.info(
+            "Wrote performance report for {} nodes to {}".format(len(self), output_path)
+        )
+
+    def _write_csv(self, output_path: str) -> None:
+        with open(output_path, "w", newline="") as report_stream:
+            writer = csv.DictWriter(report_stream, fieldnames=list(self.columns))
+            writer.writeheader()
+            writer.writerows(self.rows())
+
+    def _write_parquet(self, output_path: str) -> None:
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise DbteaException(
+                name="missing-pyarrow",
+                title="pyarrow is not installed",
+                detail="Writing Parquet reports requires pyarrow, install it with `pip install pyarrow`",
+            )
+        pyarrow.parquet.write_table(
+            pyarrow.table(
+                {
+                    name: list(values) if values.dtype == object else values
+                    for name, values in self.columns.items()
+                }
+            ),
+            output_path,
+        )
+
+
+def _to_python_value(value):
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+def _format_seconds(seconds: Optional[float], signed: bool = False) -> str:
+    if seconds is None:
+        return "-"
+    return "{:+.1f}s".format(seconds) if signed else "{:.1f}s".format(seconds)
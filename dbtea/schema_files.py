@@ -0,0 +1,290 @@
+"""
+Bulk loading of dbt schema YAML files into an index of models, sources and columns.
+
+"""
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import dbtea.instrumentation as instrumentation
+import dbtea.utils as utils
+from dbtea.discovery import PRUNED_DIRECTORY_NAMES
+from dbtea.exceptions import DbteaException
+from dbtea.logger import DBTEA_LOGGER as logger
+
+YAML_FILE_EXTENSIONS = (".yml", ".yaml")
+DEFAULT_YAML_CACHE_MAX_ENTRIES = 10000
+# Below this many files, starting worker processes costs more than parsing the files serially
+MIN_FILES_FOR_PARALLEL_PARSING = 64
+YAML_FILES_PER_TASK = 32
+
+FileSignature = Tuple[int, int]
+
+
+class YamlFileCache:
+    """Least-recently-used cache of parsed YAML files, keyed by path and validated by modification time and size.
+
+    Parsed data is shared between callers, so it must be treated as read-only.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_YAML_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[FileSignature, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, yaml_file_path: str, signature: FileSignature) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(yaml_file_path)
+            if entry is None or entry[0] != signature:
+                return None
+            self._entries.move_to_end(yaml_file_path)
+            return entry[1]
+
+    def store(
+        self, yaml_file_path: str, signature: FileSignature, yaml_data: dict
+    ) -> None:
+        with self._lock:
+            self._entries[yaml_file_path] = (signature, yaml_data)
+            self._entries.move_to_end(yaml_file_path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+YAML_FILE_CACHE = YamlFileCache()
+
+
+def _file_signature(file_path: str) -> FileSignature:
+    file_stat = os.stat(file_path)
+    return file_stat.st_mtime_ns, file_stat.st_size
+
+
+def _parse_yaml_files(
+    yaml_file_paths: Sequence[str],
+) -> List[Tuple[str, Optional[dict], Optional[str]]]:
+    """Parse a batch of YAML files, returning each path with its data or the error that stopped it from parsing."""
+    import yaml
+
+    loader = utils.yaml_safe_loader()
+    parsed_files = list()
+    for yaml_file_path in yaml_file_paths:
+        try:
+            with open(yaml_file_path, "r") as yaml_stream:
+                parsed_files.append(
+                    (yaml_file_path, yaml.load(yaml_stream, Loader=loader) or {}, None)
+                )
+        except (OSError, yaml.YAMLError) as error:
+            parsed_files.append((yaml_file_path, None, str(error)))
+    return parsed_files
+
+
+def load_yaml_files(
+    yaml_file_paths: Iterable[str],
+    workers: Optional[int] = None,
+    cache: Optional[YamlFileCache] = YAML_FILE_CACHE,
+) -> Dict[str, dict]:
+    """Parse many YAML files with the C loader when available, returning a mapping of path to parsed data.
+
+    Files unchanged since they were last parsed are served from `cache`. With more than one worker, and enough files
+    to parse to be worth it, files are parsed in batches across a pool of worker processes.
+    """
+    yaml_file_paths = list(dict.fromkeys(str(path) for path in yaml_file_paths))
+    yaml_files_data: Dict[str, dict] = dict()
+    signatures: Dict[str, FileSignature] = dict()
+    paths_to_parse = list()
+    for yaml_file_path in yaml_file_paths:
+        try:
+            signatures[yaml_file_path] = _file_signature(yaml_file_path)
+        except OSError:
+            raise DbteaException(
+                name="missing-yaml-file",
+                title="YAML file set to parse is missing",
+                detail="Attempted to parse YAML file at path {}, however this path is not a file".format(
+                    yaml_file_path
+                ),
+            )
+        cached_data = (
+            cache.get(yaml_file_path, signatures[yaml_file_path])
+            if cache is not None
+            else None
+        )
+        if cached_data is not None:
+            yaml_files_data[yaml_file_path] = cached_data
+        else:
+            paths_to_parse.append(yaml_file_path)
+
+    with instrumentation.span(
+        "load_yaml_files", files=len(paths_to_parse), cached=len(yaml_files_data)
+    ):
+        batches = [
+            paths_to_parse[index : index + YAML_FILES_PER_TASK]
+            for index in range(0, len(paths_to_parse), YAML_FILES_PER_TASK)
+        ]
+        if (
+            workers
+            and workers > 1
+            and len(paths_to_parse) >= MIN_FILES_FOR_PARALLEL_PARSING
+        ):
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                parsed_batches = list(executor.map(_parse_yaml_files, batches))
+        else:
+            parsed_batches = [_parse_yaml_files(batch) for batch in batches]
+
+    for parsed_files in parsed_batches:
+        for yaml_file_path, yaml_data, error_message in parsed_files:
+            if error_message is not None:
+                raise DbteaException(
+                    name="invalid-yaml-file",
+                    title="Unable to parse YAML file",
+                    detail="Failed to parse YAML file {}: {}".format(
+                        yaml_file_path, error_message
+                    ),
+                )
+            instrumentation.record_file_read(yaml_file_path)
+            if cache is not None:
+                cache.store(yaml_file_path, signatures[yaml_file_path], yaml_data)
+            yaml_files_data[yaml_file_path] = yaml_data
+
+    logger.debug(
+        "Loaded {} YAML files, {} from cache".format(
+            len(yaml_file_paths), len(yaml_file_paths) - len(paths_to_parse)
+        )
+    )
+    return {
+        yaml_file_path: yaml_files_data[yaml_file_path]
+        for yaml_file_path in yaml_file_paths
+    }
+
+
+def iter_yaml_files(directory: str) -> Iterator[str]:
+    """Yield the path of every YAML file below a directory, skipping dbt build output and installed packages."""
+    pending_directories = [str(directory)]
+    while pending_directories:
+        try:
+            with os.scandir(pending_directories.pop()) as directory_entries:
+                entries = sorted(directory_entries, key=lambda entry: entry.name)
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in PRUNED_DIRECTORY_NAMES:
+                    pending_directories.append(entry.path)
+            elif entry.name.endswith(YAML_FILE_EXTENSIONS):
+                yield entry.path
+
+
+@dataclass
+class SchemaFile:
+    """Models, source tables and their columns declared in one dbt schema YAML file.
+
+    Source tables are keyed `<source name>.<table name>`, and columns by model name or source table key, then by
+    lower case column name.
+    """
+
+    path: str
+    models: Dict[str, dict] = field(default_factory=dict)
+    sources: Dict[str, dict] = field(default_factory=dict)
+    columns: Dict[str, Dict[str, dict]] = field(default_factory=dict)
+
+    @classmethod
+    def from_yaml_data(cls, path: str, yaml_data: dict) -> "SchemaFile":
+        schema_file = cls(path)
+        for model_data in yaml_data.get("models") or []:
+            if model_data and model_data.get("name"):
+                schema_file.models[model_data["name"]] = model_data
+                schema_file._add_columns(model_data["name"], model_data)
+        for source_data in yaml_data.get("sources") or []:
+            if not (source_data and source_data.get("name")):
+                continue
+            for table_data in source_data.get("tables") or []:
+                if table_data and table_data.get("name"):
+                    table_key = "{}.{}".format(source_data["name"], table_data["name"])
+                    schema_file.sources[table_key] = table_data
+                    schema_file._add_columns(table_key, table_data)
+        return schema_file
+
+    def _add_columns(self, key: str, resource_data: dict) -> None:
+        self.columns[key] = {
+            column_data["name"].lower(): column_data
+            for column_data in resource_data.get("columns") or []
+            if column_data and column_data.get("name")
+        }
+
+
+class SchemaFileIndex(Mapping[str, SchemaFile]):
+    """Schema files by path, with lookups of any model or source table to the file that declares it."""
+
+    def __init__(self, schema_files: Iterable[SchemaFile]):
+        self._schema_files: Dict[str, SchemaFile] = dict()
+        self._model_paths: Dict[str, str] = dict()
+        self._source_paths: Dict[str, str] = dict()
+        for schema_file in schema_files:
+            self._schema_files[schema_file.path] = schema_file
+            for model_name in schema_file.models:
+                self._model_paths.setdefault(model_name, schema_file.path)
+            for table_key in schema_file.sources:
+                self._source_paths.setdefault(table_key, schema_file.path)
+
+    def __getitem__(self, path: str) -> SchemaFile:
+        return self._schema_files[path]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._schema_files)
+
+    def __len__(self) -> int:
+        return len(self._schema_files)
+
+    def model_path(self, model_name: str) -> Optional[str]:
+        return self._model_paths.get(model_name)
+
+    def model(self, model_name: str) -> Optional[dict]:
+        path = self._model_paths.get(model_name)
+        return self._schema_files[path].models[model_name] if path else None
+
+    def source(self, source_name: str, table_name: str) -> Optional[dict]:
+        table_key = "{}.{}".format(source_name, table_name)
+        path = self._source_paths.get(table_key)
+        return self._schema_files[path].sources[table_key] if path else None
+
+    def columns(self, model_name: str) -> Dict[str, dict]:
+        """Return the documented columns of a model (or `<source>.<table>`) by lower case column name."""
+        path = self._model_paths.get(model_name) or self._source_paths.get(model_name)
+        return self._schema_files[path].columns.get(model_name, {}) if path else {}
+
+
+def load_schema_files(
+    paths: Union[str, Iterable[str]],
+    workers: Optional[int] = None,
+    cache: Optional[YamlFileCache] = YAML_FILE_CACHE,
+) -> SchemaFileIndex:
+    """Load dbt schema YAML files, given as paths or a directory to search, into an index by path.
+
+    Models listed in more than one file are looked up in the first file, in path order.
+    """
+    if isinstance(paths, str):
+        paths = iter_yaml_files(paths) if os.path.isdir(paths) else [paths]
+    yaml_files_data = load_yaml_files(sorted(paths), workers=workers, cache=cache)
+    return SchemaFileIndex(
+        SchemaFile.from_yaml_data(path, yaml_data)
+        for path, yaml_data in yaml_files_data.items()
+        if isinstance(yaml_data, dict)
+    )
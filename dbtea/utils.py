@@ -1,17 +1,44 @@
 import functools
 import json
 import os
+import re
 import subprocess
+import threading
 import timeit
+from collections import deque
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Callable, List, Union
-
-import yaml
+from typing import Any, Callable, Iterator, List, Optional, Tuple, Union
 
+import dbtea.instrumentation as instrumentation
 from dbtea.exceptions import DbteaException
 from dbtea.logger import DBTEA_LOGGER as logger
 
 DBT_PROJECT_FILE = "dbt_project.yml"
+JSON_STREAM_CHUNK_SIZE = 1024 * 1024
+STREAMED_OUTPUT_TAIL_LINES = 200
+
+
+def assemble_dbt_command(command_as_list: List[str], *args, **kwargs) -> str:
+    """Build a dbt shell command string, adding each arg as a `--flag` and each kwarg as a `--flag 'value'` option."""
+    command_parts = list(command_as_list)
+    command_parts.extend(f"--{flag}" for flag in args)
+    command_parts.extend(
+        f"--{flag} '{flag_value}'" for flag, flag_value in kwargs.items()
+    )
+    return " ".join(command_parts)
+
+
+def dbt_command_arguments(command_as_list: List[str], *args, **kwargs) -> List[str]:
+    """Build a dbt command's argument list, adding each arg as a `--flag` and each kwarg as a `--flag value` pair.
+
+    Unlike `assemble_dbt_command`, values are kept as separate arguments, so they may hold spaces and quotes.
+    """
+    command_parts = list(command_as_list)
+    command_parts.extend(f"--{flag}" for flag in args)
+    for flag, flag_value in kwargs.items():
+        command_parts.extend((f"--{flag}", str(flag_value)))
+    return command_parts
 
 
 def assemble_path(*args):
@@ -114,13 +141,14 @@ def human_readable(elapsed: float):
 
 
 def log_duration(fn: Callable):
-    """"""
-    functools.wraps(fn)
+    """Log how long each call of the decorated function takes, recording it as an instrumentation span."""
 
+    @functools.wraps(fn)
     def timed_function(*args, **kwargs):
         start_time = timeit.default_timer()
         try:
-            result = fn(*args, **kwargs)
+            with instrumentation.span(fn.__qualname__):
+                result = fn(*args, **kwargs)
         finally:
             elapsed_time = timeit.default_timer() - start_time
             elapsed_formatted = human_readable(elapsed_time)
@@ -144,12 +172,23 @@ def parse_yaml_file(yaml_file_path: str) -> dict:
                 yaml_file_path
             ),
         )
-    with open(yaml_file_path, "r") as yaml_stream:
-        yaml_data = yaml.safe_load(yaml_stream) or {}
+    import yaml  # Deferred, PyYAML is a large share of CLI startup time
+
+    with instrumentation.span("parse_yaml_file", path=yaml_file_path):
+        with open(yaml_file_path, "r") as yaml_stream:
+            yaml_data = yaml.load(yaml_stream, Loader=yaml_safe_loader()) or {}
+    instrumentation.record_file_read(yaml_file_path)
 
     return yaml_data
 
 
+def yaml_safe_loader():
+    """Return PyYAML's safe loader, backed by the much faster libyaml C parser when PyYAML was built with it."""
+    import yaml
+
+    return getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
 def parse_json_file(json_file_path: str) -> dict:
     """Parse JSON file to Python dictionary."""
     if not file_exists(json_file_path):
@@ -160,12 +199,151 @@ def parse_json_file(json_file_path: str) -> dict:
                 json_file_path
             ),
         )
-    with open(json_file_path, "r") as json_stream:
-        json_data = json.load(json_stream)
+    with instrumentation.span("parse_json_file", path=json_file_path):
+        with open(json_file_path, "r") as json_stream:
+            json_data = json.load(json_stream)
+    instrumentation.record_file_read(json_file_path)
 
     return json_data
 
 
+def stream_json_object_items(
+    json_file_path: str,
+    object_key: str,
+    key_filter: Optional[Callable[[str], bool]] = None,
+    chunk_size: int = JSON_STREAM_CHUNK_SIZE,
+) -> Iterator[Tuple[str, Any]]:
+    """Yield the (key, value) members of a top-level JSON object one at a time, without loading the whole file.
+
+    Only one member value is held in memory at once; members whose key is rejected by `key_filter`, and all other
+    top-level properties, are decoded one entry at a time and discarded.
+    """
+    if not file_exists(json_file_path):
+        raise DbteaException(
+            name="missing-json-file",
+            title="JSON file set to parse is missing",
+            detail="Attempted to parse JSON file at path {}, however this path is not a file".format(
+                json_file_path
+            ),
+        )
+    instrumentation.record_file_read(json_file_path)
+    with open(json_file_path, "r") as json_stream:
+        reader = _JsonStreamReader(json_stream, chunk_size=chunk_size)
+        for top_level_key in reader.iter_object_keys():
+            if top_level_key != object_key or reader.peek() != "{":
+                reader.skip_value()
+                continue
+            for member_key in reader.iter_object_keys():
+                if key_filter and not key_filter(member_key):
+                    reader.skip_value()
+                else:
+                    yield member_key, reader.read_value()
+
+
+class _JsonStreamReader:
+    """Incremental reader over a JSON text stream, decoding one value at a time from a sliding buffer."""
+
+    _WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+    def __init__(self, stream, chunk_size: int = JSON_STREAM_CHUNK_SIZE):
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._position = 0
+        self._eof = False
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it."""
+        while True:
+            self._position = self._WHITESPACE.match(self._buffer, self._position).end()
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+            if not self._fill():
+                raise json.JSONDecodeError(
+                    "Unexpected end of JSON stream", self._buffer, self._position
+                )
+
+    def expect(self, character: str) -> None:
+        if self.peek() != character:
+            raise json.JSONDecodeError(
+                "Expecting '{}'".format(character), self._buffer, self._position
+            )
+        self._position += 1
+
+    def read_value(self) -> Any:
+        """Decode and consume the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A scalar ending exactly at the buffer edge (e.g. a number) may continue in the next chunk
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._position = end
+            return value
+
+    def skip_value(self) -> None:
+        """Consume the next JSON value, descending into objects and arrays so only one member is decoded at once."""
+        next_character = self.peek()
+        if next_character == "{":
+            for _ in self.iter_object_keys():
+                self.skip_value()
+        elif next_character == "[":
+            self._position += 1
+            if self.peek() == "]":
+                self._position += 1
+                return
+            while True:
+                self.skip_value()
+                separator = self.peek()
+                self._position += 1
+                if separator == "]":
+                    return
+                if separator != ",":
+                    raise json.JSONDecodeError(
+                        "Expecting ',' delimiter", self._buffer, self._position - 1
+                    )
+        else:
+            self.read_value()
+
+    def iter_object_keys(self) -> Iterator[str]:
+        """Iterate the keys of the object at the current position; each member value must be consumed by the caller."""
+        self.expect("{")
+        if self.peek() == "}":
+            self._position += 1
+            return
+        while True:
+            key = self.read_value()
+            self.expect(":")
+            yield key
+            separator = self.peek()
+            self._position += 1
+            if separator == "}":
+                return
+            if separator != ",":
+                raise json.JSONDecodeError(
+                    "Expecting ',' delimiter", self._buffer, self._position - 1
+                )
+
+    def _fill(self) -> bool:
+        """Drop consumed text from the buffer and read another chunk, growing geometrically for large values."""
+        if self._eof:
+            return False
+        self._buffer = self._buffer[self._position :]
+        self._position = 0
+        chunk = self._stream.read(max(self._chunk_size, len(self._buffer)))
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer += chunk
+        return True
+
+
 def run_cli_command(
     command: Union[List[str], str],
     working_directory: str,
@@ -175,14 +353,16 @@ def run_cli_command(
     **kwargs,
 ):
     """Execute command line subprocess"""
-    result = subprocess.run(
-        command,
-        shell=use_shell,
-        cwd=working_directory,
-        text=output_as_text,
-        capture_output=capture_output,
-        **kwargs,
-    )
+    instrumentation.increment(instrumentation.SUBPROCESSES_RUN)
+    with instrumentation.span("subprocess", command=command):
+        result = subprocess.run(
+            command,
+            shell=use_shell,
+            cwd=working_directory,
+            text=output_as_text,
+            capture_output=capture_output,
+            **kwargs,
+        )
 
     if result.stderr:
         raise subprocess.CalledProcessError(
@@ -200,7 +380,102 @@ def run_cli_command(
     return result.stdout
 
 
+@dataclass
+class StreamedCommandResult:
+    """Exit code of a streamed command, with only the last lines of its output kept for error reporting."""
+
+    args: Union[List[str], str]
+    returncode: int
+    output_tail: List[str] = field(default_factory=list)
+    duration_seconds: float = 0.0
+
+    @property
+    def succeeded(self) -> bool:
+        return self.returncode == 0
+
+
+def log_output_line(line: str, stream_name: str) -> None:
+    if stream_name == "stderr":
+        logger.warning(line)
+    else:
+        logger.info(line)
+
+
+def stream_cli_command(
+    command: Union[List[str], str],
+    working_directory: str,
+    use_shell: bool = False,
+    line_handler: Optional[Callable[[str, str], None]] = None,
+    process_started: Optional[Callable[[subprocess.Popen], None]] = None,
+    check: bool = True,
+    tail_lines: int = STREAMED_OUTPUT_TAIL_LINES,
+    **kwargs,
+) -> StreamedCommandResult:
+    """Execute command line subprocess, handing each line of stdout and stderr to `line_handler` as it is written.
+
+    By default lines are logged as they arrive, stderr lines as warnings. Output is not accumulated beyond the last
+    `tail_lines` lines, and failure is decided by the exit code alone: with `check`, a non-zero exit code raises
+    `subprocess.CalledProcessError` carrying the output tail.
+    """
+    line_handler = line_handler or log_output_line
+    output_tail = deque(maxlen=tail_lines)
+    tail_lock = threading.Lock()
+
+    def handle_stream(stream, stream_name: str) -> None:
+        for line in stream:
+            line = line.rstrip("\r\n")
+            with tail_lock:
+                output_tail.append(line)
+            line_handler(line, stream_name)
+
+    instrumentation.increment(instrumentation.SUBPROCESSES_RUN)
+    with instrumentation.span("subprocess", command=command):
+        start_time = timeit.default_timer()
+        process = subprocess.Popen(
+            command,
+            shell=use_shell,
+            cwd=working_directory,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+            **kwargs,
+        )
+        if process_started:
+            process_started(process)
+        stderr_reader = threading.Thread(
+            target=handle_stream, args=(process.stderr, "stderr"), daemon=True
+        )
+        stderr_reader.start()
+        try:
+            handle_stream(process.stdout, "stdout")
+            stderr_reader.join()
+            returncode = process.wait()
+        except BaseException:
+            process.kill()
+            process.wait()
+            stderr_reader.join()
+            raise
+        finally:
+            process.stdout.close()
+            process.stderr.close()
+
+    result = StreamedCommandResult(
+        args=command,
+        returncode=returncode,
+        output_tail=list(output_tail),
+        duration_seconds=timeit.default_timer() - start_time,
+    )
+    if check and not result.succeeded:
+        raise subprocess.CalledProcessError(
+            returncode=returncode, cmd=command, stderr="\n".join(result.output_tail)
+        )
+    return result
+
+
 def write_to_yaml_file(data: dict, yaml_file_path: str) -> None:
     """Parse dbt config YAML file to Python dictionary."""
+    import yaml
+
     with open(yaml_file_path, "w") as yaml_stream:
         yaml.safe_dump(data, yaml_stream)
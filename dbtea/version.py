@@ -1,9 +1,6 @@
 import platform
 import sys
 
-import dbt.semver as dbt_semver
-import dbt.version as dbt_version
-
 from dbtea import __version__
 from dbtea.exceptions import DbteaException
 from dbtea.logger import DBTEA_LOGGER as logger
@@ -14,6 +11,8 @@ DBT_MIN_COMPATIBLE_VERSION = "0.17.0"
 
 def check_installed_dbt_version() -> None:
     """"""
+    import dbt.version as dbt_version
+
     logger.debug("dbt version details:\n{}".format(dbt_version.get_version_information()))
     logger.info("Running with dbt version: {}".format(dbt_version.get_installed_version()))
     if not _is_installed_dbt_version_compatible():
@@ -37,11 +36,16 @@ def check_installed_python_version() -> None:
 
 def get_dbtea_version_info() -> None:
     """"""
+    import dbt.semver as dbt_semver
+
     logger.info("Running dbtea version: {}".format(dbt_semver.VersionSpecifier.from_version_string(__version__)))
 
 
 def _is_installed_dbt_version_compatible() -> bool:
     """"""
+    import dbt.semver as dbt_semver
+    import dbt.version as dbt_version
+
     installed_dbt_version = dbt_version.get_installed_version()
     if installed_dbt_version < dbt_semver.VersionSpecifier.from_version_string(DBT_MIN_COMPATIBLE_VERSION):
         return False
@@ -20,6 +20,9 @@ setup(
         "dbt",
         "PyYAML"
     ],
+    extras_require={
+        "perf": ["numpy", "pyarrow"]
+    },
     tests_require=[
         "black",
         "flake8",
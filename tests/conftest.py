@@ -0,0 +1,42 @@
+import pytest
+
+
+def catalog_column(name: str, data_type: str, index: int) -> dict:
+    return {"name": name, "type": data_type, "index": index}
+
+
+@pytest.fixture
+def sample_manifest_and_catalog():
+    """Factory for matching manifest and catalog data describing the given models of a `shop` package."""
+
+    def make_manifest_and_catalog(
+        model_names: list, checksum: str = "abc", catalog_columns: list = None
+    ) -> tuple:
+        if catalog_columns is None:
+            catalog_columns = [("ID", "INTEGER"), ("CREATED_AT", "TIMESTAMP")]
+        manifest_data = {
+            "nodes": {
+                "model.shop.{}".format(model_name): {
+                    "name": model_name,
+                    "resource_type": "model",
+                    "package_name": "shop",
+                    "checksum": {"name": "sha256", "checksum": checksum},
+                    "columns": {"id": {"name": "id", "description": "Primary key"}},
+                }
+                for model_name in model_names
+            }
+        }
+        catalog_data = {
+            "nodes": {
+                "model.shop.{}".format(model_name): {
+                    "columns": {
+                        name: catalog_column(name, data_type, index)
+                        for index, (name, data_type) in enumerate(catalog_columns, start=1)
+                    }
+                }
+                for model_name in model_names
+            }
+        }
+        return manifest_data, catalog_data
+
+    return make_manifest_and_catalog
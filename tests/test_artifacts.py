@@ -0,0 +1,167 @@
+import json
+import os
+
+from dbtea import utils
+from dbtea.artifacts import (
+    ArtifactCache,
+    ArtifactSnapshot,
+    ManifestIndex,
+    iter_artifact_entries,
+)
+
+SAMPLE_MANIFEST = {
+    "nodes": {
+        "model.shop.stg_orders": {
+            "name": "stg_orders",
+            "resource_type": "model",
+            "package_name": "shop",
+            "original_file_path": "models/staging/stg_orders.sql",
+            "tags": ["staging"],
+            "depends_on": {"nodes": ["source.shop.raw.orders"]},
+        },
+        "model.shop.fct_orders": {
+            "name": "fct_orders",
+            "resource_type": "model",
+            "package_name": "shop",
+            "original_file_path": "models/marts/fct_orders.sql",
+            "tags": ["marts", "daily"],
+            "depends_on": {"nodes": ["model.shop.stg_orders"]},
+        },
+    },
+    "sources": {
+        "source.shop.raw.orders": {
+            "name": "orders",
+            "resource_type": "source",
+            "package_name": "shop",
+            "original_file_path": "models/staging/_sources.yml",
+        }
+    },
+}
+
+
+def write_manifest(tmp_path, manifest_data):
+    manifest_path = tmp_path / "manifest.json"
+    with open(manifest_path, "w") as manifest_stream:
+        json.dump(manifest_data, manifest_stream)
+    return manifest_path
+
+
+def test_artifact_cache_reuses_unchanged_file(tmp_path):
+    manifest_path = write_manifest(tmp_path, SAMPLE_MANIFEST)
+    load_calls = list()
+
+    def loader(path):
+        load_calls.append(path)
+        with open(path) as stream:
+            return json.load(stream)
+
+    cache = ArtifactCache()
+    first = cache.get(manifest_path, loader=loader)
+    second = cache.get(manifest_path, loader=loader)
+
+    assert first is second
+    assert len(load_calls) == 1
+
+
+def test_artifact_cache_reloads_changed_file(tmp_path):
+    manifest_path = write_manifest(tmp_path, SAMPLE_MANIFEST)
+    cache = ArtifactCache()
+    cache.get(manifest_path)
+    index = cache.get_derived(manifest_path, "index", ManifestIndex)
+
+    write_manifest(tmp_path, {"nodes": {}})
+    stat = os.stat(manifest_path)
+    os.utime(manifest_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert cache.get(manifest_path) == {"nodes": {}}
+    assert cache.get_derived(manifest_path, "index", ManifestIndex) is not index
+
+
+def test_manifest_index_lookups():
+    index = ManifestIndex(SAMPLE_MANIFEST)
+
+    assert len(index) == 3
+    assert index.get("model.shop.fct_orders")["name"] == "fct_orders"
+    assert [node["name"] for node in index.nodes_of_type("model")] == [
+        "stg_orders",
+        "fct_orders",
+    ]
+    assert index.nodes_with_tag("daily")[0]["name"] == "fct_orders"
+    assert index.nodes_at_path("models/staging/stg_orders.sql")[0]["name"] == "stg_orders"
+    assert index.nodes_named("orders")[0]["resource_type"] == "source"
+    assert len(index.nodes_in_package("shop")) == 3
+
+
+def test_manifest_index_builds_child_map_from_dependencies():
+    index = ManifestIndex(SAMPLE_MANIFEST)
+
+    assert index.parents("model.shop.fct_orders") == ["model.shop.stg_orders"]
+    assert index.children("source.shop.raw.orders") == ["model.shop.stg_orders"]
+    assert index.children("model.shop.stg_orders") == ["model.shop.fct_orders"]
+
+
+def test_iter_artifact_entries_filters(tmp_path):
+    manifest_path = write_manifest(tmp_path, SAMPLE_MANIFEST)
+
+    models = dict(iter_artifact_entries(manifest_path, resource_types={"model"}))
+    staging = dict(iter_artifact_entries(manifest_path, path_prefix="models/staging"))
+    sources = dict(iter_artifact_entries(manifest_path, section="sources", packages={"shop"}))
+
+    assert list(models) == ["model.shop.stg_orders", "model.shop.fct_orders"]
+    assert list(staging) == ["model.shop.stg_orders"]
+    assert sources == SAMPLE_MANIFEST["sources"]
+    assert list(iter_artifact_entries(manifest_path, packages={"other"})) == []
+
+
+def test_artifact_snapshot_matches_manifest_index(tmp_path):
+    manifest_path = write_manifest(tmp_path, dict(SAMPLE_MANIFEST, metadata={"v": 1}))
+    ArtifactSnapshot.write(manifest_path, utils.parse_json_file(str(manifest_path)))
+    index = ManifestIndex(SAMPLE_MANIFEST)
+
+    snapshot = ArtifactSnapshot.load(manifest_path)
+
+    assert len(snapshot) == len(index)
+    assert "model.shop.fct_orders" in snapshot
+    assert snapshot.get("model.shop.fct_orders") == index.get("model.shop.fct_orders")
+    assert snapshot.nodes_of_type("model") == index.nodes_of_type("model")
+    assert snapshot.nodes_with_tag("daily") == index.nodes_with_tag("daily")
+    assert snapshot.nodes_at_path("models/staging/stg_orders.sql") == index.nodes_at_path(
+        "models/staging/stg_orders.sql"
+    )
+    assert snapshot.children("source.shop.raw.orders") == ["model.shop.stg_orders"]
+    assert snapshot.parents("model.shop.fct_orders") == ["model.shop.stg_orders"]
+    assert snapshot.property("metadata") == {"v": 1}
+
+
+def test_artifact_snapshot_serves_index_consumers(tmp_path):
+    manifest_data = dict(SAMPLE_MANIFEST, metadata={"adapter_type": "snowflake"})
+    manifest_path = write_manifest(tmp_path, manifest_data)
+    ArtifactSnapshot.write(manifest_path, manifest_data)
+    index = ManifestIndex(manifest_data)
+
+    snapshot = ArtifactSnapshot.load(manifest_path)
+
+    assert list(snapshot.nodes) == list(index.nodes)
+    assert dict(snapshot.nodes.items()) == index.nodes
+    assert snapshot.nodes["model.shop.stg_orders"] == index.nodes["model.shop.stg_orders"]
+    assert "model.shop.missing" not in snapshot.nodes
+    assert snapshot.parent_map == index.parent_map
+    assert snapshot.child_map == index.child_map
+    for packages in (None, {"shop"}, {"other"}):
+        assert snapshot.unique_ids_of_type("model", packages) == index.unique_ids_of_type(
+            "model", packages
+        )
+    assert snapshot.property("metadata") == index.property("metadata")
+
+
+def test_artifact_snapshot_tracks_source_content(tmp_path):
+    manifest_path = write_manifest(tmp_path, SAMPLE_MANIFEST)
+    ArtifactSnapshot.write(manifest_path, SAMPLE_MANIFEST)
+    stat = os.stat(manifest_path)
+
+    # Touching the artifact without changing it keeps the snapshot valid
+    os.utime(manifest_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert ArtifactSnapshot.load(manifest_path) is not None
+
+    write_manifest(tmp_path, {"nodes": {}})
+    assert ArtifactSnapshot.load(manifest_path) is None
@@ -0,0 +1,153 @@
+import random
+import time
+
+import pytest
+
+from dbtea.artifacts import ManifestIndex
+from dbtea.dag import (
+    DbtDag,
+    recommended_thread_count,
+    run_results_durations,
+    run_thread_utilization,
+)
+from dbtea.exceptions import DbteaException
+
+# source -> stg_orders -> orders -> revenue
+#        -> stg_items  ---^
+PARENT_MAP = {
+    "model.shop.revenue": ["model.shop.orders"],
+    "model.shop.orders": ["model.shop.stg_orders", "model.shop.stg_items"],
+    "model.shop.stg_orders": ["source.shop.raw.orders"],
+    "model.shop.stg_items": ["source.shop.raw.items"],
+    "source.shop.raw.orders": [],
+    "source.shop.raw.items": [],
+}
+DURATIONS = {
+    "model.shop.stg_orders": 2.0,
+    "model.shop.stg_items": 5.0,
+    "model.shop.orders": 10.0,
+    "model.shop.revenue": 1.0,
+}
+
+
+def test_critical_path_and_slack():
+    dbt_dag = DbtDag(
+        PARENT_MAP,
+        {"model.shop.orders": {"config": {"materialized": "table"}}},
+    )
+    critical_path = dbt_dag.critical_path(DURATIONS)
+
+    assert critical_path.unique_ids == [
+        "source.shop.raw.items",
+        "model.shop.stg_items",
+        "model.shop.orders",
+        "model.shop.revenue",
+    ]
+    assert critical_path.length_seconds == 16.0
+    assert critical_path.total_work_seconds == 18.0
+    assert critical_path.slack_seconds["model.shop.stg_orders"] == 3.0
+    assert critical_path.slack_seconds["model.shop.orders"] == 0.0
+
+    recommendations = dbt_dag.recommendations(critical_path, limit=2)
+    assert [recommendation.unique_id for recommendation in recommendations] == [
+        "model.shop.orders",
+        "model.shop.stg_items",
+    ]
+    assert recommendations[0].materialization == "table"
+
+
+def test_dag_from_manifest_index():
+    manifest_index = ManifestIndex(
+        {
+            "nodes": {
+                unique_id: {"config": {"materialized": "view"}}
+                for unique_id in PARENT_MAP
+                if unique_id.startswith("model.")
+            },
+            "parent_map": PARENT_MAP,
+        }
+    )
+    dbt_dag = DbtDag.from_manifest_index(manifest_index)
+
+    assert len(dbt_dag) == len(PARENT_MAP)
+    assert dbt_dag.critical_path(DURATIONS).length_seconds == 16.0
+    assert dbt_dag.node_metadata is manifest_index.nodes
+
+
+def test_schedule_simulation_per_thread_count():
+    dbt_dag = DbtDag(PARENT_MAP)
+    single_thread, two_threads, four_threads = dbt_dag.parallelism_profile(
+        DURATIONS, (1, 2, 4)
+    )
+
+    assert single_thread.makespan_seconds == 18.0
+    assert single_thread.idle_seconds == 0.0
+    assert two_threads.makespan_seconds == 16.0
+    assert two_threads.idle_seconds == 14.0
+    assert four_threads.makespan_seconds == 16.0
+    assert recommended_thread_count([single_thread, two_threads, four_threads]) == 2
+
+
+def test_cycle_is_reported():
+    with pytest.raises(DbteaException):
+        DbtDag({"model.a.x": ["model.a.y"], "model.a.y": ["model.a.x"]})
+
+
+def test_run_results_timings():
+    run_results_data = {
+        "args": {"threads": 2},
+        "results": [
+            {
+                "unique_id": "model.shop.orders",
+                "execution_time": 4.0,
+                "thread_id": "Thread-1",
+                "timing": [
+                    {
+                        "name": "execute",
+                        "started_at": "2021-06-01T00:00:00Z",
+                        "completed_at": "2021-06-01T00:00:04Z",
+                    }
+                ],
+            },
+            {
+                "unique_id": "model.shop.items",
+                "execution_time": 1.0,
+                "thread_id": "Thread-2",
+                "timing": [
+                    {
+                        "name": "execute",
+                        "started_at": "2021-06-01T00:00:00Z",
+                        "completed_at": "2021-06-01T00:00:01Z",
+                    }
+                ],
+            },
+        ],
+    }
+
+    assert run_results_durations(run_results_data) == {
+        "model.shop.orders": 4.0,
+        "model.shop.items": 1.0,
+    }
+    utilization = run_thread_utilization(run_results_data)
+    assert (utilization.threads, utilization.wall_seconds) == (2, 4.0)
+    assert utilization.idle_seconds == 3.0
+
+
+def test_large_dag_is_analyzed_quickly():
+    random_generator = random.Random(14)
+    parent_map = {
+        "model.big.node_{}".format(number): [
+            "model.big.node_{}".format(random_generator.randrange(number))
+            for _ in range(min(number, 3))
+        ]
+        for number in range(30000)
+    }
+    durations = {unique_id: random_generator.random() for unique_id in parent_map}
+
+    start_time = time.monotonic()
+    dbt_dag = DbtDag(parent_map)
+    critical_path = dbt_dag.critical_path(durations)
+    dbt_dag.simulate_schedule(durations, 8)
+
+    assert time.monotonic() - start_time < 5
+    assert critical_path.length_seconds <= critical_path.total_work_seconds
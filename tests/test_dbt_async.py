@@ -0,0 +1,77 @@
+import asyncio
+import os
+import stat
+import sys
+import time
+
+import pytest
+
+from dbtea.clients.dbt_async import AsyncDbtProject, astream_cli_command
+from dbtea.clients.dbt_progress import DBT_PROGRESS_FINISHED
+from dbtea.exceptions import DbteaException
+
+FAKE_DBT = """#!{python}
+import sys, time
+print("1 of 1 START view model analytics.orders.... [RUN]", flush=True)
+time.sleep(float(sys.argv[sys.argv.index("--sleep") + 1]))
+print("1 of 1 OK created view model analytics.orders.... [OK in 0.50s]", flush=True)
+"""
+
+
+@pytest.fixture
+def fake_dbt(tmp_path, monkeypatch):
+    bin_directory = tmp_path / "bin"
+    bin_directory.mkdir()
+    fake_dbt_path = bin_directory / "dbt"
+    fake_dbt_path.write_text(FAKE_DBT.format(python=sys.executable))
+    fake_dbt_path.chmod(fake_dbt_path.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", str(bin_directory) + os.pathsep + os.environ["PATH"])
+    return tmp_path
+
+
+def test_commands_run_concurrently_on_one_loop(fake_dbt):
+    events = list()
+    project = AsyncDbtProject(str(fake_dbt), progress_callback=events.append)
+
+    async def run_commands():
+        return await asyncio.gather(
+            *(project.arun_dbt_run(sleep="0.5") for _ in range(4))
+        )
+
+    start_time = time.monotonic()
+    results = asyncio.run(run_commands())
+
+    assert time.monotonic() - start_time < 1.5
+    assert all(result.succeeded for result in results)
+    assert [event.kind for event in events].count(DBT_PROGRESS_FINISHED) == 4
+
+
+def test_timeout_stops_command(fake_dbt):
+    project = AsyncDbtProject(str(fake_dbt), timeout=0.2)
+
+    start_time = time.monotonic()
+    with pytest.raises(DbteaException):
+        asyncio.run(project.arun_dbt_run(sleep="30"))
+    assert time.monotonic() - start_time < 5
+
+
+def test_cancellation_terminates_subprocess(tmp_path):
+    started_processes = list()
+
+    async def run_and_cancel():
+        task = asyncio.create_task(
+            astream_cli_command(
+                [sys.executable, "-c", "print('started', flush=True); input()"],
+                working_directory=str(tmp_path),
+                line_handler=lambda line, stream_name: started_processes.append(line),
+                stdin=asyncio.subprocess.PIPE,
+            )
+        )
+        while not started_processes:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(asyncio.wait_for(run_and_cancel(), timeout=10))
+    assert started_processes == ["started"]
@@ -0,0 +1,76 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from dbtea.clients.dbt_engine import DbtEngine
+from dbtea.exceptions import DbteaException
+
+FAKE_ENTRYPOINT = "tests.test_dbt_engine:fake_handle_and_check"
+invocations = list()
+
+
+def fake_handle_and_check(args):
+    """Stand-in for dbt.main.handle_and_check, recording calls made within one worker process."""
+    invocations.append(args)
+    print("invocation {} in {}: {}".format(len(invocations), os.getcwd(), " ".join(args)))
+    if "fail" in args:
+        raise RuntimeError("Encountered an error")
+    if "log" in args:
+        os.write(1, b"written to stdout descriptor\n")
+        subprocess.run([sys.executable, "-c", "import sys; sys.stderr.write('written by a child process')"])
+    if "hang" in args:
+        time.sleep(60)
+    return None, "test" not in args
+
+
+def test_engine_reuses_worker_across_commands(tmp_path):
+    with DbtEngine(entrypoint=FAKE_ENTRYPOINT) as engine:
+        compile_result = engine.run(["compile"], working_directory=str(tmp_path))
+        docs_result = engine.run(["docs", "generate"], working_directory=str(tmp_path))
+        list_result = engine.run(["list"], working_directory=str(tmp_path))
+
+    assert compile_result.success
+    assert compile_result.output.startswith("invocation 1 in {}: ".format(tmp_path))
+    assert "--partial-parse compile" in compile_result.output
+    assert docs_result.output.startswith("invocation 2")
+    assert list_result.output.startswith("invocation 3")
+
+
+def test_engine_reports_failed_commands(tmp_path):
+    with DbtEngine(entrypoint=FAKE_ENTRYPOINT, partial_parse=False) as engine:
+        unsuccessful_result = engine.run(["test"], working_directory=str(tmp_path))
+        error_result = engine.run(["fail"], working_directory=str(tmp_path))
+
+    assert not unsuccessful_result.success
+    assert not error_result.success
+    assert "RuntimeError: Encountered an error" in error_result.output
+
+
+def test_engine_start_fails_for_missing_entrypoint():
+    with pytest.raises(DbteaException):
+        DbtEngine(entrypoint="tests.missing_module:run").start()
+
+
+def test_engine_captures_output_written_to_file_descriptors(tmp_path):
+    with DbtEngine(entrypoint=FAKE_ENTRYPOINT, partial_parse=False) as engine:
+        result = engine.run(["log"], working_directory=str(tmp_path))
+
+    assert "invocation 1" in result.output
+    assert "written to stdout descriptor" in result.output
+    assert "written by a child process" in result.output
+
+
+def test_engine_restarts_worker_after_command_timeout(tmp_path):
+    with DbtEngine(entrypoint=FAKE_ENTRYPOINT, partial_parse=False, command_timeout=1) as engine:
+        hung_process_id = engine._process.pid
+        with pytest.raises(DbteaException):
+            engine.run(["hang"], working_directory=str(tmp_path))
+
+        assert engine.is_running
+        assert engine._process.pid != hung_process_id
+        result = engine.run(["compile"], working_directory=str(tmp_path))
+
+    assert result.success
@@ -0,0 +1,83 @@
+import json
+
+from dbtea.clients.dbt_progress import (
+    DBT_PROGRESS_FINISHED,
+    DBT_PROGRESS_STARTED,
+    DbtProgressLogger,
+    parse_dbt_log_line,
+)
+
+
+def test_parse_text_log_lines():
+    _, start_event = parse_dbt_log_line(
+        "12:00:01 | 2 of 5 START view model analytics.orders.............. [RUN]"
+    )
+    _, finish_event = parse_dbt_log_line(
+        "12:00:02 | 2 of 5 OK created view model analytics.orders......... [OK in 0.42s]"
+    )
+    _, error_event = parse_dbt_log_line(
+        "3 of 5 ERROR creating table model analytics.payments............. [ERROR in 1.50s]"
+    )
+
+    assert start_event.kind == DBT_PROGRESS_STARTED
+    assert (start_event.node, start_event.index, start_event.total) == (
+        "analytics.orders",
+        2,
+        5,
+    )
+    assert finish_event.kind == DBT_PROGRESS_FINISHED
+    assert (finish_event.status, finish_event.elapsed_seconds) == ("ok", 0.42)
+    assert (error_event.node, error_event.status) == ("analytics.payments", "error")
+    assert parse_dbt_log_line("Found 5 models, 0 tests") == (
+        "Found 5 models, 0 tests",
+        None,
+    )
+
+
+def test_parse_json_log_lines():
+    structured_line = json.dumps(
+        {
+            "info": {"msg": "1 of 1 OK created view model analytics.orders [OK]"},
+            "data": {
+                "node_info": {
+                    "unique_id": "model.shop.orders",
+                    "node_status": "success",
+                    "node_started_at": "2021-06-01T12:00:00.000000",
+                    "node_finished_at": "2021-06-01T12:00:02.500000",
+                }
+            },
+        }
+    )
+    message, event = parse_dbt_log_line(structured_line)
+
+    assert message == "1 of 1 OK created view model analytics.orders [OK]"
+    assert (event.node, event.status, event.elapsed_seconds) == (
+        "model.shop.orders",
+        "success",
+        2.5,
+    )
+    assert (event.index, event.total) == (1, 1)
+
+
+def test_progress_logger_reports_each_node_once(caplog):
+    started_line = json.dumps(
+        {
+            "message": "Began running node model.shop.orders",
+            "extra": {"unique_id": "model.shop.orders", "node_status": "started"},
+        }
+    )
+    events = list()
+    progress_logger = DbtProgressLogger(prefix="[shop]", on_event=events.append)
+    for line in (
+        started_line,
+        started_line,
+        "1 of 1 OK created view model analytics.orders..... [OK in 0.10s]",
+    ):
+        progress_logger(line)
+
+    assert [event.kind for event in events] == [
+        DBT_PROGRESS_STARTED,
+        DBT_PROGRESS_FINISHED,
+    ]
+    assert progress_logger.summary() == "1 node finished: 1 ok"
+    assert "[shop] Began running node model.shop.orders" in caplog.messages
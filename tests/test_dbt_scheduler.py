@@ -0,0 +1,97 @@
+import json
+import logging
+import os
+import stat
+import sys
+
+import pytest
+
+from dbtea.clients.dbt_scheduler import run_dbt_command_across_projects
+
+FAKE_DBT = """#!{python}
+import json, os, sys, time
+print("fake dbt " + " ".join(sys.argv[1:]), flush=True)
+print("arguments " + json.dumps(sys.argv[1:]), flush=True)
+if os.path.exists("slow"):
+    time.sleep(5)
+sys.exit(1 if os.path.exists("fail") else 0)
+"""
+
+
+@pytest.fixture
+def fake_dbt_projects(tmp_path, monkeypatch):
+    bin_directory = tmp_path / "bin"
+    bin_directory.mkdir()
+    fake_dbt_path = bin_directory / "dbt"
+    fake_dbt_path.write_text(FAKE_DBT.format(python=sys.executable))
+    fake_dbt_path.chmod(fake_dbt_path.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", str(bin_directory) + os.pathsep + os.environ["PATH"])
+
+    project_directories = list()
+    for project_name in ("alpha", "beta", "gamma"):
+        project_directory = tmp_path / project_name
+        project_directory.mkdir()
+        project_directories.append(str(project_directory))
+    return project_directories
+
+
+def test_runs_command_in_every_project(fake_dbt_projects, caplog):
+    open(os.path.join(fake_dbt_projects[1], "fail"), "w").close()
+
+    with caplog.at_level(logging.INFO, logger="dbtea"):
+        results = run_dbt_command_across_projects(
+            fake_dbt_projects,
+            ["dbt", "run"],
+            "full-refresh",
+            max_workers=3,
+            models="tag:daily",
+        )
+
+    assert [result.project_label for result in results] == ["alpha", "beta", "gamma"]
+    assert [result.returncode for result in results] == [0, 1, 0]
+    assert all(result.duration_seconds > 0 for result in results)
+    assert "[gamma] fake dbt run --full-refresh --models tag:daily" in caplog.messages
+
+
+def test_fail_fast_skips_remaining_projects(fake_dbt_projects):
+    open(os.path.join(fake_dbt_projects[0], "fail"), "w").close()
+    open(os.path.join(fake_dbt_projects[1], "slow"), "w").close()
+
+    results = run_dbt_command_across_projects(
+        fake_dbt_projects, ["dbt", "run"], max_workers=2, fail_fast=True
+    )
+
+    assert results[0].returncode == 1
+    assert not results[1].succeeded
+    assert results[1].duration_seconds < 5
+    assert results[2].skipped
+
+
+def test_arguments_keep_spaces_and_quotes(fake_dbt_projects, caplog):
+    with caplog.at_level(logging.INFO, logger="dbtea"):
+        results = run_dbt_command_across_projects(
+            fake_dbt_projects[:1],
+            ["dbt", "run", "--vars", "{key: value}"],
+            select="tag:it's",
+        )
+
+    assert results[0].succeeded
+    assert "[alpha] arguments " + json.dumps(
+        ["run", "--vars", "{key: value}", "--select", "tag:it's"]
+    ) in caplog.messages
+
+
+def test_fail_fast_stops_projects_when_dbt_cannot_start(fake_dbt_projects, tmp_path):
+    open(os.path.join(fake_dbt_projects[0], "slow"), "w").close()
+    missing_project = str(tmp_path / "missing")
+
+    results = run_dbt_command_across_projects(
+        [fake_dbt_projects[0], fake_dbt_projects[1], missing_project],
+        ["dbt", "run"],
+        max_workers=2,
+        fail_fast=True,
+    )
+
+    assert results[2].returncode == 127
+    assert not results[0].succeeded
+    assert results[0].duration_seconds < 5
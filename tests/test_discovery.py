@@ -0,0 +1,71 @@
+import os
+
+from dbtea.discovery import (
+    discover_dbt_projects,
+    is_ignored,
+    parse_gitignore_file,
+    project_index_path,
+    scan_dbt_projects,
+)
+
+
+def _make_project(directory):
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, "dbt_project.yml"), "w") as project_stream:
+        project_stream.write("name: project\n")
+
+
+def _make_monorepo(root):
+    _make_project(root / "analytics")
+    _make_project(root / "teams" / "finance" / "warehouse")
+    _make_project(root / "teams" / "finance" / "warehouse" / "dbt_modules" / "utils")
+    _make_project(root / "analytics" / "target" / "copied")
+    _make_project(root / "build" / "generated")
+    _make_project(root / "scratch" / "keep")
+    (root / ".gitignore").write_text("build/\n/scratch/*\n!/scratch/keep\n")
+
+
+def test_scan_prunes_build_output_and_ignored_directories(tmp_path):
+    _make_monorepo(tmp_path)
+    for workers in (1, 4):
+        project_index = scan_dbt_projects(str(tmp_path), workers=workers)
+        assert project_index.project_roots == [
+            str(tmp_path / "analytics"),
+            str(tmp_path / "scratch" / "keep"),
+            str(tmp_path / "teams" / "finance" / "warehouse"),
+        ]
+        assert "analytics/target" not in project_index.mtimes
+        assert ".gitignore" in project_index.mtimes
+
+
+def test_gitignore_patterns(tmp_path):
+    gitignore_path = tmp_path / ".gitignore"
+    gitignore_path.write_text("# comment\n*.egg-info\ndocs/**/build\n/venv\n")
+    rules = parse_gitignore_file(str(gitignore_path), "nested")
+    assert is_ignored(rules, "nested/dbtea.egg-info", "dbtea.egg-info")
+    assert is_ignored(rules, "nested/docs/api/v1/build", "build")
+    assert is_ignored(rules, "nested/docs/build", "build")
+    assert is_ignored(rules, "nested/venv", "venv")
+    assert not is_ignored(rules, "nested/models/venv", "venv")
+    assert not is_ignored(rules, "nested/build", "build")
+
+
+def test_discovery_index_is_reused_until_directories_change(tmp_path):
+    root, cache_directory = tmp_path / "repository", tmp_path / "cache"
+    _make_monorepo(root)
+    project_roots = discover_dbt_projects(
+        str(root), cache_directory=str(cache_directory)
+    )
+    assert len(project_roots) == 3
+    index_file_path = project_index_path(str(root), str(cache_directory))
+    index_mtime = os.stat(index_file_path).st_mtime_ns
+
+    assert discover_dbt_projects(str(root), cache_directory=str(cache_directory)) == (
+        project_roots
+    )
+    assert os.stat(index_file_path).st_mtime_ns == index_mtime
+
+    _make_project(root / "teams" / "marketing")
+    assert str(root / "teams" / "marketing") in discover_dbt_projects(
+        str(root), cache_directory=str(cache_directory)
+    )
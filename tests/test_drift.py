@@ -0,0 +1,123 @@
+import pytest
+
+from dbtea.artifacts import ManifestIndex
+from dbtea.clients.bi.looker.drift import (
+    compare_view_columns,
+    diff_lookml_project,
+    lookml_view_columns,
+)
+from dbtea.clients.bi.looker.project_index import LookmlProjectIndex
+
+ORDERS_VIEW = """
+view: orders {
+  sql_table_name: analytics.orders ;;
+  dimension: id { type: number sql: ${TABLE}.ID ;; }
+  dimension: status { type: number sql: ${TABLE}.status ;; }
+  dimension: legacy_code { sql: ${TABLE}.legacy_code ;; }
+  dimension_group: created { type: time sql: ${TABLE}.created_at ;; }
+  dimension: is_large { type: yesno sql: ${TABLE}.amount > 100 ;; }
+  measure: total_amount { type: sum sql: ${TABLE}.amount ;; }
+}
+"""
+
+
+def test_lookml_view_columns():
+    import lkml
+
+    view_data = lkml.load(ORDERS_VIEW)["views"][0]
+
+    assert lookml_view_columns(view_data) == {
+        "id": "number",
+        "status": "number",
+        "legacy_code": "string",
+        "created_at": "time",
+        "amount": None,
+    }
+
+
+def test_compare_view_columns():
+    view_drift = compare_view_columns(
+        "orders",
+        "orders.view.lkml",
+        {"id": "number", "status": "number", "legacy_code": "string", "amount": None},
+        {
+            "id": "number",
+            "status": "string",
+            "amount": "number",
+            "customer_id": "number",
+        },
+    )
+
+    assert view_drift.missing == ["customer_id"]
+    assert view_drift.extra == ["legacy_code"]
+    assert view_drift.type_mismatches == [("status", "number", "string")]
+    assert view_drift.has_drift
+
+
+def test_compare_identical_view_columns():
+    columns = {"id": "number", "created_at": "time"}
+
+    assert not compare_view_columns(
+        "orders", "orders.view.lkml", columns, columns
+    ).has_drift
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_diff_lookml_project(tmp_path, monkeypatch, workers, sample_manifest_and_catalog):
+    monkeypatch.setattr(
+        "dbtea.clients.bi.looker.drift.MIN_FILES_FOR_PARALLEL_PARSING", 1
+    )
+    monkeypatch.setattr("dbtea.clients.bi.looker.drift.LOOKML_VIEW_FILES_PER_TASK", 1)
+    (tmp_path / "views").mkdir()
+    (tmp_path / "views" / "orders.view.lkml").write_text(ORDERS_VIEW)
+    (tmp_path / "views" / "refunds.view.lkml").write_text(
+        ORDERS_VIEW.replace("view: orders", "view: refunds")
+    )
+    (tmp_path / "views" / "unrelated.view.lkml").write_text("view: unrelated {}")
+    manifest_data, catalog_data = sample_manifest_and_catalog(
+        ["orders", "refunds", "customers"],
+        catalog_columns=[
+            ("ID", "INTEGER"),
+            ("STATUS", "VARCHAR"),
+            ("CREATED_AT", "DATE"),
+            ("AMOUNT", "NUMERIC"),
+            ("CUSTOMER_ID", "INTEGER"),
+        ],
+    )
+
+    report = diff_lookml_project(
+        LookmlProjectIndex.scan(str(tmp_path)),
+        manifest_data,
+        catalog_data,
+        workers=workers,
+    )
+
+    assert [view_drift.view_name for view_drift in report.drifted_views] == [
+        "orders",
+        "refunds",
+    ]
+    orders_drift = report.views[0]
+    assert orders_drift.path == "views/orders.view.lkml"
+    assert orders_drift.missing == ["customer_id"]
+    assert orders_drift.extra == ["legacy_code"]
+    assert orders_drift.type_mismatches == [("status", "number", "string")]
+    assert report.models_without_views == ["customers"]
+
+
+def test_diff_lookml_project_without_catalog(tmp_path, sample_manifest_and_catalog):
+    (tmp_path / "orders.view.lkml").write_text(ORDERS_VIEW)
+    manifest_data, _ = sample_manifest_and_catalog(["orders", "customers"])
+    manifest_data["nodes"]["model.shop.orders"]["columns"] = {
+        "id": {"name": "id", "data_type": "integer"},
+        "status": {"name": "status"},
+    }
+    manifest_data["nodes"]["model.shop.customers"]["columns"] = {}
+
+    report = diff_lookml_project(
+        LookmlProjectIndex.scan(str(tmp_path)), ManifestIndex(manifest_data), None
+    )
+
+    assert [view_drift.view_name for view_drift in report.views] == ["orders"]
+    assert report.views[0].extra == ["amount", "created_at", "legacy_code"]
+    assert report.views[0].type_mismatches == [("status", "number", "string")]
+    assert report.models_without_views == []
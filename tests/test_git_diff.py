@@ -0,0 +1,188 @@
+import subprocess
+
+import pytest
+
+from dbtea import utils
+from dbtea.artifacts import ArtifactSnapshot, ManifestIndex
+from dbtea.clients import dbt_commands
+from dbtea.clients.git.diff import changed_files, select_affected_nodes
+
+MANIFEST_DATA = {
+    "nodes": {
+        "model.shop.stg_orders": {
+            "unique_id": "model.shop.stg_orders",
+            "name": "stg_orders",
+            "resource_type": "model",
+            "fqn": ["shop", "staging", "stg_orders"],
+            "original_file_path": "models/staging/stg_orders.sql",
+            "patch_path": "models/staging/schema.yml",
+            "depends_on": {"macros": [], "nodes": ["source.shop.raw.orders"]},
+        },
+        "model.shop.orders": {
+            "unique_id": "model.shop.orders",
+            "name": "orders",
+            "resource_type": "model",
+            "fqn": ["shop", "orders"],
+            "original_file_path": "models/orders.sql",
+            "depends_on": {
+                "macros": ["macro.shop.cents_to_dollars"],
+                "nodes": ["model.shop.stg_orders"],
+            },
+        },
+        "model.shop.customers": {
+            "unique_id": "model.shop.customers",
+            "name": "customers",
+            "resource_type": "model",
+            "fqn": ["shop", "customers"],
+            "original_file_path": "models/customers.sql",
+            "depends_on": {"macros": [], "nodes": []},
+        },
+    },
+    "sources": {
+        "source.shop.raw.orders": {
+            "unique_id": "source.shop.raw.orders",
+            "name": "orders",
+            "source_name": "raw",
+            "resource_type": "source",
+            "original_file_path": "models/staging/sources.yml",
+        }
+    },
+    "macros": {
+        "macro.shop.cents_to_dollars": {
+            "unique_id": "macro.shop.cents_to_dollars",
+            "original_file_path": "macros/cents_to_dollars.sql",
+            "depends_on": {"macros": ["macro.shop.round_to"]},
+        },
+        "macro.shop.round_to": {
+            "unique_id": "macro.shop.round_to",
+            "original_file_path": "macros/round_to.sql",
+            "depends_on": {"macros": []},
+        },
+    },
+}
+
+
+def _git(repository_directory, *arguments):
+    subprocess.run(
+        ["git", "-c", "user.name=dbtea", "-c", "user.email=dbtea@example.com"]
+        + list(arguments),
+        cwd=repository_directory,
+        check=True,
+        capture_output=True,
+    )
+
+
+@pytest.fixture
+def dbt_repository(tmp_path):
+    project_directory = tmp_path / "analytics"
+    for file_path in (
+        "dbt_project.yml",
+        "models/orders.sql",
+        "models/customers.sql",
+        "models/staging/stg_orders.sql",
+        "models/staging/schema.yml",
+        "macros/round_to.sql",
+    ):
+        (project_directory / file_path).parent.mkdir(parents=True, exist_ok=True)
+        (project_directory / file_path).write_text("-- {}\n".format(file_path))
+    (tmp_path / "README.md").write_text("readme\n")
+
+    _git(tmp_path, "init", "-q", "-b", "main")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-q", "-m", "Initial project")
+    _git(tmp_path, "checkout", "-q", "-b", "feature")
+    return tmp_path, project_directory
+
+
+def test_changed_files_relative_to_project(dbt_repository):
+    repository_directory, project_directory = dbt_repository
+    (project_directory / "models/staging/schema.yml").write_text("version: 2\n")
+    _git(repository_directory, "commit", "-q", "-am", "Document staging models")
+    _git(
+        repository_directory,
+        "mv",
+        "analytics/models/customers.sql",
+        "analytics/models/clients.sql",
+    )
+    (project_directory / "macros/cents_to_dollars.sql").write_text("-- new macro\n")
+    (repository_directory / "README.md").write_text("changed\n")
+
+    assert changed_files(str(project_directory), "main", head_ref="feature") == [
+        "models/staging/schema.yml"
+    ]
+    assert changed_files(str(project_directory), "main") == [
+        "macros/cents_to_dollars.sql",
+        "models/clients.sql",
+        "models/customers.sql",
+        "models/staging/schema.yml",
+    ]
+
+
+def test_select_affected_nodes_expands_downstream():
+    manifest_index = ManifestIndex(MANIFEST_DATA)
+
+    selection = select_affected_nodes(
+        manifest_index, ["models/staging/schema.yml"], macros=MANIFEST_DATA["macros"]
+    )
+    assert selection.changed_nodes == {"model.shop.stg_orders"}
+    assert selection.affected_nodes == {"model.shop.stg_orders", "model.shop.orders"}
+    assert selection.dbt_selectors(manifest_index) == [
+        "shop.orders",
+        "shop.staging.stg_orders",
+    ]
+
+    macro_selection = select_affected_nodes(
+        manifest_index, ["macros/round_to.sql"], macros=MANIFEST_DATA["macros"]
+    )
+    assert macro_selection.affected_nodes == {"model.shop.orders"}
+
+    source_selection = select_affected_nodes(
+        manifest_index, ["models/staging/sources.yml"]
+    )
+    assert "source:raw.orders" in source_selection.dbt_selectors(manifest_index)
+    assert len(source_selection.affected_nodes) == 3
+
+    assert select_affected_nodes(manifest_index, ["dbt_project.yml"]).full_build
+
+
+@pytest.mark.parametrize(
+    "dbt_command,selection_flag",
+    [
+        ("run", "--models"),
+        ("test", "--models"),
+        ("seed", "--select"),
+        ("snapshot", "--select"),
+        ("compile", "--models"),
+    ],
+)
+def test_affected_dbt_command(dbt_command, selection_flag):
+    assert dbt_command in dbt_commands.DBT_NODE_SELECTION_FLAGS
+    manifest_index = ManifestIndex(MANIFEST_DATA)
+    selection = select_affected_nodes(manifest_index, ["models/staging/schema.yml"])
+    command_as_list = getattr(dbt_commands, "DBT_{}".format(dbt_command.upper()))
+
+    assert utils.assemble_dbt_command(
+        command_as_list, **selection.dbt_command_options(manifest_index, dbt_command)
+    ) == "dbt {} {} 'shop.orders shop.staging.stg_orders'".format(
+        dbt_command, selection_flag
+    )
+
+    full_build = select_affected_nodes(manifest_index, ["dbt_project.yml"])
+    assert full_build.dbt_command_options(manifest_index, dbt_command) == {}
+
+
+def test_select_affected_nodes_from_snapshot(tmp_path):
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text("{}")
+    ArtifactSnapshot.write(manifest_path, MANIFEST_DATA)
+    snapshot = ArtifactSnapshot.load(manifest_path)
+    manifest_index = ManifestIndex(MANIFEST_DATA)
+
+    for changed_path in ("models/staging/schema.yml", "macros/round_to.sql"):
+        snapshot_selection = select_affected_nodes(
+            snapshot, [changed_path], macros=snapshot.property("macros")
+        )
+        index_selection = select_affected_nodes(
+            manifest_index, [changed_path], macros=MANIFEST_DATA["macros"]
+        )
+        assert snapshot_selection.affected_nodes == index_selection.affected_nodes
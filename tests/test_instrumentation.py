@@ -0,0 +1,106 @@
+import asyncio
+import json
+import pstats
+
+from dbtea import utils
+from dbtea.instrumentation import (
+    API_CALLS,
+    BYTES_READ,
+    FILES_PARSED,
+    Instrumentation,
+    profile,
+)
+
+
+def test_spans_are_not_recorded_until_enabled():
+    instrumentation = Instrumentation()
+    with instrumentation.span("load"):
+        instrumentation.increment(API_CALLS)
+    assert instrumentation.spans == []
+    assert not instrumentation.counters
+
+
+def test_nested_spans_record_their_parent():
+    instrumentation = Instrumentation()
+    instrumentation.enable()
+    with instrumentation.span("sync"):
+        with instrumentation.span("parse", path="manifest.json"):
+            pass
+        with instrumentation.span("generate"):
+            pass
+    spans = {span.name: span for span in instrumentation.spans}
+    assert spans["sync"].depth == 0 and spans["sync"].parent is None
+    assert spans["parse"].parent == "sync" and spans["parse"].depth == 1
+    assert spans["parse"].attributes == {"path": "manifest.json"}
+    assert spans["sync"].duration_seconds >= spans["parse"].duration_seconds
+    assert [totals.name for totals in instrumentation.span_totals()][0] == "sync"
+
+
+def test_concurrent_tasks_do_not_nest_in_each_other():
+    instrumentation = Instrumentation()
+    instrumentation.enable()
+
+    async def task(name):
+        with instrumentation.span(name):
+            await asyncio.sleep(0.01)
+            with instrumentation.span(name + "_child"):
+                await asyncio.sleep(0.01)
+
+    async def run_tasks():
+        await asyncio.gather(task("first"), task("second"))
+
+    asyncio.run(run_tasks())
+    parents = {span.name: span.parent for span in instrumentation.spans}
+    assert parents["first_child"] == "first"
+    assert parents["second_child"] == "second"
+
+
+def test_timed_preserves_function_metadata():
+    instrumentation = Instrumentation()
+
+    @instrumentation.timed()
+    def generate_views(count):
+        """Generate views."""
+        return count
+
+    instrumentation.enable()
+    assert generate_views(3) == 3
+    assert generate_views.__name__ == "generate_views"
+    assert generate_views.__doc__ == "Generate views."
+    assert instrumentation.spans[0].name.endswith("generate_views")
+
+
+def test_log_duration_wraps_function():
+    @utils.log_duration
+    def parse_project():
+        """Parse the project."""
+        return "parsed"
+
+    assert parse_project() == "parsed"
+    assert parse_project.__name__ == "parse_project"
+    assert parse_project.__doc__ == "Parse the project."
+
+
+def test_profile_writes_chrome_trace_with_parse_counters(tmp_path):
+    json_file_path = tmp_path / "manifest.json"
+    json_file_path.write_text(json.dumps({"nodes": {}}))
+    trace_file_path = tmp_path / "trace.json"
+
+    with profile(str(trace_file_path)) as instrumentation:
+        utils.parse_json_file(str(json_file_path))
+        counters = dict(instrumentation.counters)
+
+    assert counters[FILES_PARSED] == 1
+    assert counters[BYTES_READ] == json_file_path.stat().st_size
+    trace_events = json.loads(trace_file_path.read_text())["traceEvents"]
+    span_event = next(event for event in trace_events if event["ph"] == "X")
+    assert span_event["name"] == "parse_json_file"
+    assert span_event["args"]["path"] == str(json_file_path)
+    assert trace_events[-1]["args"][FILES_PARSED] == 1
+
+
+def test_profile_writes_pstats(tmp_path):
+    stats_file_path = tmp_path / "dbtea.prof"
+    with profile(str(stats_file_path)):
+        sorted(range(1000), reverse=True)
+    assert pstats.Stats(str(stats_file_path)).total_calls > 0
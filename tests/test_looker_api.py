@@ -0,0 +1,121 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from dbtea.clients.bi.looker.api import LookerApiClient
+from dbtea.clients.bi.looker.cache import ResponseCache
+from dbtea.exceptions import LookerException
+
+
+class StubLookerHandler(BaseHTTPRequestHandler):
+    """Minimal Looker API stub; rate limits the first files request of each project."""
+
+    rate_limited_paths = set()
+    request_log = list()
+    lock = threading.Lock()
+
+    def do_POST(self):
+        if self.path == "/api/3.1/login":
+            return self._send_json({"access_token": "stub-token", "expires_in": 3600})
+        self._send_json({"message": "Not found"}, status=404)
+
+    def do_GET(self):
+        with self.lock:
+            self.request_log.append(self.path)
+            first_files_request = (
+                self.path.endswith("/files") and self.path not in self.rate_limited_paths
+            )
+            if first_files_request:
+                self.rate_limited_paths.add(self.path)
+        if self.headers.get("Authorization") != "token stub-token":
+            return self._send_json({"message": "Requires authentication"}, status=401)
+        if first_files_request:
+            return self._send_json({"message": "Slow down"}, status=429, retry_after="0")
+
+        path_parts = self.path.split("/")
+        project_id = path_parts[4]
+        if project_id == "missing":
+            return self._send_json({"message": "Not found"}, status=404)
+        if len(path_parts) == 5:
+            return self._send_json({"id": project_id, "name": project_id})
+        if path_parts[5] == "files":
+            return self._send_json([{"id": "{}.view.lkml".format(project_id)}])
+        return self._send_json({"name": "main", "ref": "abc123"})
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, data, status: int = 200, retry_after: str = None):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if retry_after is not None:
+            self.send_header("Retry-After", retry_after)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def looker_client():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubLookerHandler)
+    server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+    server_thread.start()
+    client = LookerApiClient(
+        "http://127.0.0.1:{}".format(server.server_address[1]),
+        client_id="id",
+        client_secret="secret",
+        max_concurrency=4,
+        backoff_seconds=0,
+    )
+    yield client
+    client.close()
+    server.shutdown()
+    server.server_close()
+
+
+def test_fetch_projects_in_bulk_with_rate_limit_retries(looker_client):
+    project_ids = ["project_{}".format(index) for index in range(6)]
+
+    projects_data = looker_client.fetch_projects(
+        project_ids, resources=("project", "files", "git_branch")
+    )
+
+    assert list(projects_data) == project_ids
+    assert projects_data["project_3"]["project"] == {"id": "project_3", "name": "project_3"}
+    assert projects_data["project_3"]["files"] == [{"id": "project_3.view.lkml"}]
+    assert projects_data["project_5"]["git_branch"]["ref"] == "abc123"
+
+
+def test_request_errors_raise_looker_exception(looker_client):
+    with pytest.raises(LookerException) as error:
+        looker_client.project("missing")
+
+    assert error.value.status == 404
+    assert error.value.looker_api_response == {"message": "Not found"}
+
+
+def test_response_cache_serves_fresh_responses_and_evicts_lru(tmp_path):
+    response_cache = ResponseCache(str(tmp_path), max_size_bytes=50)
+    response_cache.store("a", {"value": "x" * 10})
+    response_cache.store("b", {"value": "y" * 10})
+    response_cache.lookup("a")
+    response_cache.store("c", {"value": "z" * 10})
+
+    assert response_cache.lookup("a").data == {"value": "x" * 10}
+    assert response_cache.lookup("b") is None
+    assert response_cache.ttl_for("projects/shop/files") == 300
+    assert response_cache.ttl_for("projects/shop/validate") is None
+
+
+def test_cached_get_skips_repeat_requests(looker_client, tmp_path):
+    looker_client.response_cache = ResponseCache(str(tmp_path))
+    StubLookerHandler.request_log.clear()
+
+    first = looker_client.project("cached_project")
+    second = looker_client.project("cached_project")
+
+    assert first == second == {"id": "cached_project", "name": "cached_project"}
+    assert StubLookerHandler.request_log == ["/api/3.1/projects/cached_project"]
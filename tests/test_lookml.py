@@ -0,0 +1,175 @@
+import copy
+import io
+import json
+
+import lkml
+
+from dbtea.artifacts import ArtifactSnapshot, ManifestIndex
+from dbtea.clients.bi.looker import base, sync
+
+
+def sample_dbt_models(model_count: int) -> list:
+    return [
+        {
+            "name": "model_{}".format(model_index),
+            "description": "Model number {}".format(model_index),
+            "columns": [
+                {
+                    "name": "column_{}".format(column_index),
+                    "description": "A column",
+                    "type": "time" if column_index == 0 else "number",
+                    "tests": ["not_null"],
+                }
+                for column_index in range(5)
+            ],
+        }
+        for model_index in range(model_count)
+    ]
+
+
+def test_parallel_view_generation_matches_serial():
+    dbt_models = sample_dbt_models(25)
+
+    serial_views = base.dbt_models_to_lookml_view_strings(copy.deepcopy(dbt_models))
+    parallel_views = base.dbt_models_to_lookml_view_strings(
+        copy.deepcopy(dbt_models), workers=2, chunk_size=4
+    )
+
+    assert len(serial_views) == 25
+    assert parallel_views == serial_views
+    assert "view: model_24" in parallel_views[-1]
+
+
+def test_incremental_sync_rewrites_only_changed_views(tmp_path, sample_manifest_and_catalog):
+    manifest_data, catalog_data = sample_manifest_and_catalog(["orders", "customers"])
+    first_sync = sync.sync_lookml_views(manifest_data, catalog_data, str(tmp_path))
+    assert sorted(first_sync.created) == ["customers.view.lkml", "orders.view.lkml"]
+
+    manifest_data["nodes"]["model.shop.orders"]["checksum"]["checksum"] = "def"
+    catalog_data["nodes"]["model.shop.orders"]["columns"]["STATUS"] = {
+        "name": "STATUS",
+        "type": "VARCHAR",
+        "index": 3,
+    }
+    second_sync = sync.sync_lookml_views(manifest_data, catalog_data, str(tmp_path))
+
+    assert second_sync.updated == ["orders.view.lkml"]
+    assert second_sync.unchanged == ["customers.view.lkml"]
+    assert "dimension_group: created_at" in (tmp_path / "orders.view.lkml").read_text()
+
+
+def test_incremental_sync_deletes_removed_views(tmp_path, sample_manifest_and_catalog):
+    manifest_data, catalog_data = sample_manifest_and_catalog(["orders", "customers"])
+    sync.sync_lookml_views(manifest_data, catalog_data, str(tmp_path))
+
+    manifest_data, catalog_data = sample_manifest_and_catalog(["orders"])
+    sync_result = sync.sync_lookml_views(manifest_data, catalog_data, str(tmp_path))
+
+    assert sync_result.deleted == ["customers.view.lkml"]
+    assert not (tmp_path / "customers.view.lkml").exists()
+
+
+def test_sync_selected_models_leaves_other_views(tmp_path, sample_manifest_and_catalog):
+    manifest_data, catalog_data = sample_manifest_and_catalog(["orders", "customers"])
+    sync.sync_lookml_views(manifest_data, catalog_data, str(tmp_path))
+
+    sync_result = sync.sync_lookml_views(
+        manifest_data,
+        catalog_data,
+        str(tmp_path),
+        incremental=False,
+        unique_ids={"model.shop.orders"},
+    )
+    # The view is regenerated, but its LookML is unchanged so the file is not rewritten
+    assert sync_result.unchanged == ["orders.view.lkml"]
+    assert not sync_result.updated
+    assert not sync_result.deleted
+
+    third_sync = sync.sync_lookml_views(manifest_data, catalog_data, str(tmp_path))
+    assert sorted(third_sync.unchanged) == ["customers.view.lkml", "orders.view.lkml"]
+
+
+def test_sync_from_manifest_index_and_snapshot(tmp_path, sample_manifest_and_catalog):
+    manifest_data, catalog_data = sample_manifest_and_catalog(["orders", "customers"])
+    manifest_data["nodes"]["seed.shop.countries"] = {
+        "name": "countries",
+        "resource_type": "seed",
+        "package_name": "shop",
+    }
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text(json.dumps(manifest_data))
+    ArtifactSnapshot.write(manifest_path, manifest_data)
+    (tmp_path / "from_index").mkdir()
+    (tmp_path / "from_snapshot").mkdir()
+
+    index_sync = sync.sync_lookml_views(
+        ManifestIndex(manifest_data), catalog_data, str(tmp_path / "from_index")
+    )
+    snapshot_sync = sync.sync_lookml_views(
+        ArtifactSnapshot.load(manifest_path),
+        catalog_data,
+        str(tmp_path / "from_snapshot"),
+        packages={"shop"},
+    )
+
+    assert sorted(index_sync.created) == ["customers.view.lkml", "orders.view.lkml"]
+    assert snapshot_sync.created == index_sync.created
+    assert (tmp_path / "from_snapshot" / "orders.view.lkml").read_text() == (
+        tmp_path / "from_index" / "orders.view.lkml"
+    ).read_text()
+
+
+def test_sync_uses_fully_qualified_table_names(tmp_path, sample_manifest_and_catalog):
+    manifest_data, catalog_data = sample_manifest_and_catalog(["orders"])
+    manifest_data["nodes"]["model.shop.orders"].update(
+        {"database": "analytics", "schema": "marts", "alias": "fct_orders"}
+    )
+
+    sync.sync_lookml_views(manifest_data, catalog_data, str(tmp_path))
+
+    assert "sql_table_name: analytics.marts.fct_orders ;;" in (
+        tmp_path / "orders.view.lkml"
+    ).read_text()
+
+
+def test_lookml_views_leave_model_schemas_unchanged():
+    dbt_models = sample_dbt_models(2)
+    dbt_models[0]["meta"] = {"looker_label": "Orders", "looker_owner": "analytics"}
+    original_models = copy.deepcopy(dbt_models)
+
+    views = list(base.iter_lookml_views(iter(dbt_models)))
+
+    assert dbt_models == original_models
+    assert views[0] == {
+        "name": "model_0",
+        "dimensions": [
+            {
+                "name": "column_{}".format(column_index),
+                "description": "A column",
+                "type": "number",
+                "sql": "${TABLE}.column_" + str(column_index),
+            }
+            for column_index in range(1, 5)
+        ],
+        "dimension_groups": [
+            {
+                "name": "column_0",
+                "description": "A column",
+                "type": "time",
+                "sql": "${TABLE}.column_0",
+            }
+        ],
+        "sql_table_name": "model_0",
+        "label": "Orders",
+    }
+
+
+def test_write_lookml_views_matches_dump():
+    dbt_models = sample_dbt_models(3)
+    lookml_stream = io.StringIO()
+
+    base.write_lookml_views(iter(dbt_models), lookml_stream)
+
+    assert lookml_stream.getvalue() == lkml.dump(
+        base.dbt_model_schemas_to_lookml_views(dbt_models)
+    )
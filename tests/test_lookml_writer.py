@@ -0,0 +1,150 @@
+import io
+from pathlib import Path
+
+import lkml
+import pytest
+
+from dbtea.clients.bi.looker.writer import dump
+
+LOOKML_PROJECT_DIRECTORY = Path(__file__).parent / "resources" / "lookml_projects"
+
+LOOKML_DOCUMENTS = [
+    {
+        "view": {
+            "name": "orders",
+            "sql_table_name": "analytics.orders",
+            "label": 'Orders "all time"',
+            "dimensions": [
+                {
+                    "name": "order_id",
+                    "primary_key": "yes",
+                    "type": "number",
+                    "sql": "${TABLE}.order_id  ",
+                },
+                {"name": "status", "type": "string", "sql": "${TABLE}.status"},
+            ],
+            "dimension_groups": [
+                {
+                    "name": "created",
+                    "type": "time",
+                    "timeframes": ["raw", "time", "date", "week", "month", "year"],
+                    "sql": "${TABLE}.created_at",
+                }
+            ],
+            "measures": [
+                {
+                    "name": "count",
+                    "type": "count",
+                    "drill_fields": ["order_id", "status"],
+                },
+                {
+                    "name": "completed_count",
+                    "type": "count",
+                    "filters": [{"status": "completed"}, {"order_id": ">0"}],
+                },
+                {
+                    "name": "legacy_count",
+                    "type": "count",
+                    "filters": [{"field": "status", "value": "completed"}],
+                },
+            ],
+            "sets": [{"name": "detail", "fields": ["order_id", "status"]}],
+        }
+    },
+    {
+        "view": {
+            "name": "order_facts",
+            "derived_table": {
+                "sql": "SELECT order_id, count(*) AS items FROM items GROUP BY 1"
+            },
+            "filters": [{"name": "status_filter", "type": "string"}],
+            "parameters": [
+                {
+                    "name": "granularity",
+                    "type": "unquoted",
+                    "allowed_values": [
+                        {"label": "Day", "value": "day"},
+                        {"label": "Week", "value": "week"},
+                    ],
+                }
+            ],
+            "dimensions": [{"name": "items", "suggestions": ["1", "2"]}],
+            "measures": [{"name": "empty"}],
+        }
+    },
+    {
+        "connection": "warehouse",
+        "includes": ["/views/*.view.lkml", "/dashboards/*.dashboard"],
+        "access_grants": [
+            {
+                "name": "can_see_pii",
+                "user_attribute": "pii",
+                "allowed_values": ["yes", "admin"],
+            }
+        ],
+        "explores": [
+            {
+                "name": "orders",
+                "description": "Orders and \\\"their\\\" items",
+                "joins": [
+                    {
+                        "name": "order_facts",
+                        "relationship": "one_to_one",
+                        "sql_on": "${orders.order_id} = ${order_facts.order_id}",
+                    },
+                    {"name": "users"},
+                ],
+                "aggregate_table": {
+                    "name": "daily",
+                    "query": {
+                        "dimensions": ["created_date"],
+                        "measures": ["count"],
+                        "filters": [{"orders.status": "completed"}],
+                    },
+                    "materialization": {"datagroup_trigger": "daily"},
+                },
+            },
+            {"name": "users", "hidden": "yes"},
+        ],
+    },
+    {"view": {"name": "empty_view"}},
+    {},
+]
+
+
+@pytest.mark.parametrize("lookml_data", LOOKML_DOCUMENTS)
+def test_dump_matches_lkml(lookml_data):
+    assert dump(lookml_data) == lkml.dump(lookml_data)
+
+
+@pytest.mark.parametrize("lookml_data", LOOKML_DOCUMENTS[:3])
+def test_dump_round_trips(lookml_data):
+    assert lkml.load(dump(lookml_data)) == lkml.load(lkml.dump(lookml_data))
+
+
+@pytest.mark.parametrize(
+    "lookml_file_path",
+    sorted(LOOKML_PROJECT_DIRECTORY.rglob("*.lkml")),
+    ids=lambda path: path.name,
+)
+def test_dump_round_trips_lookml_files(lookml_file_path):
+    lookml_data = lkml.load(lookml_file_path.read_text())
+    lookml_string = dump(lookml_data)
+
+    assert lookml_string == lkml.dump(lookml_data)
+    assert lkml.load(lookml_string) == lookml_data
+
+
+def test_dump_writes_to_stream_without_changing_input():
+    lookml_data = LOOKML_DOCUMENTS[0]
+    lookml_stream = io.StringIO()
+
+    assert dump(lookml_data, lookml_stream) is None
+    assert lookml_stream.getvalue() == lkml.dump(lookml_data)
+    assert lookml_data["view"]["name"] == "orders"
+    assert lookml_data["view"]["dimensions"][0]["name"] == "order_id"
+
+
+def test_dump_rejects_unsupported_values():
+    with pytest.raises(TypeError):
+        dump({"view": {"name": "orders", "hidden": True}})
@@ -0,0 +1,105 @@
+import csv
+import gzip
+import io
+import json
+import tarfile
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from dbtea.perf import PerfReport, load_run_results_history  # noqa: E402
+
+
+def _run_results(generated_at, execution_times):
+    return {
+        "metadata": {"generated_at": generated_at},
+        "results": [
+            {
+                "unique_id": unique_id,
+                "status": "success",
+                "execution_time": execution_time,
+                "timing": [
+                    {
+                        "name": "compile",
+                        "started_at": "2021-06-01T00:00:00.000000Z",
+                        "completed_at": "2021-06-01T00:00:00.500000Z",
+                    }
+                ],
+            }
+            for unique_id, execution_time in execution_times.items()
+        ],
+    }
+
+
+@pytest.fixture
+def run_results_archive(tmp_path):
+    runs = [
+        ("2021-06-01T00:00:00Z", {"model.shop.orders": 10.0, "model.shop.items": 1.0}),
+        ("2021-06-02T00:00:00Z", {"model.shop.orders": 20.0, "model.shop.items": 1.0}),
+        ("2021-06-03T00:00:00Z", {"model.shop.orders": 30.0, "test.shop.unique": 5.0}),
+        ("2021-06-04T00:00:00Z", {"model.shop.orders": 40.0, "model.shop.items": 1.0}),
+    ]
+    # Latest run as a plain file, older runs gzipped and inside a tar archive
+    (tmp_path / "target").mkdir()
+    with open(tmp_path / "target" / "run_results.json", "w") as run_results_stream:
+        json.dump(_run_results(*runs[3]), run_results_stream)
+
+    archive_directory = tmp_path / "archive"
+    archive_directory.mkdir()
+    with gzip.open(archive_directory / "run_results_0602.json.gz", "wt") as stream:
+        json.dump(_run_results(*runs[1]), stream)
+    with tarfile.open(archive_directory / "old_runs.tar.gz", "w:gz") as archive:
+        for index in (0, 2):
+            run_results_bytes = json.dumps(_run_results(*runs[index])).encode()
+            member = tarfile.TarInfo("runs/run_results_{}.json".format(index))
+            member.size = len(run_results_bytes)
+            archive.addfile(member, io.BytesIO(run_results_bytes))
+    return tmp_path
+
+
+def test_load_history_from_files_and_archives(run_results_archive):
+    history = load_run_results_history(
+        [
+            run_results_archive / "target" / "run_results.json",
+            run_results_archive / "archive",
+        ]
+    )
+
+    assert len(history.run_sources) == 4
+    assert sorted(history.unique_ids) == ["model.shop.items", "model.shop.orders"]
+    assert len(history) == 7
+    assert np.allclose(history.durations("compile"), 0.5)
+
+
+def test_perf_report_statistics(run_results_archive):
+    history = load_run_results_history([run_results_archive])
+    perf_report = PerfReport.from_history(history)
+    rows = {row["unique_id"]: row for row in perf_report.rows()}
+
+    orders = rows["model.shop.orders"]
+    assert orders["runs"] == 4
+    assert orders["p50_seconds"] == pytest.approx(25.0)
+    assert orders["p95_seconds"] == pytest.approx(38.5)
+    assert orders["max_seconds"] == 40.0
+    assert orders["latest_seconds"] == 40.0
+    assert orders["share_of_runtime"] == pytest.approx(100.0 / 103.0)
+    assert orders["trend_seconds_per_day"] == pytest.approx(10.0)
+    assert rows["model.shop.items"]["trend_seconds_per_day"] == pytest.approx(0.0)
+
+    assert list(perf_report.slowest(1).columns["unique_id"]) == ["model.shop.orders"]
+    assert list(perf_report.regressions().columns["unique_id"]) == ["model.shop.orders"]
+
+
+def test_perf_report_csv(run_results_archive, tmp_path):
+    output_path = str(tmp_path / "perf.csv")
+    PerfReport.from_history(load_run_results_history([run_results_archive])).write(
+        output_path
+    )
+
+    with open(output_path) as report_stream:
+        report_rows = list(csv.DictReader(report_stream))
+    assert {row["unique_id"] for row in report_rows} == {
+        "model.shop.items",
+        "model.shop.orders",
+    }
@@ -0,0 +1,130 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from dbtea.clients.bi.looker.project_index import (
+    LookmlProjectIndex,
+    lookml_file_type,
+    lookml_project_index_path,
+    scan_lookml_declarations,
+)
+from dbtea.exceptions import DbteaException
+
+LOOKML_PROJECT_DIRECTORY = (
+    Path(__file__).parent / "resources" / "lookml_projects" / "dim_date"
+)
+
+ORDERS_MODEL = """
+connection: "warehouse"
+# explore: commented_out {}
+explore: orders {
+  view_name: order_items
+  always_filter: { filters: [orders.status: "complete"] }
+  join: users {
+    sql_on: ${order_items.user_id} = ${users.id} AND '}' <> '{' ;;
+    relationship: many_to_one
+  }
+  join: buyers { from: users }
+}
+explore: +users {}
+"""
+
+
+def sample_lookml_project(project_root: Path) -> Path:
+    (project_root / "views").mkdir(parents=True)
+    (project_root / "views" / "users.view.lkml").write_text(
+        'view: users {\n  label: "Users {"\n  sql_table_name: analytics.users ;;\n}\n'
+        "view: +users {}\n"
+    )
+    (project_root / "views" / "order_items.view.lkml").write_text(
+        "view: order_items {\n  derived_table: { sql: select 1 ;; }\n}\n"
+    )
+    (project_root / "orders.model.lkml").write_text(ORDERS_MODEL)
+    (project_root / "overview.dashboard.lookml").write_text(
+        "- dashboard: overview\n  title: Overview\n"
+    )
+    (project_root / ".git").mkdir()
+    (project_root / ".git" / "stale.view.lkml").write_text("view: stale {}")
+    return project_root
+
+
+@pytest.mark.parametrize(
+    "file_name,file_type",
+    [
+        ("orders.view.lkml", "view"),
+        ("orders.model.lkml", "model"),
+        ("orders.explore.lkml", "explore"),
+        ("overview.dashboard.lookml", "dashboard"),
+        ("manifest.lkml", "generic"),
+    ],
+)
+def test_lookml_file_type(file_name, file_type):
+    assert lookml_file_type(file_name) == file_type
+
+
+def test_scan_lookml_declarations():
+    views, explores = scan_lookml_declarations(ORDERS_MODEL)
+
+    assert views == []
+    assert explores == {
+        "orders": ["order_items", "users", "users"],
+        "+users": ["users"],
+    }
+
+
+def test_index_lookups(tmp_path):
+    index = LookmlProjectIndex.scan(str(sample_lookml_project(tmp_path)))
+
+    assert len(index) == 4
+    assert index.view_path("users") == "views/users.view.lkml"
+    assert index.view_path("+users") == "views/users.view.lkml"
+    assert index.view_path("stale") is None
+    assert index.explore_path("orders") == "orders.model.lkml"
+    assert index.dashboard_path("overview") == "overview.dashboard.lookml"
+    assert index.explores_using_view("users") == ["orders", "+users"]
+    assert index.explores_using_view("order_items") == ["orders"]
+    assert index.files_of_type("view") == [
+        "views/order_items.view.lkml",
+        "views/users.view.lkml",
+    ]
+
+
+def test_index_parses_files_only_when_asked(tmp_path):
+    index = LookmlProjectIndex.scan(str(sample_lookml_project(tmp_path)))
+    assert not index._parsed_files
+
+    assert index.view_data("users")["sql_table_name"] == "analytics.users"
+    assert list(index._parsed_files) == ["views/users.view.lkml"]
+    assert index.view_data("missing") is None
+
+
+def test_index_rejects_unknown_files(tmp_path):
+    index = LookmlProjectIndex.scan(str(sample_lookml_project(tmp_path)))
+    with pytest.raises(DbteaException):
+        index.lookml_data("views/missing.view.lkml")
+
+
+def test_index_cache_reuses_unchanged_entries(tmp_path):
+    project_root = sample_lookml_project(tmp_path / "project")
+    cache_directory = str(tmp_path / "cache")
+
+    index = LookmlProjectIndex.load(str(project_root), cache_directory=cache_directory)
+    assert os.path.exists(lookml_project_index_path(str(project_root), cache_directory))
+
+    (project_root / "views" / "users.view.lkml").write_text("view: customers {}\n")
+    reloaded_index = LookmlProjectIndex.load(
+        str(project_root), cache_directory=cache_directory
+    )
+
+    assert reloaded_index.view_path("customers") == "views/users.view.lkml"
+    assert reloaded_index.view_path("users") is None
+    assert reloaded_index.files["orders.model.lkml"] == index.files["orders.model.lkml"]
+
+
+def test_index_of_resource_project():
+    index = LookmlProjectIndex.scan(str(LOOKML_PROJECT_DIRECTORY))
+
+    assert index.view_path("dim_date") == "views/dim_date.view.lkml"
+    assert index.explores_using_view("dim_date") == ["dim_date"]
+    assert index.view_data("dim_date")["name"] == "dim_date"
@@ -0,0 +1,103 @@
+import os
+
+import pytest
+
+from dbtea.clients.bi.looker.base import LookmlView
+from dbtea.clients.bi.looker.project_writer import (
+    LookmlProjectWriter,
+    write_lookml_project,
+)
+from dbtea.exceptions import DbteaException
+
+
+def sample_lookml_files(file_count: int, label: str = "Orders") -> list:
+    return [
+        (
+            "views/view_{}.view.lkml".format(index),
+            {"view": {"name": "view_{}".format(index), "label": label}},
+        )
+        for index in range(file_count)
+    ]
+
+
+def test_write_skips_unchanged_files(tmp_path):
+    first_write = write_lookml_project(str(tmp_path), sample_lookml_files(150))
+    assert len(first_write.created) == 150
+    first_mtime = os.stat(tmp_path / "views" / "view_0.view.lkml").st_mtime_ns
+
+    lookml_files = sample_lookml_files(150)
+    lookml_files[1] = ("views/view_1.view.lkml", 'view: view_1 {\n  label: "Users"\n}')
+    second_write = write_lookml_project(str(tmp_path), lookml_files, workers=4)
+
+    assert second_write.updated == ["views/view_1.view.lkml"]
+    assert len(second_write.unchanged) == 149
+    assert os.stat(tmp_path / "views" / "view_0.view.lkml").st_mtime_ns == first_mtime
+    assert "Users" in (tmp_path / "views" / "view_1.view.lkml").read_text()
+    assert not [
+        path for path in os.listdir(tmp_path / "views") if path.endswith(".tmp")
+    ]
+
+
+def test_write_detects_same_size_changes(tmp_path):
+    write_lookml_project(str(tmp_path), sample_lookml_files(1, label="Orders"))
+    write_result = write_lookml_project(
+        str(tmp_path), sample_lookml_files(1, label="Orderz")
+    )
+
+    assert write_result.updated == ["views/view_0.view.lkml"]
+    assert "Orderz" in (tmp_path / "views" / "view_0.view.lkml").read_text()
+
+
+def test_write_keeps_mode_of_replaced_files(tmp_path):
+    write_lookml_project(str(tmp_path), sample_lookml_files(2, label="Orders"))
+    new_file_mode = os.stat(tmp_path / "views" / "view_1.view.lkml").st_mode & 0o777
+    os.chmod(tmp_path / "views" / "view_0.view.lkml", 0o600)
+
+    write_lookml_project(str(tmp_path), sample_lookml_files(3, label="Orderz"))
+
+    assert os.stat(tmp_path / "views" / "view_0.view.lkml").st_mode & 0o777 == 0o600
+    assert os.stat(tmp_path / "views" / "view_2.view.lkml").st_mode & 0o777 == new_file_mode
+
+
+def test_write_deletes_listed_and_unlisted_files(tmp_path):
+    write_lookml_project(str(tmp_path), sample_lookml_files(3))
+    (tmp_path / "notes.txt").write_text("not LookML")
+
+    write_result = write_lookml_project(
+        str(tmp_path),
+        sample_lookml_files(1),
+        delete_paths=["views/view_1.view.lkml", "views/missing.view.lkml"],
+    )
+    assert write_result.deleted == ["views/view_1.view.lkml"]
+
+    write_result = write_lookml_project(
+        str(tmp_path), sample_lookml_files(1), delete_unlisted=True
+    )
+    assert write_result.deleted == ["views/view_2.view.lkml"]
+    assert write_result.unchanged == ["views/view_0.view.lkml"]
+    assert (tmp_path / "notes.txt").exists()
+
+
+def test_write_lookml_file_objects(tmp_path):
+    lookml_view = LookmlView(
+        "orders", directory_path="views", view_data={"view": {"name": "orders"}}
+    )
+    write_result = LookmlProjectWriter(str(tmp_path)).write([lookml_view])
+
+    assert write_result.created == ["views/orders.view.lkml"]
+    assert (tmp_path / "views" / "orders.view.lkml").read_text() == "view: orders {}"
+
+
+def test_write_rejects_duplicate_files(tmp_path):
+    with pytest.raises(DbteaException):
+        write_lookml_project(str(tmp_path), sample_lookml_files(2) * 2)
+
+
+def test_lookml_file_writes_to_project(tmp_path):
+    lookml_view = LookmlView(
+        "orders", directory_path="views", view_data={"view": {"name": "orders"}}
+    )
+    (tmp_path / "views").mkdir()
+    lookml_view.write_data_to_file(str(tmp_path))
+
+    assert (tmp_path / "views" / "orders.view.lkml").read_text() == "view: orders {}"
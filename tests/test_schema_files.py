@@ -0,0 +1,82 @@
+import os
+
+import pytest
+
+from dbtea.exceptions import DbteaException
+from dbtea.schema_files import YamlFileCache, load_schema_files, load_yaml_files
+
+SCHEMA_YAML = """
+version: 2
+models:
+  - name: {model_name}
+    description: Orders placed
+    columns:
+      - name: ORDER_ID
+        tests: [unique]
+      - name: amount
+sources:
+  - name: shop
+    tables:
+      - name: raw_orders
+        columns:
+          - name: id
+"""
+
+
+def _write_schema_files(directory, count):
+    paths = list()
+    for index in range(count):
+        model_directory = directory / "models" / "mart_{}".format(index % 3)
+        model_directory.mkdir(parents=True, exist_ok=True)
+        schema_path = model_directory / "schema_{}.yml".format(index)
+        schema_path.write_text(SCHEMA_YAML.format(model_name="orders_{}".format(index)))
+        paths.append(str(schema_path))
+    (directory / "models" / "target").mkdir()
+    (directory / "models" / "target" / "ignored.yml").write_text("models: [")
+    return paths
+
+
+def test_load_schema_files_indexes_models_sources_and_columns(tmp_path):
+    paths = _write_schema_files(tmp_path, 5)
+    schema_files = load_schema_files(str(tmp_path / "models"), cache=None)
+
+    assert sorted(schema_files) == sorted(paths)
+    assert schema_files.model_path("orders_3") == paths[3]
+    assert schema_files.model("orders_3")["description"] == "Orders placed"
+    assert set(schema_files.columns("orders_3")) == {"order_id", "amount"}
+    assert schema_files.source("shop", "raw_orders")["name"] == "raw_orders"
+    assert set(schema_files.columns("shop.raw_orders")) == {"id"}
+    assert schema_files.model("missing") is None
+
+
+def test_parallel_loading_matches_serial_loading(tmp_path):
+    paths = _write_schema_files(tmp_path, 70)
+    assert load_yaml_files(paths, workers=2, cache=None) == load_yaml_files(
+        paths, cache=None
+    )
+
+
+def test_cache_reuses_unchanged_files_and_evicts_least_recently_used(tmp_path):
+    paths = _write_schema_files(tmp_path, 3)
+    cache = YamlFileCache(max_entries=2)
+    first_load = load_yaml_files(paths[:2], cache=cache)
+    assert load_yaml_files(paths[:1], cache=cache)[paths[0]] is first_load[paths[0]]
+
+    load_yaml_files(paths[2:], cache=cache)
+    assert len(cache) == 2
+    assert (
+        load_yaml_files(paths[1:2], cache=cache)[paths[1]] is not first_load[paths[1]]
+    )
+
+    with open(paths[0], "a") as schema_stream:
+        schema_stream.write("          - name: created_at\n")
+    os.utime(paths[0], ns=(0, 0))
+    reloaded_columns = load_yaml_files(paths[:1], cache=cache)[paths[0]]["sources"]
+    assert len(reloaded_columns[0]["tables"][0]["columns"]) == 2
+
+
+def test_invalid_yaml_names_the_file(tmp_path):
+    invalid_path = tmp_path / "broken.yml"
+    invalid_path.write_text("models: [")
+    with pytest.raises(DbteaException, match="broken.yml"):
+        load_yaml_files([str(invalid_path)], cache=None)
@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Cumulative import time budget for the CLI module, override for slow CI machines
+STARTUP_BUDGET_MS = float(os.getenv("DBTEA_STARTUP_BUDGET_MS", "250"))
+HEAVY_MODULES = {"dbt", "lkml", "looker_sdk", "requests", "yaml"}
+RUN_HELP = "import sys; sys.argv = ['dbtea', '--help']; import dbtea.cli; dbtea.cli.main()"
+
+project_root = Path(__file__).parent.parent.absolute()
+
+
+def cli_help_import_times() -> dict:
+    """Run `dbtea --help` under `python -X importtime` and return cumulative import time (us) per module."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", RUN_HELP],
+        cwd=project_root,
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+
+    import_times = dict()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, module_name = line[len("import time:") :].split("|")
+        import_times[module_name.strip()] = int(cumulative_us)
+    return import_times
+
+
+def test_help_does_not_import_heavy_dependencies():
+    imported_modules = cli_help_import_times()
+
+    imported_heavy_modules = {
+        module_name.split(".")[0] for module_name in imported_modules
+    } & HEAVY_MODULES
+    assert not imported_heavy_modules
+
+
+def test_help_import_time_within_budget():
+    cli_import_ms = cli_help_import_times()["dbtea.cli"] / 1000
+
+    assert cli_import_ms < STARTUP_BUDGET_MS
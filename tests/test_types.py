@@ -0,0 +1,96 @@
+import timeit
+
+import pytest
+
+from dbtea.clients.bi.looker.types import (
+    LookmlTypeMapper,
+    convert_to_lookml_data_type,
+    normalize_data_type,
+)
+from dbtea.exceptions import DbteaException
+
+
+@pytest.mark.parametrize(
+    "data_type,normalized_type",
+    [
+        ("NUMERIC(38,0)", "numeric"),
+        ("VARCHAR(256)", "varchar"),
+        ("character varying(256)", "character varying"),
+        ("TIMESTAMP WITH TIME ZONE", "timestamp with time zone"),
+        ("timestamp(6)  without time zone", "timestamp without time zone"),
+        ("ARRAY<STRING>", "array"),
+        ("STRUCT<id INT64, tags ARRAY<STRING>>", "struct"),
+        (None, ""),
+    ],
+)
+def test_normalize_data_type(data_type, normalized_type):
+    assert normalize_data_type(data_type) == normalized_type
+
+
+@pytest.mark.parametrize(
+    "data_type,lookml_type",
+    [
+        ("NUMBER(38,0)", "number"),
+        ("FLOAT64", "number"),
+        ("int8", "number"),
+        ("TIMESTAMP_NTZ(9)", "time"),
+        ("timestamp with time zone", "time"),
+        ("DATE", "date"),
+        ("BOOLEAN", "yesno"),
+        ("ARRAY<INT64>", "string"),
+        ("VARIANT", "string"),
+        (None, "string"),
+    ],
+)
+def test_convert_to_lookml_data_type(data_type, lookml_type):
+    assert convert_to_lookml_data_type("column", data_type) == lookml_type
+
+
+def test_adapter_rules_and_overrides():
+    snowflake_mapper = LookmlTypeMapper(
+        adapter="snowflake",
+        type_overrides={"NUMBER(38, 0)": "string", "geography": "string"},
+    )
+    assert snowflake_mapper.lookml_type("NUMBER(38,0)") == "string"
+    assert snowflake_mapper.lookml_type("NUMBER(38,2)") == "number"
+    assert snowflake_mapper.lookml_type("TIMESTAMPTZ") == "time"
+    assert LookmlTypeMapper(adapter="bigquery").lookml_type("TIMESTAMPTZ") == "string"
+
+    with pytest.raises(DbteaException):
+        LookmlTypeMapper(type_overrides={"geography": "location"})
+
+
+def test_from_config():
+    type_mapper = LookmlTypeMapper.from_config(
+        {
+            "lookml_types": {
+                "include_postal_code": True,
+                "overrides": {"super": "string", "money": "number"},
+            }
+        },
+        adapter="redshift",
+    )
+    assert type_mapper.adapter == "redshift"
+    assert type_mapper.lookml_type("MONEY") == "number"
+    assert type_mapper.map_columns(
+        [{"name": "ZIP", "type": "VARCHAR(5)"}, {"name": "amount", "type": "INT4"}]
+    ) == {"ZIP": "zipcode", "amount": "number"}
+
+
+def test_map_columns_of_large_catalog():
+    catalog_columns = {
+        "column_{}".format(index): {
+            "name": "column_{}".format(index),
+            "type": ("NUMBER(38,{})".format(index % 10), "VARCHAR(256)", "DATE")[
+                index % 3
+            ],
+            "index": index,
+        }
+        for index in range(500000)
+    }
+    type_mapper = LookmlTypeMapper(adapter="snowflake")
+    start_time = timeit.default_timer()
+    lookml_types = type_mapper.map_columns(catalog_columns)
+    assert timeit.default_timer() - start_time < 2
+    assert list(lookml_types)[:3] == ["column_0", "column_1", "column_2"]
+    assert list(lookml_types.values())[:3] == ["number", "string", "date"]
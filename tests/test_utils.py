@@ -1,6 +1,11 @@
+import json
 import os
+import subprocess
+import sys
 from pathlib import Path
 
+import pytest
+
 from dbtea import utils
 
 current_directory = Path(__file__).parent.absolute()
@@ -33,3 +38,74 @@ def test_fetch_dbt_basic_project():
         custom_project_directory=dbt_basic_project_path
     )
     assert project_path.endswith("resources/dbt_projects/basic")
+
+
+def test_stream_json_object_items_matches_full_parse(tmp_path):
+    json_data = {
+        "metadata": {"dbt_version": "0.19.1", "counts": [1, 2, [3, {"a": None}]]},
+        "nodes": {
+            "model.shop.orders": {"name": "orders", "columns": {"id": {"name": "id"}}},
+            "model.shop.customers": {"name": "customers", "value": 12345678901},
+            "seed.shop.countries": {"name": "country \"codes\" \\ {"},
+        },
+        "macros": {"macro.shop.cents": {"name": "cents", "depends_on": []}},
+        "total": 3.14159,
+    }
+    json_file_path = tmp_path / "manifest.json"
+    json_file_path.write_text(json.dumps(json_data, indent=2))
+
+    # A tiny chunk size forces values to straddle buffer boundaries
+    streamed_nodes = dict(
+        utils.stream_json_object_items(str(json_file_path), "nodes", chunk_size=7)
+    )
+
+    assert streamed_nodes == json_data["nodes"]
+
+
+def test_stream_json_object_items_key_filter(tmp_path):
+    json_file_path = tmp_path / "catalog.json"
+    json_file_path.write_text(
+        json.dumps({"nodes": {"model.a.x": {"n": 1}, "seed.a.y": {"n": 2}}})
+    )
+
+    streamed_nodes = list(
+        utils.stream_json_object_items(
+            str(json_file_path), "nodes", key_filter=lambda key: key.startswith("seed.")
+        )
+    )
+
+    assert streamed_nodes == [("seed.a.y", {"n": 2})]
+
+
+def test_stream_cli_command_handles_lines_as_written():
+    handled_lines = list()
+    result = utils.stream_cli_command(
+        [
+            sys.executable,
+            "-c",
+            "import sys; print('one'); print('two', file=sys.stderr); print('three')",
+        ],
+        working_directory=str(current_directory),
+        line_handler=lambda line, stream_name: handled_lines.append(
+            (stream_name, line)
+        ),
+    )
+
+    assert result.succeeded
+    assert [line for stream_name, line in handled_lines if stream_name == "stdout"] == [
+        "one",
+        "three",
+    ]
+    assert ("stderr", "two") in handled_lines
+
+
+def test_stream_cli_command_raises_on_nonzero_exit_code():
+    with pytest.raises(subprocess.CalledProcessError) as error:
+        utils.stream_cli_command(
+            [sys.executable, "-c", "print('Encountered an error'); exit(2)"],
+            working_directory=str(current_directory),
+            tail_lines=1,
+        )
+
+    assert error.value.returncode == 2
+    assert error.value.stderr == "Encountered an error"